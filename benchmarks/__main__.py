@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import argparse
+import sys
+
+from .corpus import CORPUS
+from .runner import STAGES, compare_results, dump_results, load_results, run_pipeline
+from .synthetic import SyntheticGrammar
+
+SYNTHETIC = {
+    'small': dict(rules=50),
+    'medium': dict(rules=300),
+    'large': dict(rules=1000),
+    'wide': dict(rules=300, fanout=8),
+    'deep': dict(rules=300, depth=24, recursion=0.3),
+    'dense': dict(rules=300, items=6, density=0.5),
+}
+
+
+def benchmarks(arguments: argparse.Namespace):
+    if arguments.suite in ('all', 'corpus'):
+        for grammar in CORPUS:
+            yield (
+                f'corpus/{grammar.name}',
+                grammar.source(),
+                grammar.entrypoint,
+                grammar.input(arguments.input_size, seed=arguments.seed),
+            )
+
+    if arguments.suite in ('all', 'synthetic'):
+        for name, parameters in SYNTHETIC.items():
+            grammar = SyntheticGrammar(seed=arguments.seed, **parameters)
+            yield (
+                f'synthetic/{name}',
+                grammar.source(),
+                'start',
+                grammar.sentence(arguments.input_size // 6, seed=arguments.seed),
+            )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks', description='Time each stage of the lrpy pipeline.'
+    )
+    parser.add_argument('--suite', choices=('all', 'corpus', 'synthetic'), default='all')
+    parser.add_argument(
+        '-k', '--filter', default='', help='only run benchmarks whose name contains this string'
+    )
+    parser.add_argument(
+        '--stage', action='append', choices=STAGES, help='stage to time (default: all)'
+    )
+    parser.add_argument('-r', '--repeat', type=int, default=5)
+    parser.add_argument(
+        '--input-size', type=int, default=100_000, help='approximate input size in characters'
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help='write results as JSON to this file')
+    parser.add_argument('--baseline', help='compare against results saved with --output')
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=0.1,
+        help='fail when a stage is slower than the baseline by more than this fraction',
+    )
+    arguments = parser.parse_args(argv)
+
+    stages = tuple(arguments.stage) if arguments.stage else STAGES
+
+    results = {}
+    for name, source, entrypoint, text in benchmarks(arguments):
+        if arguments.filter not in name:
+            continue
+
+        results[name] = run_pipeline(
+            source, entrypoint, text, repeat=arguments.repeat, stages=stages
+        )
+
+        for stage, timing in results[name].items():
+            print(f'{name:24} {stage:8} {timing["min"] * 1000:10.3f} ms', flush=True)
+
+    if arguments.output:
+        dump_results(results, arguments.output)
+
+    if arguments.baseline:
+        rows, regressed = compare_results(
+            results, load_results(arguments.baseline), tolerance=arguments.tolerance
+        )
+
+        print()
+        for name, stage, before, after, ratio in rows:
+            marker = ' !' if ratio > 1 + arguments.tolerance else ''
+            print(
+                f'{name:24} {stage:8} {before * 1000:10.3f} -> {after * 1000:10.3f} ms '
+                f'{ratio:6.2f}x{marker}'
+            )
+
+        if regressed:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+import sys
+
+from lrpy.generator.generator import LRGenerator
+from lrpy.grammar.builder import GrammarBuilder
+from lrpy.lexer.generator import build_lexer_tables
+from lrpy.lexer.lexer import Lexer
+from lrpy.lexer.tables import LexerTables
+from lrpy.parser.parser import GrammarParser
+from lrpy.runtime.checkpoint import CheckpointParser
+from lrpy.runtime.parser import Parser
+from lrpy.runtime.tables import CompiledGrammar
+
+from .runner import measure
+
+# Every '(' stays on the stack until its ')' arrives, so the stack is as deep as the nesting.
+SOURCE = r"""
+token NUMBER: /[0-9]+/
+token LPAREN: '('
+token RPAREN: ')'
+ignore WHITESPACE: /[ \t\n]+/
+
+rule $expression:
+    ('(' value:expression ')') => { return value }
+    (value:NUMBER) => { return value }
+"""
+
+DEPTHS = (10, 100, 1_000, 10_000, 100_000)
+
+
+def compile_nested() -> tuple[CompiledGrammar, LexerTables]:
+    grammar = GrammarBuilder(GrammarParser(SOURCE).parse()).build()
+    compiled = CompiledGrammar.from_generator(LRGenerator(grammar, 'expression'))
+    return compiled, build_lexer_tables(grammar)
+
+
+def prepare(parser: Parser, tables: LexerTables, depth: int) -> None:
+    parser.feed_lexer(Lexer(tables, '(' * depth))
+
+
+def checkpoint_restore(parser: CheckpointParser, count: int) -> None:
+    for _ in range(count):
+        parser.restore(parser.checkpoint())
+
+
+def copy_restore(parser: Parser, count: int) -> None:
+    for _ in range(count):
+        states = list(parser.states)
+        values = list(parser.values)
+        parser.states[:] = states
+        parser.values[:] = values
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.checkpoints',
+        description='Time parser checkpoints at increasing stack depths.',
+    )
+    parser.add_argument('-r', '--repeat', type=int, default=5)
+    parser.add_argument(
+        '-n', '--count', type=int, default=1000, help='checkpoints taken per measurement'
+    )
+    arguments = parser.parse_args(argv)
+
+    compiled, tables = compile_nested()
+
+    print(f'{"depth":>8} {"checkpoint":>14} {"list copy":>14}')
+    for depth in DEPTHS:
+        speculative = compiled.parser(checkpoints=True)
+        prepare(speculative, tables, depth)
+
+        plain = compiled.parser()
+        prepare(plain, tables, depth)
+
+        checkpoint = measure(
+            lambda: checkpoint_restore(speculative, arguments.count), arguments.repeat
+        )
+        copy = measure(lambda: copy_restore(plain, arguments.count), arguments.repeat)
+
+        print(
+            f'{depth:>8} {checkpoint["min"] / arguments.count * 1e9:>11.0f} ns '
+            f'{copy["min"] / arguments.count * 1e9:>11.0f} ns',
+            flush=True,
+        )
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import json
+import os
+import random
+from typing import Callable
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def json_input(size: int, rng: random.Random) -> str:
+    def value(depth: int):
+        choice = rng.random()
+        if depth < 4 and choice < 0.2:
+            return {f'key{rng.randrange(100)}': value(depth + 1) for _ in range(rng.randint(0, 5))}
+        if depth < 4 and choice < 0.35:
+            return [value(depth + 1) for _ in range(rng.randint(0, 5))]
+        if choice < 0.6:
+            return rng.randrange(-10000, 10000) / rng.choice((1, 100))
+        if choice < 0.85:
+            return f'text "{rng.randrange(1000)}" é'
+        return rng.choice((True, False, None))
+
+    values = []
+    length = 0
+    while length < size:
+        values.append(value(0))
+        length += len(json.dumps(values[-1]))
+
+    return json.dumps(values, indent=2)
+
+
+def expr_input(size: int, rng: random.Random) -> str:
+    operators = ('+', '-', '*', '/', '%', '<', '<=', '==', '!=', '&&', '||')
+
+    def expression(depth: int) -> str:
+        choice = rng.random()
+        if depth > 3 or choice < 0.3:
+            return rng.choice((f'x{rng.randrange(10)}', str(rng.randrange(1000))))
+        if choice < 0.75:
+            return f'{expression(depth + 1)} {rng.choice(operators)} {expression(depth + 1)}'
+        if choice < 0.85:
+            return f'({expression(depth + 1)})'
+        if choice < 0.9:
+            return f'-{expression(depth + 1)}'
+
+        arguments = ', '.join(expression(depth + 1) for _ in range(rng.randint(0, 3)))
+        return f'f{rng.randrange(5)}({arguments})'
+
+    lines = []
+    length = 0
+    while length < size:
+        if rng.random() < 0.5:
+            line = f'let x{rng.randrange(10)} = {expression(0)};'
+        else:
+            line = f'{expression(0)}; // statement {len(lines)}'
+
+        lines.append(line)
+        length += len(line) + 1
+
+    return '\n'.join(lines)
+
+
+SQL_STATEMENTS = (
+    'SELECT DISTINCT a.id, count(*) AS total FROM accounts a JOIN orders o ON a.id = o.account\n'
+    '    WHERE o.amount > {n} AND NOT a.name LIKE \'%test%\' GROUP BY a.id HAVING count(*) > 1\n'
+    '    ORDER BY total DESC, a.id LIMIT 10;',
+    'SELECT * FROM orders WHERE account = (SELECT id FROM accounts WHERE region = \'r{n}\')\n'
+    '    AND status IN (1, 2, {n});',
+    'INSERT INTO orders (id, account, amount) VALUES ({n}, 1, 9.5), ({n}, 2, NULL);',
+    'UPDATE accounts SET balance = balance - {n} * 2, name = \'it\'\'s\' WHERE id = {n};',
+    'DELETE FROM orders WHERE amount IS NULL OR amount < {n}; -- cleanup',
+    'CREATE TABLE t{n} (id INT PRIMARY KEY, name VARCHAR(40) NOT NULL, amount DECIMAL);',
+)
+
+
+def sql_input(size: int, rng: random.Random) -> str:
+    statements = []
+    length = 0
+    while length < size:
+        statement = rng.choice(SQL_STATEMENTS).format(n=rng.randrange(1000))
+        statements.append(statement)
+        length += len(statement) + 1
+
+    return '\n'.join(statements)
+
+
+PYLIKE_FUNCTION = '''\
+def function{n}(self, value, limit=10, *args, **kwargs):
+    # Walks the items and accumulates a total.
+    total = 0
+    for item in self.items[value]:
+        if item.kind == "skip" and not item.enabled:
+            continue
+        elif item.weight > limit:
+            total += item.weight ** 2 // 3
+        else:
+            total -= helper(item, scale={n}, key=lambda x: x.name)
+        end
+    end
+    while total > {n}:
+        total = total - 1
+    end
+    return {{"total": total, "values": [value, limit, None]}}
+end
+
+'''
+
+
+def pylike_input(size: int, rng: random.Random) -> str:
+    parts = ['class Generated(Base):\n    pass\nend\n\n']
+    length = len(parts[0])
+    while length < size:
+        part = PYLIKE_FUNCTION.format(n=rng.randrange(1000))
+        parts.append(part)
+        length += len(part)
+
+    return ''.join(parts)
+
+
+class CorpusGrammar:
+    __slots__ = ('name', 'filename', 'entrypoint', 'generate')
+
+    def __init__(
+        self,
+        name: str,
+        filename: str,
+        entrypoint: str,
+        generate: Callable[[int, random.Random], str],
+    ) -> None:
+        self.name = name
+        self.filename = filename
+        self.entrypoint = entrypoint
+        self.generate = generate
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} {self.name!r}>'
+
+    def source(self) -> str:
+        with open(os.path.join(DIRECTORY, self.filename), encoding='utf-8') as fp:
+            return fp.read()
+
+    def input(self, size: int, *, seed: int = 0) -> str:
+        return self.generate(size, random.Random(seed))
+
+
+CORPUS = (
+    CorpusGrammar('json', 'json.lr', 'document', json_input),
+    CorpusGrammar('expr', 'expr.lr', 'program', expr_input),
+    CorpusGrammar('sql', 'sql.lr', 'script', sql_input),
+    CorpusGrammar('pylike', 'pylike.lr', 'module', pylike_input),
+)
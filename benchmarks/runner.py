@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Optional
+
+from lrpy.generator.generator import LRGenerator
+from lrpy.grammar.builder import GrammarBuilder
+from lrpy.lexer.generator import build_lexer_tables
+from lrpy.lexer.lexer import Lexer
+from lrpy.parser.parser import GrammarParser
+from lrpy.parser.scanner import GrammarScanner
+from lrpy.parser.tokens import TokenType
+from lrpy.runtime.tables import CompiledGrammar
+
+STAGES = (
+    'scan',
+    'parse',
+    'build',
+    'empty',
+    'first',
+    'follow',
+    'states',
+    'tables',
+    'lexer',
+    'lex',
+    'runtime',
+    'cst',
+)
+
+FORMAT_VERSION = 1
+
+
+def measure(
+    function: Callable[..., Any], repeat: int, setup: Optional[Callable[[], Any]] = None
+) -> dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        arguments = () if setup is None else (setup(),)
+        gc.collect()
+
+        start = time.perf_counter()
+        function(*arguments)
+        timings.append(time.perf_counter() - start)
+
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'max': max(timings),
+    }
+
+
+def scan_source(source: str) -> int:
+    scanner = GrammarScanner(source)
+
+    count = 0
+    while scanner.scan().type is not TokenType.EOF:
+        count += 1
+
+    return count
+
+
+def run_pipeline(
+    source: str,
+    entrypoint: str,
+    text: Optional[str],
+    *,
+    repeat: int = 5,
+    stages: tuple[str, ...] = STAGES,
+) -> dict[str, dict[str, float]]:
+    results = {}
+
+    def stage(
+        name: str, function: Callable[..., Any], setup: Optional[Callable[[], Any]] = None
+    ) -> None:
+        if name in stages:
+            results[name] = measure(function, repeat, setup)
+
+    node = GrammarParser(source).parse()
+    grammar = GrammarBuilder(node).build()
+    generator = LRGenerator(grammar, entrypoint)
+
+    stage('scan', lambda: scan_source(source))
+    stage('parse', lambda: GrammarParser(source).parse())
+    stage('build', lambda: GrammarBuilder(node).build())
+    stage('empty', generator.calculate_empty)
+    stage('first', generator.calculate_first)
+    stage('follow', generator.calculate_follow)
+    stage('states', LRGenerator.build_states, setup=lambda: LRGenerator(grammar, entrypoint))
+
+    generator.build_states()
+    compiled = CompiledGrammar.from_generator(generator)
+    stage('tables', lambda: CompiledGrammar.from_generator(generator))
+
+    tables = build_lexer_tables(grammar)
+    stage('lexer', lambda: build_lexer_tables(grammar))
+
+    if text is not None and tables is not None:
+        stage('lex', lambda: Lexer(tables, text).scan_all())
+
+        def parse() -> Any:
+            parser = compiled.parser()
+            parser.feed_lexer(Lexer(tables, text))
+            return parser.finish()
+
+        stage('runtime', parse)
+
+        def parse_cst() -> Any:
+            parser = compiled.parser(cst=True)
+            parser.feed_lexer(Lexer(tables, text))
+            return parser.finish()
+
+        stage('cst', parse_cst)
+
+    return results
+
+
+def environment() -> dict[str, Any]:
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'executable': sys.executable,
+    }
+
+
+def dump_results(results: dict[str, Any], path: str) -> None:
+    document = {
+        'version': FORMAT_VERSION,
+        'environment': environment(),
+        'results': results,
+    }
+
+    with open(path, 'w', encoding='utf-8') as fp:
+        json.dump(document, fp, indent=2, sort_keys=True)
+        fp.write('\n')
+
+
+def load_results(path: str) -> dict[str, Any]:
+    with open(path, encoding='utf-8') as fp:
+        document = json.load(fp)
+
+    if document.get('version') != FORMAT_VERSION:
+        raise ValueError(f'Unsupported benchmark results version in {path!r}')
+
+    return document['results']
+
+
+def compare_results(
+    results: dict[str, Any], baseline: dict[str, Any], *, tolerance: float = 0.1
+) -> tuple[list[tuple[str, str, float, float, float]], bool]:
+    rows = []
+    regressed = False
+
+    for benchmark, stages in results.items():
+        basestages = baseline.get(benchmark)
+        if basestages is None:
+            continue
+
+        for name, timing in stages.items():
+            basetiming = basestages.get(name)
+            if basetiming is None:
+                continue
+
+            ratio = timing['min'] / basetiming['min'] if basetiming['min'] else float('inf')
+            if ratio > 1 + tolerance:
+                regressed = True
+
+            rows.append((benchmark, name, basetiming['min'], timing['min'], ratio))
+
+    return rows, regressed
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import random
+from typing import Optional
+
+TERMINALS = ('WORD', 'NUMBER', 'STRING')
+
+WRAPPERS = ('optional', 'repeat', 'plus')
+
+
+class SyntheticItem:
+    __slots__ = ('kind', 'target', 'wrapper')
+
+    def __init__(self, kind: str, target: object, wrapper: Optional[str]) -> None:
+        self.kind = kind
+        self.target = target
+        self.wrapper = wrapper
+
+    def __str__(self) -> str:
+        string = f'rule{self.target}' if self.kind == 'rule' else self.target
+
+        if self.wrapper == 'optional':
+            return f'[{string}] \';\''
+        if self.wrapper == 'repeat':
+            return f'{string}* \';\''
+        if self.wrapper == 'plus':
+            return f'{string}+ \';\''
+
+        return string
+
+
+# Every alternative opens with its own keyword and closes with ')', and every [...], * and +
+# item is followed by ';'. This keeps generated grammars free of conflicts, so any sentence
+# derived from one parses.
+class SyntheticGrammar:
+    __slots__ = (
+        'rules', 'fanout', 'depth', 'items', 'density', 'recursion', 'seed', 'alternatives'
+    )
+
+    def __init__(
+        self,
+        *,
+        rules: int = 100,
+        fanout: int = 3,
+        depth: int = 6,
+        items: int = 4,
+        density: float = 0.2,
+        recursion: float = 0.1,
+        seed: int = 0,
+    ) -> None:
+        self.rules = rules
+        self.fanout = fanout
+        self.depth = depth
+        self.items = items
+        self.density = density
+        self.recursion = recursion
+        self.seed = seed
+
+        self.alternatives: list[list[list[SyntheticItem]]] = []
+        self.generate()
+
+    def __repr__(self) -> str:
+        return (
+            f'<{self.__class__.__name__} rules={self.rules} fanout={self.fanout} '
+            f'depth={self.depth} density={self.density}>'
+        )
+
+    def layer(self, rule: int) -> int:
+        return rule * self.depth // self.rules
+
+    def generate(self) -> None:
+        rng = random.Random(self.seed)
+
+        layers = [[] for _ in range(self.depth)]
+        for rule in range(self.rules):
+            layers[self.layer(rule)].append(rule)
+
+        for rule in range(self.rules):
+            layer = self.layer(rule)
+            alternatives = []
+
+            for _ in range(rng.randint(1, self.fanout)):
+                items = []
+                for _ in range(rng.randint(0, self.items)):
+                    if layer + 1 < self.depth and layers[layer + 1] and rng.random() < 0.5:
+                        item = SyntheticItem('rule', rng.choice(layers[layer + 1]), None)
+                    elif rng.random() < self.recursion:
+                        # Recursive references are always skippable so derivations terminate.
+                        item = SyntheticItem(
+                            'rule', rng.randrange(rule + 1), rng.choice(('optional', 'repeat'))
+                        )
+                    else:
+                        item = SyntheticItem('terminal', rng.choice(TERMINALS), None)
+
+                    if item.wrapper is None and rng.random() < self.density:
+                        item.wrapper = rng.choice(WRAPPERS)
+
+                    items.append(item)
+
+                alternatives.append(items)
+
+            self.alternatives.append(alternatives)
+
+    def keyword(self, rule: int, alternative: int) -> str:
+        return f'k{rule}_{alternative}'
+
+    def source(self) -> str:
+        parts = [
+            f'token K{rule}_{index}: \'{self.keyword(rule, index)}\''
+            for rule, alternatives in enumerate(self.alternatives)
+            for index in range(len(alternatives))
+        ]
+        parts.extend((
+            'token WORD: /[a-z][a-z0-9_]*/',
+            'token NUMBER: /[0-9]+/',
+            'token STRING: /"[^"]*"/',
+            'token CLOSE: \')\'',
+            'token SEMICOLON: \';\'',
+            'ignore WHITESPACE: /[ \\t\\r\\n]+/',
+            '',
+            'rule $start:',
+            '    (rule0+)',
+        ))
+
+        for rule, alternatives in enumerate(self.alternatives):
+            parts.append('')
+            parts.append(f'rule rule{rule}:')
+
+            for index, items in enumerate(alternatives):
+                words = [f'K{rule}_{index}', *(str(item) for item in items), '\')\'']
+                parts.append(f'    ({" ".join(words)})')
+
+        return '\n'.join(parts) + '\n'
+
+    def heights(self) -> list[int]:
+        heights = [None] * self.rules
+
+        changed = True
+        while changed:
+            changed = False
+
+            for rule, alternatives in enumerate(self.alternatives):
+                for items in alternatives:
+                    height = self.alternative_height(items, heights)
+                    if height is not None and (heights[rule] is None or height < heights[rule]):
+                        heights[rule] = height
+                        changed = True
+
+        return heights
+
+    def alternative_height(
+        self, items: list[SyntheticItem], heights: list[Optional[int]]
+    ) -> Optional[int]:
+        height = 1
+        for item in items:
+            if item.kind != 'rule' or item.wrapper in ('optional', 'repeat'):
+                continue
+
+            if heights[item.target] is None:
+                return None
+
+            height = max(height, heights[item.target] + 1)
+
+        return height
+
+    def sentence(self, tokens: int, *, seed: int = 0, maxdepth: int = 12) -> str:
+        rng = random.Random(seed)
+        heights = self.heights()
+        words = []
+
+        def terminal(name: str) -> str:
+            if name == 'WORD':
+                return f'w{rng.randrange(1000)}'
+            if name == 'NUMBER':
+                return str(rng.randrange(100000))
+            return f'"s{rng.randrange(1000)}"'
+
+        def derive(rule: int, depth: int) -> None:
+            alternatives = self.alternatives[rule]
+            if depth >= maxdepth:
+                index = min(
+                    range(len(alternatives)),
+                    key=lambda index: self.alternative_height(alternatives[index], heights),
+                )
+            else:
+                index = rng.randrange(len(alternatives))
+
+            words.append(self.keyword(rule, index))
+
+            for item in alternatives[index]:
+                if item.wrapper == 'optional':
+                    count = 0 if depth >= maxdepth else rng.randint(0, 1)
+                elif item.wrapper == 'repeat':
+                    count = 0 if depth >= maxdepth else rng.randint(0, 2)
+                elif item.wrapper == 'plus':
+                    count = 1 if depth >= maxdepth else rng.randint(1, 2)
+                else:
+                    count = 1
+
+                for _ in range(count):
+                    if item.kind == 'rule':
+                        derive(item.target, depth + 1)
+                    else:
+                        words.append(terminal(item.target))
+
+                if item.wrapper is not None:
+                    words.append(';')
+
+            words.append(')')
+
+        while len(words) < tokens:
+            derive(0, 0)
+
+        return ' '.join(words)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+from .build import ARTIFACT_SUFFIX, BuildCache, BuildTarget, build_many, format_result, summarize
+
+
+def parse_targets(arguments: argparse.Namespace) -> list[BuildTarget]:
+    targets = []
+    outputs = {}
+
+    for specification in arguments.grammars:
+        path, separator, tokens = specification.partition('=')
+        if not separator:
+            tokens = arguments.tokens
+
+        name = os.path.splitext(os.path.basename(path))[0]
+        output = os.path.join(arguments.output, name + ARTIFACT_SUFFIX)
+
+        if output in outputs:
+            raise SystemExit(f'error: {path} and {outputs[output]} would both write {output}')
+
+        outputs[output] = path
+        targets.append(
+            BuildTarget(path, tokens=tokens or None, entrypoint=arguments.entrypoint, output=output)
+        )
+
+    return targets
+
+
+def build(arguments: argparse.Namespace) -> int:
+    os.makedirs(arguments.output, exist_ok=True)
+
+    start = time.perf_counter()
+    results = build_many(
+        parse_targets(arguments),
+        BuildCache(arguments.output),
+        workers=arguments.jobs,
+        force=arguments.force,
+    )
+
+    for result in results:
+        if not (arguments.quiet and result.cached):
+            print(format_result(result))
+
+    print(summarize(results, time.perf_counter() - start))
+    return 1 if any(result.error is not None for result in results) else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m lrpy')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    command = commands.add_parser(
+        'build', help='compile grammar files into parse and lexer table artifacts'
+    )
+    command.add_argument(
+        'grammars',
+        nargs='+',
+        metavar='GRAMMAR[=TOKENS]',
+        help='grammar file, optionally followed by a JSON token map for it',
+    )
+    command.add_argument('-o', '--output', default='.', help='directory for artifacts and cache')
+    command.add_argument('-t', '--tokens', help='JSON token map for grammars without their own')
+    command.add_argument('-e', '--entrypoint', help='entrypoint rule (default: the first $ rule)')
+    command.add_argument(
+        '-j', '--jobs', type=int, help='number of worker processes (default: CPU count)'
+    )
+    command.add_argument('-f', '--force', action='store_true', help='ignore the cache')
+    command.add_argument('-q', '--quiet', action='store_true', help='do not list cache hits')
+
+    arguments = parser.parse_args(argv)
+    if arguments.command == 'build':
+        return build(arguments)
+
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
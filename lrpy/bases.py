@@ -1,16 +1,17 @@
 from __future__ import annotations
 
-import bisect
 import io
-import re
-from typing import Optional
+from typing import Optional, Union
 
+from .lineindex import LineIndex
 from .stringreader import StringReader
-from .textspan import TextSpan
+from .textspan import SpanMode, SpanTable, TextSpan
+
+Span = Union[TextSpan, int, None]
 
 
 def padstring(string: str, n: int) -> str:
-    return string.ljust(n + len(string))
+    return string.rjust(n + len(string))
 
 
 class BaseToken:
@@ -33,50 +34,111 @@ class BaseToken:
 
 
 class BaseScanner:
-    __slots__ = ('filename', 'reader', 'linestarts')
+    __slots__ = ('filename', 'reader', 'lineindex', 'spanmode', 'spans')
+
+    reader_class = StringReader
+
+    def __init__(
+        self, source: str, *, filename: str = '<string>', spanmode: SpanMode = SpanMode.OBJECTS
+    ) -> None:
+        self.filename = filename
+        self.reader = self.reader_class(source)
+
+        self.spanmode = spanmode
+        self.spans = SpanTable() if spanmode is SpanMode.ARRAYS else None
 
-    def __init__(self, source: str, *, filename: str = '<string>') -> None:
+        self.lineindex = None
+
+    def reset(self, source: str, *, filename: str = '<string>') -> None:
         self.filename = filename
-        self.reader = StringReader(source)
+        self.reader.reset(source)
+
+        if self.spans is not None:
+            self.spans.clear()
 
-        self.linestarts = []
-        for match in re.finditer('\n', source):
-            self.linestarts.append(match.end())
+        self.lineindex = None
 
     def __repr__(self) -> str:
         lineno = self.lineno()
         position = self.position()
         return f'<{self.__class__.__name__} lineno={lineno} position={position}>'
 
-    def fmterror(self, message: str, span: TextSpan) -> None:
-        lineno = self.lineno(span.startpos)
+    def fmterror(self, message: str, span: Span) -> None:
+        span = self.resolve_span(span)
+        lineindex = self.get_lineindex()
+        lineno = lineindex.lineno(span.startpos)
 
-        startpos = self.linestart(lineno)
-        endpos = self.linestart(lineno + 1)
+        # Only the erroneous line is copied. The last line ends at the end of the source.
+        startpos = lineindex.linestart(lineno)
+        if lineno < len(lineindex.linestarts):
+            line = self.reader.text(startpos, lineindex.linestart(lineno + 1) - 1)
+        else:
+            line = self.reader.text(startpos, None)
+        column = len(self.reader.text(startpos, span.startpos))
 
         error = io.StringIO()
         error.writelines((
-            f'File {self.filename!r}, line {lineno}: {message}',
-            self.reader.source[startpos:endpos],
-            padstring('^' * (span.endpos - span.startpos), span.startpos)
+            f'File {self.filename!r}, line {lineno}: {message}\n',
+            line.rstrip('\r') + '\n',
+            padstring('^' * max(span.endpos - span.startpos, 1), column),
         ))
 
         return error.getvalue()
 
-    def create_span(self, startpos: int, endpos: Optional[int] = None) -> TextSpan:
+    def create_span(self, startpos: int, endpos: Optional[int] = None) -> Span:
+        if self.spanmode is SpanMode.NONE:
+            return None
+
         if endpos is None:
             endpos = self.position()
 
+        if self.spanmode is SpanMode.ARRAYS:
+            return self.spans.add(startpos, endpos)
+
         return TextSpan(startpos, endpos)
 
+    def extend_span(self, span: Span, other: Span) -> Span:
+        if self.spanmode is SpanMode.OBJECTS:
+            return span.extend(other)
+
+        if self.spanmode is SpanMode.ARRAYS:
+            return self.spans.extend(span, other)
+
+        return None
+
+    def resolve_span(self, span: Span) -> TextSpan:
+        if span is None:
+            position = self.position()
+            return TextSpan(position, position)
+
+        if isinstance(span, int):
+            return self.spans.get(span)
+
+        return span
+
     def position(self) -> int:
         return self.reader.tell()
 
-    def lineno(self, pos: int) -> int:
-        return bisect.bisect(self.linestarts, pos) + 1
+    def get_lineindex(self) -> LineIndex:
+        if self.lineindex is None:
+            self.lineindex = LineIndex.for_source(self.reader.source)
+
+        return self.lineindex
+
+    def lineno(self, pos: Optional[int] = None) -> int:
+        if pos is None:
+            pos = self.position()
+
+        return self.get_lineindex().lineno(pos)
 
     def linestart(self, lineno: int) -> int:
-        return self.linestarts[lineno - 1]
+        return self.get_lineindex().linestart(lineno)
+
+    def location(self, pos: Optional[int] = None) -> tuple[int, int]:
+        if pos is None:
+            pos = self.position()
+
+        return self.get_lineindex().location(pos)
 
     def scan(self) -> BaseToken:
         raise NotImplementedError
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterable, Optional
+
+from .encoding import EncodingDetector
+from .generator.generator import LRGenerator
+from .grammar.builder import GrammarBuilder
+from .grammar.modules import ModuleLoader, module_digests
+from .lexer.generator import build_lexer_tables
+from .lexer.tables import LexerTables
+from .parser.parser import GrammarParser
+from .runtime.tables import CompiledGrammar
+
+ARTIFACT_VERSION = 3
+ARTIFACT_SUFFIX = '.lrt'
+MANIFEST_NAME = '.lrpy-cache.json'
+
+# Imported modules are kept per process, so a module shared by several targets is only built once.
+_loader: Optional[ModuleLoader] = None
+
+
+def file_digest(path: str) -> str:
+    with open(path, 'rb') as fp:
+        return hashlib.sha256(fp.read()).hexdigest()
+
+
+class BuildTarget:
+    __slots__ = ('path', 'tokens', 'entrypoint', 'output')
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        tokens: Optional[str] = None,
+        entrypoint: Optional[str] = None,
+        output: str,
+    ) -> None:
+        self.path = path
+        self.tokens = tokens
+        self.entrypoint = entrypoint
+        self.output = output
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} {self.path!r} -> {self.output!r}>'
+
+    def digest(self) -> str:
+        digest = hashlib.sha256()
+        digest.update(
+            f'{ARTIFACT_VERSION}\0{sys.version_info[:2]}\0{self.entrypoint}\0'.encode()
+        )
+
+        for path in (self.path, self.tokens):
+            if path is None:
+                digest.update(b'\0')
+                continue
+
+            digest.update(bytes.fromhex(file_digest(path)))
+
+        return digest.hexdigest()
+
+
+class BuildResult:
+    __slots__ = ('target', 'digest', 'cached', 'elapsed', 'error')
+
+    def __init__(
+        self,
+        target: BuildTarget,
+        digest: str,
+        *,
+        cached: bool,
+        elapsed: float = 0.0,
+        error: Optional[str] = None,
+    ) -> None:
+        self.target = target
+        self.digest = digest
+        self.cached = cached
+        self.elapsed = elapsed
+        self.error = error
+
+    def __repr__(self) -> str:
+        status = 'error' if self.error is not None else 'hit' if self.cached else 'miss'
+        return f'<{self.__class__.__name__} {self.target.path!r} {status}>'
+
+
+def compile_grammar(
+    path: str,
+    *,
+    tokens: Optional[dict[str, int]] = None,
+    entrypoint: Optional[str] = None,
+    loader: Optional[ModuleLoader] = None,
+) -> tuple[CompiledGrammar, Optional[LexerTables], dict[str, str]]:
+    if loader is None:
+        loader = ModuleLoader()
+
+    with EncodingDetector.open(path) as fp:
+        source = fp.read()
+
+    builder = GrammarBuilder(
+        GrammarParser(source, filename=path).parse(),
+        tokens,
+        loader=loader,
+        directory=os.path.dirname(os.path.realpath(path)),
+    )
+    grammar = builder.build()
+    if entrypoint is None:
+        entrypoint = grammar.entrypoints[0].name
+
+    compiled = CompiledGrammar.from_generator(
+        LRGenerator(grammar, entrypoint), codes=loader.codes
+    )
+    return compiled, build_lexer_tables(grammar), module_digests(builder.dependencies)
+
+
+def write_artifact(
+    path: str, digest: str, grammar: CompiledGrammar, lexer: Optional[LexerTables]
+) -> None:
+    artifact = {'version': ARTIFACT_VERSION, 'digest': digest, 'grammar': grammar, 'lexer': lexer}
+
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as fp:
+        pickle.dump(artifact, fp, protocol=pickle.HIGHEST_PROTOCOL)
+
+    os.replace(temporary, path)
+
+
+def load_artifact(path: str) -> tuple[CompiledGrammar, Optional[LexerTables]]:
+    with open(path, 'rb') as fp:
+        artifact = pickle.load(fp)
+
+    if artifact.get('version') != ARTIFACT_VERSION:
+        raise ValueError(f'Unsupported grammar artifact version in {path!r}')
+
+    return artifact['grammar'], artifact['lexer']
+
+
+def _build_target(target: BuildTarget, digest: str) -> tuple[float, dict[str, str]]:
+    global _loader
+    if _loader is None:
+        _loader = ModuleLoader()
+
+    start = time.perf_counter()
+
+    tokens = None
+    if target.tokens is not None:
+        with open(target.tokens, encoding='utf-8') as fp:
+            tokens = json.load(fp)
+
+    grammar, lexer, dependencies = compile_grammar(
+        target.path, tokens=tokens, entrypoint=target.entrypoint, loader=_loader
+    )
+    write_artifact(target.output, digest, grammar, lexer)
+
+    return time.perf_counter() - start, dependencies
+
+
+class BuildCache:
+    __slots__ = ('path', 'entries')
+
+    def __init__(self, directory: str) -> None:
+        self.path = os.path.join(directory, MANIFEST_NAME)
+        self.entries: dict[str, dict[str, Any]] = {}
+
+        try:
+            with open(self.path, encoding='utf-8') as fp:
+                document = json.load(fp)
+        except (OSError, ValueError):
+            return
+
+        if document.get('version') == ARTIFACT_VERSION:
+            self.entries = document['entries']
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} {self.path!r} entries={len(self.entries)}>'
+
+    def is_fresh(self, target: BuildTarget, digest: str) -> bool:
+        entry = self.entries.get(target.output)
+        if entry is None or entry['digest'] != digest or not os.path.exists(target.output):
+            return False
+
+        try:
+            return all(
+                file_digest(path) == dependency
+                for path, dependency in entry['dependencies'].items()
+            )
+        except OSError:
+            return False
+
+    def update(self, target: BuildTarget, digest: str, dependencies: dict[str, str]) -> None:
+        self.entries[target.output] = {'digest': digest, 'dependencies': dependencies}
+
+    def save(self) -> None:
+        temporary = f'{self.path}.{os.getpid()}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as fp:
+            json.dump(
+                {'version': ARTIFACT_VERSION, 'entries': self.entries},
+                fp,
+                indent=2,
+                sort_keys=True,
+            )
+            fp.write('\n')
+
+        os.replace(temporary, self.path)
+
+
+def _collect(cache: BuildCache, target: BuildTarget, digest: str, build, *args) -> BuildResult:
+    try:
+        elapsed, dependencies = build(*args)
+    except Exception as exception:
+        return BuildResult(
+            target, digest, cached=False, error=f'{exception.__class__.__name__}: {exception}'
+        )
+
+    cache.update(target, digest, dependencies)
+    return BuildResult(target, digest, cached=False, elapsed=elapsed)
+
+
+def build_many(
+    targets: Iterable[BuildTarget],
+    cache: BuildCache,
+    *,
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> list[BuildResult]:
+    results: list[Optional[BuildResult]] = []
+    pending = []
+
+    for target in targets:
+        try:
+            digest = target.digest()
+        except OSError as exception:
+            results.append(BuildResult(target, '', cached=False, error=str(exception)))
+            continue
+
+        if not force and cache.is_fresh(target, digest):
+            results.append(BuildResult(target, digest, cached=True))
+        else:
+            pending.append((len(results), target, digest))
+            results.append(None)
+
+    if not pending:
+        return results
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    workers = min(workers, len(pending))
+    if workers <= 1:
+        for position, target, digest in pending:
+            results[position] = _collect(cache, target, digest, _build_target, target, digest)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_build_target, target, digest) for _, target, digest in pending
+            ]
+            for future, (position, target, digest) in zip(futures, pending):
+                results[position] = _collect(cache, target, digest, future.result)
+
+    cache.save()
+    return results
+
+
+def format_result(result: BuildResult) -> str:
+    if result.error is not None:
+        return f'error {result.target.path}: {result.error}'
+
+    if result.cached:
+        return f'hit   {result.target.path}'
+
+    return (
+        f'miss  {result.target.path} built in {result.elapsed * 1000:.1f} ms '
+        f'-> {result.target.output}'
+    )
+
+
+def summarize(results: list[BuildResult], elapsed: float) -> str:
+    hits = sum(1 for result in results if result.cached)
+    errors = sum(1 for result in results if result.error is not None)
+    built = len(results) - hits - errors
+
+    return (
+        f'{len(results)} grammars: {built} built, {hits} cached, {errors} failed '
+        f'in {elapsed:.2f} s'
+    )
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import bisect
+import mmap
+import re
+from array import array
+from typing import Optional, Union
+
+ByteSource = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+CLASS_OTHER = 0
+CLASS_WHITESPACE = 1
+CLASS_LINEBREAK = 2
+CLASS_COMMENT = 3
+CLASS_IDENTIFIER = 4
+CLASS_QUOTE = 5
+CLASS_SLASH = 6
+CLASS_BRACE = 7
+CLASS_PUNCTUATOR = 8
+
+
+def _build_classes() -> bytes:
+    classes = bytearray(256)
+
+    for byte in b' \t\f':
+        classes[byte] = CLASS_WHITESPACE
+
+    for byte in b'\r\n':
+        classes[byte] = CLASS_LINEBREAK
+
+    for byte in range(256):
+        if (
+            ord('a') <= byte <= ord('z')
+            or ord('A') <= byte <= ord('Z')
+            or byte == ord('_')
+            or byte >= 0x80
+        ):
+            classes[byte] = CLASS_IDENTIFIER
+
+    for byte in b'\'"':
+        classes[byte] = CLASS_QUOTE
+
+    for byte in b'()[]:+*$=.':
+        classes[byte] = CLASS_PUNCTUATOR
+
+    classes[ord('#')] = CLASS_COMMENT
+    classes[ord('/')] = CLASS_SLASH
+    classes[ord('{')] = CLASS_BRACE
+
+    return bytes(classes)
+
+
+BYTE_CLASSES = _build_classes()
+
+CONTINUATION_PATTERN = re.compile(rb'[\x80-\xbf]')
+
+
+class ByteReader:
+    __slots__ = ('source', '_position', '_continuations')
+
+    def __init__(self, source: ByteSource) -> None:
+        self.source = source
+        self._position = 0
+        self._continuations: Optional[array] = None
+
+    def reset(self, source: ByteSource) -> None:
+        self.source = source
+        self._position = 0
+        self._continuations = None
+
+    def at_eof(self) -> bool:
+        return self._position >= len(self.source)
+
+    def tell(self) -> int:
+        return self._position
+
+    def advance(self, amount: int = 1) -> None:
+        self._position += amount
+
+    def peek(self, offset: int = 0) -> int:
+        position = self._position + offset
+        if position >= len(self.source):
+            return -1
+
+        return self.source[position]
+
+    def text(self, startpos: int, endpos: Optional[int]) -> str:
+        return str(self.source[startpos:endpos], 'utf-8', 'replace')
+
+    def codepoint(self, offset: int) -> int:
+        if self._continuations is None:
+            self._continuations = array('q', (
+                match.start() for match in CONTINUATION_PATTERN.finditer(self.source)
+            ))
+
+        return offset - bisect.bisect_left(self._continuations, offset)
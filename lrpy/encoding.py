@@ -3,12 +3,42 @@ from __future__ import annotations
 import builtins
 import codecs
 import io
-from typing import Optional
+import mmap
+import os
+import re
+from typing import Optional, Union
 
+from .bytereader import ByteSource
 from .parser.exceptions import InvalidEncodingDeclarationError
+from .streamreader import DEFAULT_CHUNKSIZE, StreamReader
 from .stringreader import StringReader
 
 
+LINE_PATTERN = re.compile(rb'[^\n]*\n?')
+NEWLINE_PATTERN = re.compile(rb'\n')
+
+# Only this much of each line is copied when looking for an encoding declaration, so a minified or
+# single-line source is never copied as a whole.
+LINE_LIMIT = 1024
+
+
+class BufferLineReader:
+    def __init__(self, buffer: ByteSource) -> None:
+        self.buffer = buffer
+        self.position = 0
+
+    def readline(self) -> bytes:
+        match = LINE_PATTERN.match(self.buffer, self.position, self.position + LINE_LIMIT)
+        line = match.group()
+        self.position = match.end()
+
+        if not line.endswith(b'\n') and self.position < len(self.buffer):
+            newline = NEWLINE_PATTERN.search(self.buffer, self.position)
+            self.position = len(self.buffer) if newline is None else newline.end()
+
+        return line
+
+
 class EncodingDetector:
     def __init__(self, source: io.IOBase, default: str = 'utf-8') -> None:
         self.source = source
@@ -114,4 +144,55 @@ class EncodingDetector:
         fp = builtins.open(file, mode, *args, **kwargs)
 
         detector = cls(fp, default=encoding)
-        return io.TextIOWrapper(fp, encoding=detector.detect())
+        encoding = detector.detect()
+
+        fp.seek(0)
+        return io.TextIOWrapper(fp, encoding=encoding)
+
+    @classmethod
+    def from_buffer(cls, buffer: ByteSource, encoding: str = 'utf-8') -> Union[memoryview, str]:
+        view = memoryview(buffer).cast('B')
+
+        detector = cls(BufferLineReader(view), default=encoding)
+        encoding = codecs.lookup(detector.detect()).name
+
+        if encoding == 'utf-8-sig':
+            if view[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+                view = view[len(codecs.BOM_UTF8):]
+
+            return view
+
+        if encoding == 'utf-8':
+            return view
+
+        return str(view, encoding)
+
+    @classmethod
+    def open_mmap(cls, file, encoding: str = 'utf-8') -> Union[memoryview, str]:
+        with builtins.open(file, 'rb') as fp:
+            if os.fstat(fp.fileno()).st_size == 0:
+                return ''
+
+            buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # A decoded source no longer needs the mapping. A view owns it instead: the file stays
+        # mapped until the view and every slice of it are released (`with view:` or
+        # `view.release()`).
+        text = cls.from_buffer(buffer, encoding)
+        if isinstance(text, str):
+            buffer.close()
+
+        return text
+
+    @classmethod
+    def open_stream(
+        cls, file, encoding: str = 'utf-8', *, chunksize: int = DEFAULT_CHUNKSIZE
+    ) -> StreamReader:
+        fp = builtins.open(file, 'rb')
+
+        detector = cls(fp, default=encoding)
+        encoding = detector.detect()
+
+        # The reader owns the file. Close it with `close()` or a `with` block.
+        fp.seek(0)
+        return StreamReader(fp, encoding, chunksize=chunksize)
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from ..grammar.grammar import Grammar, NonterminalSymbol, Production, Symbol, TerminalSymbol
+
+Kernel = tuple[int, ...]
+Expansion = tuple[list[tuple[int, Kernel]], list[int], int]
+
+
+# Items are numbered consecutively within each production, so advancing an item is adding one,
+# and symbols are numbered with every terminal before every nonterminal.
+class EncodedGrammar:
+    __slots__ = (
+        'symbols',
+        'productions',
+        'itemsymbols',
+        'itemproductions',
+        'itempositions',
+        'productionids',
+        'firstitems',
+        'closures',
+        'start',
+    )
+
+    def __init__(self, grammar: Grammar, entrypoint: str) -> None:
+        self.symbols: list[Symbol] = []
+        terminalids: dict[str, int] = {}
+        nonterminalids: dict[str, int] = {}
+
+        for terminal in grammar.terminals.values():
+            terminalids[terminal.string] = len(self.symbols)
+            self.symbols.append(TerminalSymbol(string=terminal.string))
+
+        for nonterminal in grammar.nonterminals.values():
+            nonterminalids[nonterminal.name] = len(self.symbols)
+            self.symbols.append(NonterminalSymbol(name=nonterminal.name))
+
+        self.productions: list[Production] = []
+        self.itemsymbols: list[int] = []
+        self.itemproductions: list[int] = []
+        self.itempositions: list[int] = []
+        self.productionids: dict[Production, int] = {}
+        self.firstitems: list[int] = []
+
+        startitems: dict[int, list[int]] = {}
+        for nonterminal in grammar.nonterminals.values():
+            items = startitems[nonterminalids[nonterminal.name]] = []
+
+            for production in nonterminal.productions:
+                productionid = len(self.productions)
+                self.productions.append(production)
+                self.productionids.setdefault(production, productionid)
+                self.firstitems.append(len(self.itemsymbols))
+                items.append(len(self.itemsymbols))
+
+                for position, symbol in enumerate(production.symbols):
+                    if isinstance(symbol, NonterminalSymbol):
+                        self.itemsymbols.append(nonterminalids[symbol.name])
+                    else:
+                        self.itemsymbols.append(terminalids[symbol.string])
+
+                    self.itemproductions.append(productionid)
+                    self.itempositions.append(position)
+
+                self.itemsymbols.append(-1)
+                self.itemproductions.append(productionid)
+                self.itempositions.append(len(production.symbols))
+
+        self.closures: list[Optional[Kernel]] = [None] * len(self.symbols)
+        for symbol, items in startitems.items():
+            closure = set(items)
+            stack = list(items)
+
+            while stack:
+                target = startitems.get(self.itemsymbols[stack.pop()])
+                if target is None:
+                    continue
+
+                for item in target:
+                    if item not in closure:
+                        closure.add(item)
+                        stack.append(item)
+
+            self.closures[symbol] = tuple(sorted(closure))
+
+        self.start: Kernel = tuple(startitems[nonterminalids[entrypoint]])
+
+    def __repr__(self) -> str:
+        return (
+            f'<{self.__class__.__name__} symbols={len(self.symbols)} '
+            f'productions={len(self.productions)} items={len(self.itemsymbols)}>'
+        )
+
+    def __getstate__(self) -> dict[str, object]:
+        # Workers only need the integer tables.
+        return {
+            'itemsymbols': self.itemsymbols,
+            'closures': self.closures,
+            'start': self.start,
+        }
+
+    def __setstate__(self, state: dict[str, object]) -> None:
+        self.symbols = []
+        self.productions = []
+        self.itemproductions = []
+        self.itempositions = []
+        self.productionids = {}
+        self.firstitems = []
+
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def item(self, production: Production, position: int) -> int:
+        if not 0 <= position <= len(production.symbols):
+            raise ValueError(f'item position {position} is out of range for {production!r}')
+
+        return self.firstitems[self.productionids[production]] + position
+
+    def closure(self, kernel: Kernel) -> list[int]:
+        itemsymbols = self.itemsymbols
+        closures = self.closures
+
+        items = set(kernel)
+        for item in kernel:
+            symbol = itemsymbols[item]
+            if symbol >= 0:
+                closure = closures[symbol]
+                if closure is not None:
+                    items.update(closure)
+
+        return sorted(items)
+
+    def expand(self, kernel: Kernel) -> Expansion:
+        itemsymbols = self.itemsymbols
+
+        transitions: dict[int, list[int]] = {}
+        reductions = []
+
+        closure = self.closure(kernel)
+        for item in closure:
+            symbol = itemsymbols[item]
+            if symbol < 0:
+                reductions.append(item)
+                continue
+
+            try:
+                transitions[symbol].append(item + 1)
+            except KeyError:
+                transitions[symbol] = [item + 1]
+
+        return (
+            [(symbol, tuple(targets)) for symbol, targets in transitions.items()],
+            reductions,
+            len(closure),
+        )
+
+    def expand_many(self, kernels: list[Kernel]) -> list[Expansion]:
+        return [self.expand(kernel) for kernel in kernels]
@@ -1,14 +1,31 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
 from typing import Iterable, Optional
 
+from .encoded import EncodedGrammar, Expansion, Kernel
 from ..grammar.grammar import (
     Grammar,
+    Nonterminal,
     NonterminalSymbol,
     Production,
     Symbol,
     TerminalSymbol,
 )
+from ..stats import CompilationStats, phase
+
+MIN_PARALLEL_FRONTIER = 64
+
+_encoded: Optional[EncodedGrammar] = None
+
+
+def _initialize_worker(encoded: EncodedGrammar) -> None:
+    global _encoded
+    _encoded = encoded
+
+
+def _expand_chunk(kernels: list[Kernel]) -> list[Expansion]:
+    return _encoded.expand_many(kernels)
 
 
 class LRItem:
@@ -45,41 +62,44 @@ class LRItem:
         return self.__class__(self.production, self.position + 1)
 
 
-class LRGenerator:
-    __slots__ = (
-        'grammar',
-        'entrypoint',
-        'states',
-        'shifts',
-        'gotos',
-        'reductions',
-        'empty',
-        'first',
-        'follow',
-    )
+class GrammarAnalysis:
+    __slots__ = ('grammar', 'empty', 'first', 'stats')
 
-    def __init__(self, grammar: Grammar, entrypoint: str) -> None:
+    def __init__(self, grammar: Grammar, *, stats: Optional[CompilationStats] = None) -> None:
         self.grammar = grammar
-        self.entrypoint = self.grammar.nonterminals[entrypoint]
-
-        self.states = {}
-        self.shifts = []
-        self.gotos = []
-        self.reductions = []
+        self.stats = stats
 
         self.empty = self.calculate_empty()
         self.first = self.calculate_first()
 
+    def _unknown_nonterminals(self) -> list[Nonterminal]:
+        known = self.grammar.knownfirst
+        if not known:
+            return list(self.grammar.nonterminals.values())
+
+        return [
+            nonterminal for nonterminal in self.grammar.nonterminals.values()
+            if NonterminalSymbol(name=nonterminal.name) not in known
+        ]
+
     def calculate_empty(self):
-        symbols = set()
-        for nonterminal in self.grammar.nonterminals.values():
+        with phase(self.stats, 'empty'):
+            return self._calculate_empty()
+
+    def _calculate_empty(self):
+        nonterminals = self._unknown_nonterminals()
+
+        symbols = set(self.grammar.knownempty)
+        for nonterminal in nonterminals:
             if not all(production.symbols for production in nonterminal.productions):
                 symbols.add(NonterminalSymbol(name=nonterminal.name))
 
+        iterations = 0
         while True:
             changed = False
+            iterations += 1
 
-            for nonterminal in self.grammar.nonterminals.values():
+            for nonterminal in nonterminals:
                 if any(
                     symbols.issuperset(production.symbols) for production in nonterminal.productions
                 ):
@@ -89,15 +109,25 @@ class LRGenerator:
                         changed = True
 
             if not changed:
+                if self.stats is not None:
+                    self.stats.empty_iterations = iterations
+
                 return symbols
 
     def calculate_first(self):
+        with phase(self.stats, 'first'):
+            return self._calculate_first()
+
+    def _calculate_first(self):
         symbols = {}
         for terminal in self.grammar.terminals.values():
             symbol = TerminalSymbol(string=terminal.string)
             symbols[symbol] = {symbol}
 
-        for nonterminal in self.grammar.nonterminals.values():
+        symbols.update(self.grammar.knownfirst)
+
+        pending = []
+        for nonterminal in self._unknown_nonterminals():
             first = set()
             for production in nonterminal.productions:
                 for symbol in production.symbols:
@@ -105,42 +135,120 @@ class LRGenerator:
                     if symbol not in self.empty:
                         break
 
-            symbol = NonterminalSymbol(name=nonterminal.name)
-            symbols[symbol] = first
+            symbols[NonterminalSymbol(name=nonterminal.name)] = first
+            pending.append(first)
 
+        iterations = 0
         while True:
             changed = False
+            iterations += 1
 
-            for symbol, first in symbols.items():
+            for first in pending:
                 length = len(first)
                 for sym in tuple(first):
-                    symbols[symbol].update(symbols[sym])
+                    first.update(symbols[sym])
 
                 if len(first) > length:
                     changed = True
 
             if not changed:
+                if self.stats is not None:
+                    self.stats.first_iterations = iterations
+
+                return symbols
+
+
+class LRGenerator(GrammarAnalysis):
+    __slots__ = (
+        'entrypoint',
+        'states',
+        'shifts',
+        'gotos',
+        'reductions',
+        'follow',
+        'encoded',
+    )
+
+    def __init__(
+        self, grammar: Grammar, entrypoint: str, *, stats: Optional[CompilationStats] = None
+    ) -> None:
+        self.entrypoint = grammar.nonterminals[entrypoint]
+
+        self.states = {}
+        self.shifts = []
+        self.gotos = []
+        self.reductions = []
+        self.encoded: Optional[EncodedGrammar] = None
+
+        super().__init__(grammar, stats=stats)
+        self.follow = self.calculate_follow()
+
+    def calculate_follow(self):
+        with phase(self.stats, 'follow'):
+            return self._calculate_follow()
+
+    def _calculate_follow(self):
+        symbols = {}
+        for nonterminal in self.grammar.nonterminals.values():
+            symbols[NonterminalSymbol(name=nonterminal.name)] = set()
+
+        symbols[NonterminalSymbol(name=self.entrypoint.name)].add(None)
+
+        iterations = 0
+        while True:
+            changed = False
+            iterations += 1
+
+            for nonterminal in self.grammar.nonterminals.values():
+                follow = symbols[NonterminalSymbol(name=nonterminal.name)]
+
+                for production in nonterminal.productions:
+                    for index, symbol in enumerate(production.symbols):
+                        if not isinstance(symbol, NonterminalSymbol):
+                            continue
+
+                        symbolfollow = symbols[symbol]
+                        length = len(symbolfollow)
+
+                        for sym in production.symbols[index + 1:]:
+                            symbolfollow.update(
+                                first for first in self.first[sym]
+                                if isinstance(first, TerminalSymbol)
+                            )
+                            if sym not in self.empty:
+                                break
+                        else:
+                            symbolfollow.update(follow)
+
+                        if len(symbolfollow) > length:
+                            changed = True
+
+            if not changed:
+                if self.stats is not None:
+                    self.stats.follow_iterations = iterations
+
                 return symbols
 
+    def encoded_grammar(self) -> EncodedGrammar:
+        if self.encoded is None:
+            self.encoded = EncodedGrammar(self.grammar, self.entrypoint.name)
+
+        return self.encoded
+
     def items(self, symbol: NonterminalSymbol) -> frozenset[LRItem]:
         nonterminal = self.grammar.nonterminals[symbol.name]
         return frozenset(LRItem(production, 0) for production in nonterminal.productions)
 
+    # Only states built by `build_states()` are counted in the stats, so these helpers leave them
+    # alone.
     def closure(self, items: Iterable[LRItem]) -> frozenset[LRItem]:
-        closure = set(items)
-        stack = [item for item in items if item.is_nonterminal()]
-
-        while stack:
-            for item in self.items(stack.pop().symbol):
-                if item in closure:
-                    continue
-
-                closure.add(item)
+        encoded = self.encoded_grammar()
+        kernel = tuple(encoded.item(item.production, item.position) for item in items)
 
-                if item.is_nonterminal():
-                    stack.append(item)
-
-        return frozenset(closure)
+        return frozenset(
+            LRItem(encoded.productions[encoded.itemproductions[item]], encoded.itempositions[item])
+            for item in encoded.closure(kernel)
+        )
 
     def transitions(self, items: Iterable[LRItem]) -> dict[TerminalSymbol, frozenset[LRItem]]:
         transitions = {}
@@ -155,32 +263,103 @@ class LRGenerator:
 
         return {symbol: frozenset(items) for symbol, items in transitions.items()}
 
-    def build_states(self) -> None:
-        self.states[self.items(self.entrypoint)] = 0
-        stack = list(self.states)
-
-        while stack:
-            transitions = self.transitions(self.closure(stack.pop(0)))
-
-            shifts = {}
-            gotos = {}
-            reductions = []
-
-            for symbol, items in transitions.items():
-                if symbol is not None:
-                    try:
-                        stateno = self.states[items]
-                    except KeyError:
-                        stateno = self.states[items] = len(self.states)
-                        stack.append(items)
-
-                    if isinstance(symbol, NonterminalSymbol):
-                        gotos[symbol] = stateno
-                    else:
-                        shifts[symbol] = stateno
-                else:
-                    reductions.extend(items)
+    def build_states(self, *, workers: int = 1, batchsize: Optional[int] = None) -> None:
+        with phase(self.stats, 'states'):
+            self._build_states(workers, batchsize)
+
+        if self.stats is not None:
+            self._collect_state_stats()
+
+    def _build_states(self, workers: int, batchsize: Optional[int]) -> None:
+        encoded = self.encoded_grammar()
+        symbols = encoded.symbols
 
-            self.shifts.append(shifts)
-            self.gotos.append(gotos)
-            self.reductions.append(reductions)
+        decoded: dict[int, LRItem] = {}
+
+        def decode(item: int) -> LRItem:
+            try:
+                return decoded[item]
+            except KeyError:
+                production = encoded.productions[encoded.itemproductions[item]]
+                lritem = decoded[item] = LRItem(production, encoded.itempositions[item])
+                return lritem
+
+        kernels = [encoded.start]
+        statenos = {encoded.start: 0}
+        closureitems = 0
+
+        pool = None
+        if workers > 1:
+            pool = ProcessPoolExecutor(
+                max_workers=workers, initializer=_initialize_worker, initargs=(encoded,)
+            )
+
+        try:
+            # States are expanded one frontier at a time and numbered in frontier order, which
+            # numbers them exactly as a serial breadth-first build does.
+            frontier = 0
+            while frontier < len(kernels):
+                batch = kernels[frontier:]
+                frontier = len(kernels)
+
+                if pool is None or len(batch) < MIN_PARALLEL_FRONTIER:
+                    expansions = encoded.expand_many(batch)
+                else:
+                    size = batchsize or max(len(batch) // (workers * 4), 1)
+                    chunks = [batch[index:index + size] for index in range(0, len(batch), size)]
+
+                    expansions = []
+                    for chunk in pool.map(_expand_chunk, chunks):
+                        expansions.extend(chunk)
+
+                for transitions, reductions, length in expansions:
+                    shifts = {}
+                    gotos = {}
+
+                    for symbol, kernel in transitions:
+                        try:
+                            stateno = statenos[kernel]
+                        except KeyError:
+                            stateno = statenos[kernel] = len(kernels)
+                            kernels.append(kernel)
+
+                        if isinstance(symbols[symbol], NonterminalSymbol):
+                            gotos[symbols[symbol]] = stateno
+                        else:
+                            shifts[symbols[symbol]] = stateno
+
+                    self.shifts.append(shifts)
+                    self.gotos.append(gotos)
+                    self.reductions.append([decode(item) for item in reductions])
+                    closureitems += length
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        for stateno, kernel in enumerate(kernels):
+            self.states[frozenset(decode(item) for item in kernel)] = stateno
+
+        if self.stats is not None:
+            self.stats.closure_calls += len(kernels)
+            self.stats.closure_items += closureitems
+
+    def _collect_state_stats(self) -> None:
+        stats = self.stats
+        stats.states = len(self.states)
+        stats.shifts = sum(len(shifts) for shifts in self.shifts)
+        stats.gotos = sum(len(gotos) for gotos in self.gotos)
+        stats.reductions = sum(len(reductions) for reductions in self.reductions)
+
+        actions = 0
+        for shifts, reductions in zip(self.shifts, self.reductions):
+            keys = set(shifts)
+            for item in reductions:
+                keys.update(self.follow[NonterminalSymbol(name=item.production.nonterminal)])
+
+            actions += len(keys)
+
+        # The action table has a column for every terminal plus end of input.
+        columns = len(self.grammar.terminals) + 1
+        if stats.states:
+            stats.action_density = actions / (stats.states * columns)
+            stats.goto_density = stats.gotos / (stats.states * len(self.grammar.nonterminals))
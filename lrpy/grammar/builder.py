@@ -1,24 +1,56 @@
 from __future__ import annotations
 
-from .exceptions import MissingEntryPointError, UnknownSymbolError
+from typing import TYPE_CHECKING, Optional
+
+from .exceptions import DuplicateSymbolError, MissingEntryPointError, UnknownSymbolError
 from .grammar import (
+    ERROR,
     Action,
     Grammar,
     Nonterminal,
     NonterminalSymbol,
+    Pattern,
     Production,
     Symbol,
     Terminal,
     TerminalSymbol,
 )
 from ..parser import ast
+from ..stats import CompilationStats, phase
+
+if TYPE_CHECKING:
+    from .modules import GrammarModule, ModuleLoader
 
 
 class GrammarBuilder:
-    def __init__(self, node: ast.GrammarNode, tokens: dict[str, int]) -> None:
+    def __init__(
+        self,
+        node: ast.GrammarNode,
+        tokens: Optional[dict[str, int]] = None,
+        *,
+        loader: Optional[ModuleLoader] = None,
+        directory: Optional[str] = None,
+        module: bool = False,
+        stats: Optional[CompilationStats] = None,
+    ) -> None:
         self.node = node
-        self.tokens = tokens
+        self.tokens = dict(tokens) if tokens is not None else {}
         self.grammar = Grammar()
+        self.loader = loader
+        self.directory = directory
+        self.module = module
+        self.stats = stats
+
+        self.declarations: list[ast.TokenNode] = []
+        self.exports: list[str] = []
+        self.dependencies: list[GrammarModule] = []
+
+        self._external = dict(self.tokens)
+        self._literals = {}
+        self._patterns = {}
+        self._imported = set()
+        self._imports: dict[str, GrammarModule] = {}
+        self._includes = 0
 
         self._groups = 0
         self._optionals = 0
@@ -40,8 +72,16 @@ class GrammarBuilder:
         if isinstance(item, ast.GroupItemNode):
             return self._create_group_symbol(item)
 
+        if isinstance(item, ast.NamedItemNode):
+            return self._expand_item(item.item)
+
+        raise TypeError(f'Unexpected item {item.__class__.__name__}')
+
     def _create_symbol(self, item: ast.ItemNode) -> Symbol:
         if isinstance(item, ast.StringItemNode):
+            if item.string in self._literals:
+                return TerminalSymbol(string=self._literals[item.string])
+
             if item.string not in self.tokens:
                 raise UnknownSymbolError(f'Unknown symbol {item.string!r}')
 
@@ -51,13 +91,28 @@ class GrammarBuilder:
             if item.identifier in self.grammar.nonterminals:
                 return NonterminalSymbol(name=item.identifier)
 
-            if item.identifier not in self.tokens:
-                raise UnknownSymbolError(f'Unknown symbol {item.identifier!r}')
+            if item.identifier in self.tokens:
+                return TerminalSymbol(string=item.identifier)
 
-            return TerminalSymbol(string=item.identifier)
+            alias, _, name = item.identifier.partition('.')
+            module = self._imports.get(alias)
+            if module is not None and name in module.tokennames:
+                return TerminalSymbol(string=name)
+
+            if item.identifier == ERROR:
+                return self._create_error_symbol()
+
+            raise UnknownSymbolError(f'Unknown symbol {item.identifier!r}')
 
         raise TypeError('Expected StringItenNode or IdentifierItemNode')
 
+    def _create_error_symbol(self) -> Symbol:
+        if ERROR not in self.grammar.terminals:
+            value = self.tokens.setdefault(ERROR, max(self.tokens.values(), default=0) + 1)
+            self.grammar.add_terminal(Terminal(string=ERROR, value=value, pattern=None))
+
+        return TerminalSymbol(string=ERROR)
+
     def _create_optional_symbol(self, item: ast.ItemNode) -> Symbol:
         if not isinstance(item, ast.OptionalItemNode):
             raise TypeError('Expected OptionalItemNode')
@@ -96,7 +151,7 @@ class GrammarBuilder:
         production = Production()
         production.add_symbol(symbol)
 
-        action = Action(body='return [__symbol__]')
+        action = Action(body='return [__symbol__]', repeat=True)
         action.add_name(0, '__symbol__')
 
         production.set_action(action)
@@ -106,9 +161,9 @@ class GrammarBuilder:
         production.add_symbol(NonterminalSymbol(name=name))
         production.add_symbol(symbol)
 
-        action = Action(body='__symbols__.append(__symbol__); return __symbols__')
-        action.add_name(0, '__symbol__')
-        action.add_name(1, '__symbols__')
+        action = Action(body='__symbols__.append(__symbol__); return __symbols__', repeat=True)
+        action.add_name(0, '__symbols__')
+        action.add_name(1, '__symbol__')
 
         production.set_action(action)
         nonterminal.add_production(production)
@@ -124,7 +179,7 @@ class GrammarBuilder:
 
     def _create_group_symbol(self, item: ast.ItemNode) -> Symbol:
         if not isinstance(item, ast.GroupItemNode):
-            return TypeError('Expected GroupItemNode')
+            raise TypeError('Expected GroupItemNode')
 
         name = f'__Group{self._groups}__'
         self._groups += 1
@@ -135,18 +190,119 @@ class GrammarBuilder:
         for item in item.items:
             production.add_symbol(self._expand_item(item))
 
+        nonterminal.add_production(production)
+
         self.grammar.add_nonterminal(nonterminal)
         return NonterminalSymbol(name=name)
 
+    def _declare_token(self, token: ast.TokenNode, *, imported: bool = False) -> None:
+        if token.name == ERROR:
+            raise DuplicateSymbolError(f'{ERROR!r} is reserved for error recovery')
+
+        pattern = Pattern(string=token.pattern, regex=token.regex)
+
+        if token.name in self._patterns:
+            # Modules share one token namespace, so the same declaration may arrive from several.
+            if (
+                (imported or token.name in self._imported)
+                and self._patterns[token.name] == pattern
+                and (token.name in self.grammar.ignored) == token.ignore
+            ):
+                return
+
+            raise DuplicateSymbolError(f'Duplicate token {token.name!r}')
+
+        if imported:
+            self._imported.add(token.name)
+
+        self._patterns[token.name] = pattern
+        self.declarations.append(token)
+
+        if token.ignore:
+            self.grammar.add_ignored(token.name, pattern)
+            return
+
+        if not token.regex:
+            self._literals[token.pattern] = token.name
+
+        if token.name not in self.tokens:
+            self.tokens[token.name] = max(self.tokens.values(), default=0) + 1
+
     def build(self) -> Grammar:
+        with phase(self.stats, 'build'):
+            grammar = self._build()
+
+        if self.stats is not None:
+            self.stats.optionals = self._optionals
+            self.stats.repeats = self._repeats
+            self.stats.groups = self._groups
+            self.stats.nonterminals = len(grammar.nonterminals)
+            self.stats.productions = sum(
+                len(nonterminal.productions) for nonterminal in grammar.nonterminals.values()
+            )
+
+        return grammar
+
+    def _import_module(self, node: ast.ImportNode) -> None:
+        if self.loader is None:
+            from .modules import ModuleLoader
+
+            self.loader = ModuleLoader()
+
+        module = self.loader.load(
+            self.loader.resolve(node.path, self.directory), tokens=self._external
+        )
+        self.dependencies.append(module)
+
+        for token in module.tokens:
+            self._declare_token(token, imported=True)
+
+        if node.alias is not None:
+            if node.alias in self._imports:
+                raise DuplicateSymbolError(f'Duplicate import {node.alias!r}')
+
+            self._imports[node.alias] = module
+            nonterminals, empty, first = module.namespaced(node.alias)
+        else:
+            namespace = f'__Include{self._includes}__'
+            self._includes += 1
+
+            self.exports.extend(module.exports)
+            nonterminals, empty, first = module.namespaced(namespace, include=True)
+
+        for nonterminal in nonterminals:
+            if nonterminal.name in self.grammar.nonterminals:
+                raise DuplicateSymbolError(f'Duplicate rule {nonterminal.name!r}')
+
+            self.grammar.add_nonterminal(nonterminal)
+
+            for production in nonterminal.productions:
+                if TerminalSymbol(string=ERROR) in production.symbols:
+                    self._create_error_symbol()
+
+        self.grammar.add_analysis(empty, first)
+
+    def _build(self) -> Grammar:
+        for node in self.node.imports:
+            self._import_module(node)
+
+        for token in self.node.tokens:
+            self._declare_token(token)
+
         for string, value in self.tokens.items():
-            self.grammar.add_terminal(Terminal(string=string, value=value))
+            pattern = self._patterns.get(string)
+            self.grammar.add_terminal(Terminal(string=string, value=value, pattern=pattern))
 
+        imported = set(self.grammar.nonterminals)
         for rule in self.node.rules:
-            if rule.toplevel:
+            if rule.name in imported:
+                raise DuplicateSymbolError(f'Duplicate rule {rule.name!r}')
+
+            if rule.toplevel and not self.module:
                 self.grammar.add_entrypoint(NonterminalSymbol(name=rule.name))
 
             self.grammar.add_nonterminal(Nonterminal(name=rule.name))
+            self.exports.append(rule.name)
 
         for rule in self.node.rules:
             nonterminal = self.grammar.nonterminals[rule.name]
@@ -166,9 +322,10 @@ class GrammarBuilder:
 
                     production.add_symbol(self._expand_item(item))
 
+                production.set_action(action)
                 nonterminal.add_production(production)
 
-        if not self.grammar.entrypoints:
+        if not self.grammar.entrypoints and not self.module:
             raise MissingEntryPointError(
                 'Grammar has no entrypoint. Use \'$\' to denote an entrypoint'
             )
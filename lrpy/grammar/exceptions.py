@@ -4,3 +4,11 @@ class UnknownSymbolError(Exception):
 
 class MissingEntryPointError(Exception):
     pass
+
+
+class DuplicateSymbolError(Exception):
+    pass
+
+
+class GrammarImportError(Exception):
+    pass
@@ -2,19 +2,29 @@ from __future__ import annotations
 
 from typing import Optional, Union
 
+# Name of the pseudo-terminal that rules use to catch syntax errors. The lexer never produces it.
+ERROR = 'error'
+
 
 class Grammar:
-    __slots__ = ('entrypoints', 'terminals', 'nonterminals')
+    __slots__ = (
+        'entrypoints', 'terminals', 'nonterminals', 'ignored', 'knownempty', 'knownfirst'
+    )
 
     def __init__(self) -> None:
         self.entrypoints: list[NonterminalSymbol] = []
         self.terminals: dict[str, Terminal] = {}
         self.nonterminals: dict[str, Nonterminal] = {}
+        self.ignored: dict[str, Pattern] = {}
+
+        # Empty and FIRST sets already computed for nonterminals from imported modules.
+        self.knownempty: set[NonterminalSymbol] = set()
+        self.knownfirst: dict[NonterminalSymbol, set[Symbol]] = {}
 
     def __repr__(self) -> str:
         return (
-            f'Grammar(entrypoints={self.entrypoints!r}, '
-            f'terminals={self.terminals!r}, nonterminals={self.nonterminals!r})'
+            f'Grammar(entrypoints={self.entrypoints!r}, terminals={self.terminals!r}, '
+            f'nonterminals={self.nonterminals!r}, ignored={self.ignored!r})'
         )
 
     def add_entrypoint(self, entrypoint: str) -> None:
@@ -26,6 +36,15 @@ class Grammar:
     def add_nonterminal(self, nonterminal: Nonterminal) -> None:
         self.nonterminals[nonterminal.name] = nonterminal
 
+    def add_ignored(self, name: str, pattern: Pattern) -> None:
+        self.ignored[name] = pattern
+
+    def add_analysis(
+        self, empty: set[NonterminalSymbol], first: dict[NonterminalSymbol, set[Symbol]]
+    ) -> None:
+        self.knownempty.update(empty)
+        self.knownfirst.update(first)
+
 
 class Nonterminal:
     __slots__ = ('name', 'productions')
@@ -54,15 +73,39 @@ class Nonterminal:
         self.productions.append(production)
 
 
+class Pattern:
+    __slots__ = ('string', 'regex')
+
+    def __init__(self, *, string: str, regex: bool) -> None:
+        self.string = string
+        self.regex = regex
+
+    def __hash__(self):
+        return hash((self.string, self.regex))
+
+    def __eq__(self, other):
+        if not isinstance(other, Pattern):
+            return NotImplemented
+
+        return (
+            self.string == other.string
+            and self.regex == other.regex
+        )
+
+    def __repr__(self) -> str:
+        return f'Pattern(string={self.string!r}, regex={self.regex!r})'
+
+
 class Terminal:
-    __slots__ = ('string', 'value')
+    __slots__ = ('string', 'value', 'pattern')
 
-    def __init__(self, *, string: str, value: int) -> None:
+    def __init__(self, *, string: str, value: int, pattern: Optional[Pattern] = None) -> None:
         self.string = string
         self.value = value
+        self.pattern = pattern
 
     def __hash__(self):
-        return hash((self.string, self.value))
+        return hash((self.string, self.value, self.pattern))
 
     def __eq__(self, other):
         if not isinstance(other, Terminal):
@@ -71,10 +114,13 @@ class Terminal:
         return (
             self.string == other.string
             and self.value == other.value
+            and self.pattern == other.pattern
         )
 
     def __repr__(self) -> str:
-        return f'Terminal(string={self.string!r}, value={self.value!r})'
+        return (
+            f'Terminal(string={self.string!r}, value={self.value!r}, pattern={self.pattern!r})'
+        )
 
 
 class NonterminalSymbol:
@@ -116,14 +162,15 @@ class TerminalSymbol:
 
 
 class Action:
-    __slots__ = ('names', 'body')
+    __slots__ = ('names', 'body', 'repeat')
 
-    def __init__(self, *, body: str) -> None:
+    def __init__(self, *, body: str, repeat: bool = False) -> None:
         self.names: list[tuple[int, str]] = []
         self.body = body
+        self.repeat = repeat
 
     def __hash__(self):
-        return hash((tuple(self.names), self.body))
+        return hash((tuple(self.names), self.body, self.repeat))
 
     def __eq__(self, other):
         if not isinstance(other, Action):
@@ -132,10 +179,11 @@ class Action:
         return (
             self.names == other.names
             and self.body == other.body
+            and self.repeat == other.repeat
         )
 
     def __repr__(self) -> str:
-        return f'Action(names={self.names!r}, body={self.body!r})'
+        return f'Action(names={self.names!r}, body={self.body!r}, repeat={self.repeat!r})'
 
     def add_name(self, index: int, name: str) -> None:
         self.names.append((index, name))
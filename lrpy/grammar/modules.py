@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from types import CodeType
+from typing import TYPE_CHECKING, Iterable, Mapping, Optional
+
+from .builder import GrammarBuilder
+from .exceptions import GrammarImportError
+from .grammar import Nonterminal, NonterminalSymbol, Production, Symbol
+from ..encoding import EncodingDetector
+from ..generator.generator import GrammarAnalysis
+from ..parser import ast
+from ..parser.parser import GrammarParser
+
+if TYPE_CHECKING:
+    from ..parser.astcache import ASTCache
+
+Namespaced = tuple[
+    list[Nonterminal], set[NonterminalSymbol], dict[NonterminalSymbol, set[Symbol]]
+]
+
+
+class GrammarModule:
+    __slots__ = (
+        'path',
+        'digest',
+        'dependencies',
+        'tokens',
+        'nonterminals',
+        'exports',
+        'empty',
+        'first',
+        'namespaces',
+    )
+
+    def __init__(
+        self,
+        path: str,
+        digest: str,
+        *,
+        dependencies: list[GrammarModule],
+        tokens: list[ast.TokenNode],
+        nonterminals: list[Nonterminal],
+        exports: list[str],
+        empty: set[NonterminalSymbol],
+        first: dict[NonterminalSymbol, set[Symbol]],
+    ) -> None:
+        self.path = path
+        self.digest = digest
+        self.dependencies = dependencies
+        self.tokens = tokens
+        self.nonterminals = nonterminals
+        self.exports = exports
+        self.empty = empty
+        self.first = first
+        self.namespaces: dict[str, Namespaced] = {}
+
+    def __repr__(self) -> str:
+        return (
+            f'<{self.__class__.__name__} {self.path!r} '
+            f'nonterminals={len(self.nonterminals)} tokens={len(self.tokens)}>'
+        )
+
+    @property
+    def tokennames(self) -> set[str]:
+        return {token.name for token in self.tokens}
+
+    def namespaced(self, namespace: str, *, include: bool = False) -> Namespaced:
+        try:
+            return self.namespaces[namespace]
+        except KeyError:
+            pass
+
+        exports = set(self.exports) if include else set()
+
+        def rename(name: str) -> str:
+            return name if name in exports else f'{namespace}.{name}'
+
+        def rename_symbol(symbol: Symbol) -> Symbol:
+            if isinstance(symbol, NonterminalSymbol):
+                return NonterminalSymbol(name=rename(symbol.name))
+
+            return symbol
+
+        nonterminals = []
+        for nonterminal in self.nonterminals:
+            copy = Nonterminal(name=rename(nonterminal.name))
+
+            for production in nonterminal.productions:
+                renamed = Production()
+                for symbol in production.symbols:
+                    renamed.add_symbol(rename_symbol(symbol))
+
+                renamed.set_action(production.action)
+                copy.add_production(renamed)
+
+            nonterminals.append(copy)
+
+        empty = {rename_symbol(symbol) for symbol in self.empty}
+        first = {
+            rename_symbol(symbol): {rename_symbol(sym) for sym in symbols}
+            for symbol, symbols in self.first.items()
+        }
+
+        namespaced = self.namespaces[namespace] = (nonterminals, empty, first)
+        return namespaced
+
+
+def module_digests(modules: Iterable[GrammarModule]) -> dict[str, str]:
+    digests = {}
+    stack = list(modules)
+
+    while stack:
+        module = stack.pop()
+        if module.path not in digests:
+            digests[module.path] = module.digest
+            stack.extend(module.dependencies)
+
+    return digests
+
+
+class ModuleLoader:
+    __slots__ = ('modules', 'loading', 'astcache', 'codes')
+
+    def __init__(self, *, astcache: Optional[ASTCache] = None) -> None:
+        # A module is built once per token map, since the map decides which names are tokens.
+        self.modules: dict[tuple[str, frozenset[str]], GrammarModule] = {}
+        self.loading: list[str] = []
+        self.astcache = astcache
+        self.codes: dict[tuple[str, str], CodeType] = {}
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} modules={len(self.modules)}>'
+
+    def resolve(self, path: str, directory: Optional[str] = None) -> str:
+        if directory is None:
+            directory = os.getcwd()
+
+        return os.path.realpath(os.path.join(directory, path))
+
+    def load(self, path: str, *, tokens: Optional[Mapping[str, int]] = None) -> GrammarModule:
+        if path in self.loading:
+            cycle = self.loading[self.loading.index(path):] + [path]
+            raise GrammarImportError(f'Import cycle: {" -> ".join(cycle)}')
+
+        try:
+            with open(path, 'rb') as fp:
+                source = fp.read()
+        except OSError as exception:
+            raise GrammarImportError(f'Cannot import {path!r}: {exception}') from exception
+
+        digest = hashlib.sha256(source).hexdigest()
+
+        key = (path, frozenset(tokens) if tokens is not None else frozenset())
+        module = self.modules.get(key)
+        if (
+            module is not None
+            and module.digest == digest
+            and all(
+                self.load(dependency.path, tokens=tokens) is dependency
+                for dependency in module.dependencies
+            )
+        ):
+            return module
+
+        self.loading.append(path)
+        try:
+            module = self._build(path, source, digest, tokens)
+        finally:
+            self.loading.pop()
+
+        self.modules[key] = module
+        return module
+
+    def _build(
+        self, path: str, source: bytes, digest: str, tokens: Optional[Mapping[str, int]]
+    ) -> GrammarModule:
+        text = EncodingDetector.from_buffer(source)
+        if self.astcache is not None:
+            node = self.astcache.parse(text, filename=path)
+        else:
+            node = GrammarParser(text, filename=path).parse()
+
+        builder = GrammarBuilder(
+            node, tokens, loader=self, directory=os.path.dirname(path), module=True
+        )
+        grammar = builder.build()
+        analysis = GrammarAnalysis(grammar)
+
+        return GrammarModule(
+            path,
+            digest,
+            dependencies=builder.dependencies,
+            tokens=builder.declarations,
+            nonterminals=list(grammar.nonterminals.values()),
+            exports=builder.exports,
+            empty=analysis.empty,
+            first={
+                symbol: first for symbol, first in analysis.first.items()
+                if isinstance(symbol, NonterminalSymbol)
+            },
+        )
@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import bisect
+from array import array
+from typing import Iterable, Optional
+
+from .exceptions import InvalidPatternError
+from .regex import NFA, CharsetNode, ConcatNode, RegexParser, Ranges
+from .tables import LexerTables
+from ..grammar.grammar import Grammar, Pattern
+
+
+class LexerGenerator:
+    __slots__ = ('grammar', 'names', 'values', 'patterns', 'nfa', 'points')
+
+    def __init__(self, grammar: Grammar) -> None:
+        self.grammar = grammar
+
+        declarations = []
+        for terminal in grammar.terminals.values():
+            if terminal.pattern is not None:
+                declarations.append((terminal.string, terminal.value, terminal.pattern))
+
+        for name, pattern in grammar.ignored.items():
+            declarations.append((name, None, pattern))
+
+        declarations.sort(key=lambda declaration: declaration[2].regex)
+
+        self.names = tuple(name for name, _, _ in declarations)
+        self.values = tuple(value for _, value, _ in declarations)
+        self.patterns = tuple(pattern for _, _, pattern in declarations)
+
+        self.nfa = NFA()
+        self.points = []
+
+    def parse_pattern(self, pattern: Pattern):
+        parser = RegexParser(pattern.string)
+        if pattern.regex:
+            return parser.parse()
+
+        return parser.parse_literal()
+
+    def literal_text(self, pattern: Pattern) -> Optional[str]:
+        node = RegexParser(pattern.string).parse_literal()
+        nodes = node.nodes if isinstance(node, ConcatNode) else [node]
+
+        chars = []
+        for node in nodes:
+            if (
+                not isinstance(node, CharsetNode)
+                or len(node.ranges) != 1
+                or node.ranges[0][0] != node.ranges[0][1]
+            ):
+                return None
+
+            chars.append(chr(node.ranges[0][0]))
+
+        return ''.join(chars)
+
+    def build_nfa(self, indices: Iterable[int]) -> int:
+        self.nfa = NFA()
+
+        startstate = self.nfa.add_state()
+        for index in indices:
+            self.nfa.add_pattern(startstate, self.parse_pattern(self.patterns[index]), index)
+
+        points = set()
+        for edges in self.nfa.edges:
+            for ranges, _ in edges:
+                for lo, hi in ranges:
+                    points.add(lo)
+                    points.add(hi + 1)
+
+        self.points = sorted(points)
+        return startstate
+
+    def atoms(self, ranges: Ranges) -> list[int]:
+        atoms = []
+        for lo, hi in ranges:
+            atoms.extend(range(
+                bisect.bisect_left(self.points, lo), bisect.bisect_left(self.points, hi + 1)
+            ))
+
+        return atoms
+
+    def accept(self, states: frozenset[int]) -> tuple[int, ...]:
+        return tuple(sorted(
+            self.nfa.accepts[state] for state in states if state in self.nfa.accepts
+        ))
+
+    def build_dfa(
+        self, startstate: int
+    ) -> tuple[list[dict[int, int]], list[tuple[int, ...]]]:
+        atomcache = {}
+
+        start = self.nfa.closure((startstate,))
+        states = {start: 0}
+        stack = [start]
+        transitions = []
+        accepts = []
+
+        while stack:
+            nfastates = stack.pop(0)
+
+            moves = {}
+            for state in nfastates:
+                for ranges, target in self.nfa.edges[state]:
+                    try:
+                        atoms = atomcache[ranges]
+                    except KeyError:
+                        atoms = atomcache[ranges] = self.atoms(ranges)
+
+                    for atom in atoms:
+                        try:
+                            moves[atom].add(target)
+                        except KeyError:
+                            moves[atom] = {target}
+
+            row = {}
+            for atom, targets in moves.items():
+                closure = self.nfa.closure(targets)
+                try:
+                    stateno = states[closure]
+                except KeyError:
+                    stateno = states[closure] = len(states)
+                    stack.append(closure)
+
+                row[atom] = stateno
+
+            transitions.append(row)
+            accepts.append(self.accept(nfastates))
+
+        if accepts[0]:
+            index = accepts[0][0]
+            raise InvalidPatternError(
+                f'Pattern for {self.names[index]!r} matches the empty string: '
+                f'{self.patterns[index].string!r}'
+            )
+
+        return transitions, accepts
+
+    def run_dfa(
+        self, transitions: list[dict[int, int]], accepts: list[tuple[int, ...]], text: str
+    ) -> tuple[int, ...]:
+        state = 0
+        for char in text:
+            atom = bisect.bisect_right(self.points, ord(char)) - 1
+            state = transitions[state].get(atom)
+            if state is None:
+                return ()
+
+        return accepts[state]
+
+    def find_keywords(self) -> dict[int, dict[str, int]]:
+        regexes = [index for index, pattern in enumerate(self.patterns) if pattern.regex]
+        if not regexes:
+            return {}
+
+        transitions, accepts = self.build_dfa(self.build_nfa(regexes))
+
+        keywords = {}
+        for index, pattern in enumerate(self.patterns):
+            if pattern.regex:
+                continue
+
+            text = self.literal_text(pattern)
+            if not text:
+                continue
+
+            accept = self.run_dfa(transitions, accepts, text)
+            if accept:
+                keywords.setdefault(accept[0], {})[text] = index
+
+        return keywords
+
+    def minimize(
+        self, transitions: list[dict[int, int]], accepts: list[tuple[int, ...]]
+    ) -> tuple[list[dict[int, int]], list[tuple[int, ...]]]:
+        atomcount = len(self.points)
+
+        blocks = {}
+        partition = [blocks.setdefault(accept, len(blocks)) for accept in accepts]
+
+        while True:
+            signatures = {}
+            refined = []
+            for state, row in enumerate(transitions):
+                signature = (
+                    partition[state],
+                    tuple(partition[row[atom]] if atom in row else -1 for atom in range(atomcount)),
+                )
+                refined.append(signatures.setdefault(signature, len(signatures)))
+
+            if len(signatures) == len(set(partition)):
+                break
+
+            partition = refined
+
+        renumbered = {partition[0]: 0}
+        for block in partition:
+            renumbered.setdefault(block, len(renumbered))
+
+        mintransitions = [None] * len(renumbered)
+        minaccepts = [()] * len(renumbered)
+        for state, row in enumerate(transitions):
+            block = renumbered[partition[state]]
+            if mintransitions[block] is None:
+                mintransitions[block] = {
+                    atom: renumbered[partition[target]] for atom, target in row.items()
+                }
+                minaccepts[block] = accepts[state]
+
+        return mintransitions, minaccepts
+
+    def reachable(
+        self, transitions: list[dict[int, int]], accepts: list[tuple[int, ...]]
+    ) -> list[int]:
+        masks = [sum(1 << index for index in accept) for accept in accepts]
+
+        while True:
+            changed = False
+
+            for state, row in enumerate(transitions):
+                mask = masks[state]
+                for target in row.values():
+                    mask |= masks[target]
+
+                if mask != masks[state]:
+                    masks[state] = mask
+                    changed = True
+
+            if not changed:
+                return masks
+
+    def build_tables(
+        self,
+        transitions: list[dict[int, int]],
+        accepts: list[tuple[int, ...]],
+        keywords: dict[int, dict[str, int]],
+    ) -> LexerTables:
+        atomcount = len(self.points)
+
+        columns = {}
+        atomclasses = []
+        for atom in range(atomcount):
+            column = tuple(row.get(atom, -1) for row in transitions)
+            if all(target == -1 for target in column):
+                atomclasses.append(-1)
+            else:
+                atomclasses.append(columns.setdefault(column, len(columns)))
+
+        classcount = len(columns)
+
+        flattransitions = array('i', [-1]) * (len(transitions) * classcount)
+        for column, classno in columns.items():
+            for state, target in enumerate(column):
+                flattransitions[state * classcount + classno] = target
+
+        asciitransitions = array('i', [-1]) * (len(transitions) * 128)
+        for code in range(128):
+            atom = bisect.bisect_right(self.points, code) - 1
+            if atom < 0 or atom >= atomcount:
+                continue
+
+            classno = atomclasses[atom]
+            if classno < 0:
+                continue
+
+            for state in range(len(transitions)):
+                asciitransitions[(state << 7) | code] = (
+                    flattransitions[state * classcount + classno]
+                )
+
+        return LexerTables(
+            names=self.names,
+            values=self.values,
+            accepts=array('i', [accept[0] if accept else -1 for accept in accepts]),
+            acceptmasks=tuple(sum(1 << index for index in accept) for accept in accepts),
+            reachmasks=tuple(self.reachable(transitions, accepts)),
+            keywords=tuple(keywords.get(index) for index in range(len(self.patterns))),
+            classcount=classcount,
+            transitions=flattransitions,
+            asciitransitions=asciitransitions,
+            points=array('i', self.points),
+            pointclasses=array('i', atomclasses),
+        )
+
+    def generate(self) -> LexerTables:
+        keywords = self.find_keywords()
+        absorbed = {index for table in keywords.values() for index in table.values()}
+
+        startstate = self.build_nfa(
+            index for index in range(len(self.patterns)) if index not in absorbed
+        )
+        transitions, accepts = self.build_dfa(startstate)
+        transitions, accepts = self.minimize(transitions, accepts)
+        return self.build_tables(transitions, accepts, keywords)
+
+
+def build_lexer_tables(grammar: Grammar) -> Optional[LexerTables]:
+    if not any(terminal.pattern is not None for terminal in grammar.terminals.values()):
+        return None
+
+    return LexerGenerator(grammar).generate()
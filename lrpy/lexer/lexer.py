@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import Iterator, Optional
+
+from .exceptions import LexerError
+from .tables import LexerTables
+from .tokens import LexerToken
+from ..bases import BaseScanner
+from ..textspan import SpanMode, SpanTable
+from ..tokenbuffer import TokenBuffer
+
+RawToken = tuple[int, int, int, str]
+
+
+class Lexer(BaseScanner):
+    __slots__ = ('tables', 'patternmasks')
+
+    def __init__(
+        self,
+        tables: LexerTables,
+        source: str,
+        *,
+        filename: str = '<string>',
+        spanmode: SpanMode = SpanMode.OBJECTS,
+    ) -> None:
+        super().__init__(source, filename=filename, spanmode=spanmode)
+        self.tables = tables
+        self.patternmasks = {}
+
+    def __iter__(self) -> Iterator[LexerToken]:
+        while True:
+            token = self.scan()
+            if token is None:
+                return
+
+            yield token
+
+    def match(self, startpos: int) -> tuple[int, int]:
+        tables = self.tables
+        accepts = tables.accepts
+        asciitransitions = tables.asciitransitions
+        transitions = tables.transitions
+        classcount = tables.classcount
+        points = tables.points
+        pointclasses = tables.pointclasses
+
+        source = self.reader.source
+        length = len(source)
+
+        state = 0
+        accept = -1
+        acceptpos = startpos
+        position = startpos
+
+        while position < length:
+            code = ord(source[position])
+            if code < 128:
+                state = asciitransitions[(state << 7) | code]
+            else:
+                classno = pointclasses[bisect_right(points, code) - 1]
+                if classno < 0:
+                    break
+
+                state = transitions[state * classcount + classno]
+
+            if state < 0:
+                break
+
+            position += 1
+            if accepts[state] >= 0:
+                accept = accepts[state]
+                acceptpos = position
+
+        return accept, acceptpos
+
+    def match_restricted(self, startpos: int, mask: int) -> tuple[int, int]:
+        tables = self.tables
+        acceptmasks = tables.acceptmasks
+        reachmasks = tables.reachmasks
+        asciitransitions = tables.asciitransitions
+        transitions = tables.transitions
+        classcount = tables.classcount
+        points = tables.points
+        pointclasses = tables.pointclasses
+
+        source = self.reader.source
+        length = len(source)
+
+        state = 0
+        accept = -1
+        acceptpos = startpos
+        position = startpos
+
+        while position < length:
+            code = ord(source[position])
+            if code < 128:
+                state = asciitransitions[(state << 7) | code]
+            else:
+                classno = pointclasses[bisect_right(points, code) - 1]
+                if classno < 0:
+                    break
+
+                state = transitions[state * classcount + classno]
+
+            if state < 0 or not reachmasks[state] & mask:
+                break
+
+            position += 1
+
+            accepted = acceptmasks[state] & mask
+            if accepted:
+                accept = (accepted & -accepted).bit_length() - 1
+                acceptpos = position
+
+        return accept, acceptpos
+
+    def _scan_raw(
+        self, acceptable: Optional[int] = None, *, fallback: bool = False
+    ) -> Optional[RawToken]:
+        tables = self.tables
+        values = tables.values
+        keywords = tables.keywords
+        source = self.reader.source
+
+        if acceptable is not None:
+            try:
+                mask, searchmask = self.patternmasks[acceptable]
+            except KeyError:
+                mask, searchmask = self.patternmasks[acceptable] = tables.patternmask(acceptable)
+
+        while not self.reader.at_eof():
+            startpos = self.position()
+            if acceptable is None:
+                accept, endpos = self.match(startpos)
+            else:
+                accept, endpos = self.match_restricted(startpos, searchmask)
+
+            if accept >= 0:
+                content = source[startpos:endpos]
+
+                keywordtable = keywords[accept]
+                if keywordtable is not None:
+                    keyword = keywordtable.get(content)
+                    if keyword is not None and (acceptable is None or mask >> keyword & 1):
+                        accept = keyword
+                    elif acceptable is not None and not mask >> accept & 1:
+                        accept = -1
+
+            if accept < 0:
+                if fallback and acceptable is not None:
+                    # Nothing acceptable matches here, so hand over whatever token is there and
+                    # let the parser report it.
+                    return self._scan_raw()
+
+                raise LexerError(
+                    self.fmterror('Invalid token', self.create_span(startpos, startpos + 1))
+                )
+
+            self.reader.advance(endpos - startpos)
+
+            value = values[accept]
+            if value is not None:
+                return (value, startpos, endpos, content)
+
+        return None
+
+    def scan(
+        self, acceptable: Optional[int] = None, *, fallback: bool = False
+    ) -> Optional[LexerToken]:
+        raw = self._scan_raw(acceptable, fallback=fallback)
+        if raw is None:
+            return None
+
+        value, startpos, endpos, content = raw
+        return LexerToken(value, self.create_span(startpos, endpos), content)
+
+    def scan_all(self) -> TokenBuffer:
+        table = self.spans if self.spans is not None else SpanTable()
+        buffer = TokenBuffer(self.reader.source, spanmode=self.spanmode, spans=table)
+
+        while True:
+            raw = self._scan_raw()
+            if raw is None:
+                return buffer
+
+            value, startpos, endpos, content = raw
+            table.add(startpos, endpos)
+            buffer.append(value, content)
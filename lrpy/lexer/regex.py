@@ -0,0 +1,421 @@
+from __future__ import annotations
+
+from typing import Iterable, Optional, Union
+
+from .exceptions import InvalidPatternError
+from ..stringreader import EOF, StringReader, is_digit
+
+MAXCHAR = 0x10FFFF
+
+Ranges = tuple[tuple[int, int], ...]
+
+ESCAPES = {
+    'n': '\n',
+    't': '\t',
+    'r': '\r',
+    'f': '\f',
+    'v': '\v',
+    '0': '\0',
+}
+
+DIGITS: Ranges = ((ord('0'), ord('9')),)
+WORD: Ranges = (
+    (ord('0'), ord('9')),
+    (ord('A'), ord('Z')),
+    (ord('_'), ord('_')),
+    (ord('a'), ord('z')),
+)
+SPACE: Ranges = ((ord('\t'), ord('\r')), (ord(' '), ord(' ')))
+
+
+def normalize_ranges(ranges: list[tuple[int, int]]) -> Ranges:
+    normalized = []
+    for startchar, endchar in sorted(ranges):
+        if normalized and startchar <= normalized[-1][1] + 1:
+            normalized[-1] = (normalized[-1][0], max(normalized[-1][1], endchar))
+        else:
+            normalized.append((startchar, endchar))
+
+    return tuple(normalized)
+
+
+def negate_ranges(ranges: Ranges) -> Ranges:
+    negated = []
+    startchar = 0
+    for lo, hi in ranges:
+        if lo > startchar:
+            negated.append((startchar, lo - 1))
+
+        startchar = hi + 1
+
+    if startchar <= MAXCHAR:
+        negated.append((startchar, MAXCHAR))
+
+    return tuple(negated)
+
+
+class CharsetNode:
+    __slots__ = ('ranges',)
+
+    def __init__(self, ranges: Ranges) -> None:
+        self.ranges = ranges
+
+    def __repr__(self) -> str:
+        return f'CharsetNode({self.ranges!r})'
+
+
+class ConcatNode:
+    __slots__ = ('nodes',)
+
+    def __init__(self, nodes: list[RegexNode]) -> None:
+        self.nodes = nodes
+
+    def __repr__(self) -> str:
+        return f'ConcatNode({self.nodes!r})'
+
+
+class AlternationNode:
+    __slots__ = ('nodes',)
+
+    def __init__(self, nodes: list[RegexNode]) -> None:
+        self.nodes = nodes
+
+    def __repr__(self) -> str:
+        return f'AlternationNode({self.nodes!r})'
+
+
+class RepeatNode:
+    __slots__ = ('node', 'minimum', 'maximum')
+
+    def __init__(self, node: RegexNode, minimum: int, maximum: Optional[int]) -> None:
+        self.node = node
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def __repr__(self) -> str:
+        return f'RepeatNode({self.node!r}, {self.minimum!r}, {self.maximum!r})'
+
+
+RegexNode = Union[CharsetNode, ConcatNode, AlternationNode, RepeatNode]
+
+
+class RegexParser:
+    __slots__ = ('pattern', 'reader')
+
+    def __init__(self, pattern: str) -> None:
+        self.pattern = pattern
+        self.reader = StringReader(pattern)
+
+    def _error(self, message: str) -> InvalidPatternError:
+        return InvalidPatternError(
+            f'{message} at position {self.reader.tell()} in {self.pattern!r}'
+        )
+
+    def _parse_escape(self) -> Ranges:
+        char = self.reader.peek()
+        if self.reader.at_eof():
+            raise self._error('Incomplete escape')
+
+        self.reader.advance()
+
+        if char in ESCAPES:
+            return ((ord(ESCAPES[char]),) * 2,)
+
+        if char == 'd':
+            return DIGITS
+        if char == 'D':
+            return negate_ranges(DIGITS)
+        if char == 'w':
+            return WORD
+        if char == 'W':
+            return negate_ranges(WORD)
+        if char == 's':
+            return SPACE
+        if char == 'S':
+            return negate_ranges(SPACE)
+
+        if char in 'xu':
+            length = 2 if char == 'x' else 4
+            digits = self.reader.source[self.reader.tell():self.reader.tell() + length]
+
+            try:
+                codepoint = int(digits, 16)
+            except ValueError:
+                raise self._error('Invalid hexadecimal escape') from None
+
+            if len(digits) != length:
+                raise self._error('Invalid hexadecimal escape')
+
+            self.reader.advance(length)
+            return ((codepoint, codepoint),)
+
+        if char.isalnum():
+            raise self._error(f'Unknown escape \\{char}')
+
+        return ((ord(char), ord(char)),)
+
+    def _parse_charset(self) -> CharsetNode:
+        negated = self.reader.expect('^')
+
+        ranges = []
+        first = True
+        while True:
+            if self.reader.at_eof():
+                raise self._error('Unterminated character set')
+
+            if not first and self.reader.expect(']'):
+                break
+
+            first = False
+
+            if self.reader.expect('\\'):
+                escaped = self._parse_escape()
+                if len(escaped) > 1 or escaped[0][0] != escaped[0][1]:
+                    ranges.extend(escaped)
+                    continue
+
+                startchar = escaped[0][0]
+            else:
+                startchar = ord(self.reader.peek())
+                self.reader.advance()
+
+            if self.reader.peek() == '-' and self.reader.peek(1) not in (']', EOF):
+                self.reader.advance()
+
+                if self.reader.expect('\\'):
+                    escaped = self._parse_escape()
+                    if len(escaped) > 1 or escaped[0][0] != escaped[0][1]:
+                        raise self._error('Invalid character range')
+
+                    endchar = escaped[0][0]
+                else:
+                    endchar = ord(self.reader.peek())
+                    self.reader.advance()
+
+                if endchar < startchar:
+                    raise self._error('Invalid character range')
+
+                ranges.append((startchar, endchar))
+            else:
+                ranges.append((startchar, startchar))
+
+        normalized = normalize_ranges(ranges)
+        if negated:
+            normalized = negate_ranges(normalized)
+
+        return CharsetNode(normalized)
+
+    def _parse_atom(self) -> RegexNode:
+        if self.reader.expect('('):
+            if self.reader.expect('?') and not self.reader.expect(':'):
+                raise self._error('Unsupported group')
+
+            node = self._parse_alternation()
+            if not self.reader.expect(')'):
+                raise self._error('Expected closing parenthesis')
+
+            return node
+
+        if self.reader.expect('['):
+            return self._parse_charset()
+
+        if self.reader.expect('.'):
+            return CharsetNode(negate_ranges(((ord('\n'), ord('\n')),)))
+
+        if self.reader.expect('\\'):
+            return CharsetNode(self._parse_escape())
+
+        char = self.reader.peek()
+        if char in '*+?{':
+            raise self._error('Nothing to repeat')
+
+        if char in '^$':
+            raise self._error('Anchors are not supported')
+
+        self.reader.advance()
+        return CharsetNode(((ord(char), ord(char)),))
+
+    def _parse_count(self) -> int:
+        digits = self.reader.accumulate(is_digit)
+        if not digits:
+            raise self._error('Expected repetition count')
+
+        return int(digits)
+
+    def _parse_repeat(self) -> RegexNode:
+        node = self._parse_atom()
+
+        if self.reader.expect('*'):
+            node = RepeatNode(node, 0, None)
+        elif self.reader.expect('+'):
+            node = RepeatNode(node, 1, None)
+        elif self.reader.expect('?'):
+            node = RepeatNode(node, 0, 1)
+        elif self.reader.expect('{'):
+            minimum = self._parse_count()
+            if self.reader.expect(','):
+                if self.reader.peek() == '}':
+                    maximum = None
+                else:
+                    maximum = self._parse_count()
+            else:
+                maximum = minimum
+
+            if not self.reader.expect('}'):
+                raise self._error('Expected closing brace')
+
+            if maximum is not None and maximum < minimum:
+                raise self._error('Invalid repetition range')
+
+            node = RepeatNode(node, minimum, maximum)
+        else:
+            return node
+
+        # The DFA always takes the longest match, so lazy and possessive quantifiers cannot be
+        # honoured, and a repeated repeat is an error in `re` as well.
+        char = self.reader.peek()
+        if char == '?':
+            raise self._error('Lazy quantifiers are not supported')
+        if char == '+':
+            raise self._error('Possessive quantifiers are not supported')
+        if char in ('*', '{'):
+            raise self._error('Multiple repeat')
+
+        return node
+
+    def _parse_concat(self) -> RegexNode:
+        nodes = []
+        while not self.reader.at_eof() and self.reader.peek() not in '|)':
+            nodes.append(self._parse_repeat())
+
+        if len(nodes) == 1:
+            return nodes[0]
+
+        return ConcatNode(nodes)
+
+    def _parse_alternation(self) -> RegexNode:
+        nodes = [self._parse_concat()]
+        while self.reader.expect('|'):
+            nodes.append(self._parse_concat())
+
+        if len(nodes) == 1:
+            return nodes[0]
+
+        return AlternationNode(nodes)
+
+    def parse(self) -> RegexNode:
+        node = self._parse_alternation()
+        if not self.reader.at_eof():
+            raise self._error('Unexpected character')
+
+        return node
+
+    def parse_literal(self) -> RegexNode:
+        nodes = []
+        while not self.reader.at_eof():
+            if self.reader.expect('\\'):
+                nodes.append(CharsetNode(self._parse_escape()))
+            else:
+                char = ord(self.reader.peek())
+                self.reader.advance()
+                nodes.append(CharsetNode(((char, char),)))
+
+        if len(nodes) == 1:
+            return nodes[0]
+
+        return ConcatNode(nodes)
+
+
+class NFA:
+    __slots__ = ('edges', 'epsilons', 'accepts')
+
+    def __init__(self) -> None:
+        self.edges: list[list[tuple[Ranges, int]]] = []
+        self.epsilons: list[list[int]] = []
+        self.accepts: dict[int, int] = {}
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} states={len(self.edges)}>'
+
+    def add_state(self) -> int:
+        self.edges.append([])
+        self.epsilons.append([])
+        return len(self.edges) - 1
+
+    def add_edge(self, state: int, ranges: Ranges, target: int) -> None:
+        self.edges[state].append((ranges, target))
+
+    def add_epsilon(self, state: int, target: int) -> None:
+        self.epsilons[state].append(target)
+
+    def add_node(self, node: RegexNode) -> tuple[int, int]:
+        if isinstance(node, CharsetNode):
+            startstate = self.add_state()
+            endstate = self.add_state()
+            self.add_edge(startstate, node.ranges, endstate)
+            return startstate, endstate
+
+        if isinstance(node, ConcatNode):
+            startstate = endstate = self.add_state()
+            for child in node.nodes:
+                childstart, childend = self.add_node(child)
+                self.add_epsilon(endstate, childstart)
+                endstate = childend
+
+            return startstate, endstate
+
+        if isinstance(node, AlternationNode):
+            startstate = self.add_state()
+            endstate = self.add_state()
+            for child in node.nodes:
+                childstart, childend = self.add_node(child)
+                self.add_epsilon(startstate, childstart)
+                self.add_epsilon(childend, endstate)
+
+            return startstate, endstate
+
+        if isinstance(node, RepeatNode):
+            startstate = endstate = self.add_state()
+            for _ in range(node.minimum):
+                childstart, childend = self.add_node(node.node)
+                self.add_epsilon(endstate, childstart)
+                endstate = childend
+
+            if node.maximum is None:
+                childstart, childend = self.add_node(node.node)
+                self.add_epsilon(endstate, childstart)
+                self.add_epsilon(childend, childstart)
+
+                finalstate = self.add_state()
+                self.add_epsilon(endstate, finalstate)
+                self.add_epsilon(childend, finalstate)
+                return startstate, finalstate
+
+            finalstate = self.add_state()
+            for _ in range(node.maximum - node.minimum):
+                childstart, childend = self.add_node(node.node)
+                self.add_epsilon(endstate, childstart)
+                self.add_epsilon(endstate, finalstate)
+                endstate = childend
+
+            self.add_epsilon(endstate, finalstate)
+            return startstate, finalstate
+
+        raise TypeError(f'Unexpected regex node {node.__class__.__name__}')
+
+    def add_pattern(self, startstate: int, node: RegexNode, accept: int) -> None:
+        childstart, childend = self.add_node(node)
+        self.add_epsilon(startstate, childstart)
+        self.accepts[childend] = accept
+
+    def closure(self, states: Iterable[int]) -> frozenset[int]:
+        closure = set(states)
+        stack = list(closure)
+
+        while stack:
+            for target in self.epsilons[stack.pop()]:
+                if target not in closure:
+                    closure.add(target)
+                    stack.append(target)
+
+        return frozenset(closure)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from array import array
+from typing import Optional
+
+
+class LexerTables:
+    __slots__ = (
+        'names',
+        'values',
+        'accepts',
+        'acceptmasks',
+        'reachmasks',
+        'keywords',
+        'classcount',
+        'transitions',
+        'asciitransitions',
+        'points',
+        'pointclasses',
+    )
+
+    def __init__(
+        self,
+        *,
+        names: tuple[str, ...],
+        values: tuple[Optional[int], ...],
+        accepts: array,
+        acceptmasks: tuple[int, ...],
+        reachmasks: tuple[int, ...],
+        keywords: tuple[Optional[dict[str, int]], ...],
+        classcount: int,
+        transitions: array,
+        asciitransitions: array,
+        points: array,
+        pointclasses: array,
+    ) -> None:
+        self.names = names
+        self.values = values
+        self.accepts = accepts
+        self.acceptmasks = acceptmasks
+        self.reachmasks = reachmasks
+        self.keywords = keywords
+        self.classcount = classcount
+        self.transitions = transitions
+        self.asciitransitions = asciitransitions
+        self.points = points
+        self.pointclasses = pointclasses
+
+    def __repr__(self) -> str:
+        return (
+            f'<{self.__class__.__name__} patterns={len(self.names)} '
+            f'states={len(self.accepts)} classes={self.classcount}>'
+        )
+
+    @property
+    def statecount(self) -> int:
+        return len(self.accepts)
+
+    def patternmask(self, acceptable: int) -> tuple[int, int]:
+        mask = 0
+        for index, value in enumerate(self.values):
+            if value is None or acceptable >> value & 1:
+                mask |= 1 << index
+
+        searchmask = mask
+        for index, keywords in enumerate(self.keywords):
+            if keywords is not None and any(mask >> keyword & 1 for keyword in keywords.values()):
+                searchmask |= 1 << index
+
+        return mask, searchmask
@@ -0,0 +1,16 @@
+from ..bases import BaseToken
+from ..textspan import TextSpan
+
+
+class LexerToken(BaseToken):
+    __slots__ = ('content',)
+
+    def __init__(self, type: int, span: TextSpan, content: str) -> None:
+        super().__init__(type, span)
+        self.content = content
+
+    def __repr__(self) -> str:
+        return (
+            f'<{self.__class__.__name__} type={self.type!r} '
+            f'content={self.content!r} {self.span!r}>'
+        )
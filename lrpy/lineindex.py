@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import bisect
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any
+
+LINEBREAK = re.compile('\n')
+BYTE_LINEBREAK = re.compile(b'\n')
+
+CACHE_SIZE = 8
+# The cache holds a reference to each source it indexes, so larger sources are not cached and do
+# not outlive their scanners. Only immutable sources are cached, since a buffer that is edited in
+# place would get a stale index back.
+CACHE_LIMIT = 1 << 20
+
+_cache: OrderedDict[int, tuple[Any, LineIndex]] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class LineIndex:
+    __slots__ = ('linestarts', 'hint')
+
+    def __init__(self, linestarts: array) -> None:
+        self.linestarts = linestarts
+        self.hint = 0
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} lines={len(self.linestarts)}>'
+
+    @classmethod
+    def build(cls, source: Any) -> LineIndex:
+        if isinstance(source, str):
+            newline, pattern = '\n', LINEBREAK
+        else:
+            newline, pattern = b'\n', BYTE_LINEBREAK
+
+        try:
+            count = source.count(newline)
+        except AttributeError:
+            # Buffers such as memoryview and mmap cannot count, so their index grows as it fills.
+            linestarts = array('q', [0])
+            linestarts.extend(map(re.Match.end, pattern.finditer(source)))
+            return cls(linestarts)
+
+        linestarts = array('q', bytes(8 * (count + 1)))
+        for lineno, match in enumerate(pattern.finditer(source), 1):
+            linestarts[lineno] = match.end()
+
+        return cls(linestarts)
+
+    @classmethod
+    def for_source(cls, source: Any) -> LineIndex:
+        if not isinstance(source, (str, bytes)) or len(source) > CACHE_LIMIT:
+            return cls.build(source)
+
+        key = id(source)
+        with _cache_lock:
+            entry = _cache.get(key)
+            if entry is not None and entry[0] is source:
+                _cache.move_to_end(key)
+                return entry[1]
+
+        index = cls.build(source)
+
+        with _cache_lock:
+            _cache[key] = (source, index)
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+
+        return index
+
+    def lineno(self, pos: int) -> int:
+        linestarts = self.linestarts
+        hint = self.hint
+
+        if linestarts[hint] <= pos:
+            if hint + 1 == len(linestarts) or pos < linestarts[hint + 1]:
+                return hint + 1
+
+            if hint + 2 == len(linestarts) or pos < linestarts[hint + 2]:
+                self.hint = hint + 1
+                return hint + 2
+
+        lineno = bisect.bisect_right(linestarts, pos)
+        self.hint = lineno - 1
+        return lineno
+
+    def linestart(self, lineno: int) -> int:
+        return self.linestarts[lineno - 1]
+
+    def location(self, pos: int) -> tuple[int, int]:
+        lineno = self.lineno(pos)
+        return lineno, pos - self.linestarts[lineno - 1]
@@ -13,17 +13,79 @@ class BaseNode:
 
 
 class GrammarNode(BaseNode):
-    __slots__ = ('rules',)
+    __slots__ = ('imports', 'tokens', 'rules')
 
-    def __init__(self, span: TextSpan, *, rules: list[RuleNode]) -> str:
+    def __init__(
+        self,
+        span: TextSpan,
+        *,
+        imports: Optional[list[ImportNode]] = None,
+        tokens: Optional[list[TokenNode]] = None,
+        rules: list[RuleNode],
+    ) -> str:
         super().__init__(span)
+        self.imports = imports if imports is not None else []
+        self.tokens = tokens if tokens is not None else []
         self.rules = rules
 
     def __repr__(self) -> str:
-        return f'GrammarNode({self.span!r}, rules={self.rules!r})'
+        return (
+            f'GrammarNode({self.span!r}, imports={self.imports!r}, tokens={self.tokens!r}, '
+            f'rules={self.rules!r})'
+        )
+
+    def __str__(self) -> str:
+        parts = []
+        if self.imports:
+            parts.append('\n'.join(str(node) for node in self.imports))
+
+        if self.tokens:
+            parts.append('\n'.join(str(token) for token in self.tokens))
+
+        parts.extend(str(rule) for rule in self.rules)
+        return '\n\n'.join(parts)
+
+
+class ImportNode(BaseNode):
+    __slots__ = ('path', 'alias')
+
+    def __init__(self, span: TextSpan, *, path: str, alias: Optional[str]) -> None:
+        super().__init__(span)
+        self.path = path
+        self.alias = alias
+
+    def __repr__(self) -> str:
+        return f'ImportNode({self.span!r}, path={self.path!r}, alias={self.alias!r})'
+
+    def __str__(self) -> str:
+        if self.alias is None:
+            return f'include {self.path!r}'
+
+        return f'import {self.path!r} as {self.alias}'
+
+
+class TokenNode(BaseNode):
+    __slots__ = ('ignore', 'name', 'pattern', 'regex')
+
+    def __init__(
+        self, span: TextSpan, *, ignore: bool, name: str, pattern: str, regex: bool
+    ) -> None:
+        super().__init__(span)
+        self.ignore = ignore
+        self.name = name
+        self.pattern = pattern
+        self.regex = regex
+
+    def __repr__(self) -> str:
+        return (
+            f'TokenNode({self.span!r}, ignore={self.ignore}, name={self.name!r}, '
+            f'pattern={self.pattern!r}, regex={self.regex})'
+        )
 
     def __str__(self) -> str:
-        return '\n\n'.join(str(rule) for rule in self.rules)
+        keyword = 'ignore' if self.ignore else 'token'
+        pattern = f'/{self.pattern}/' if self.regex else f'{self.pattern!r}'
+        return f'{keyword} {self.name}: {pattern}'
 
 
 class RuleNode(BaseNode):
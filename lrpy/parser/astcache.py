@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+import tempfile
+from typing import Any, Callable, Iterator, Optional, Sequence, Union
+
+from . import ast
+from .parser import GrammarParser
+from ..bases import BaseScanner, Span
+from ..bytereader import ByteSource
+from ..textspan import TextSpan
+
+# Bump whenever the parser or the AST changes in a way that makes cached trees stale.
+AST_CACHE_VERSION = 2
+
+MAGIC = b'LRPYAST\0'
+HEADER = struct.Struct('<8sII32sQ')
+SUFFIX = '.lrast'
+
+STRING = 0
+IDENTIFIER = 1
+NAMED = 2
+OPTIONAL = 3
+REPEAT = 4
+OPTIONAL_REPEAT = 5
+GROUP = 6
+
+
+def source_digest(source: Union[str, ByteSource]) -> bytes:
+    digest = hashlib.sha256(f'{AST_CACHE_VERSION}\0{marshal.version}\0'.encode())
+    if isinstance(source, str):
+        digest.update(b'str\0')
+        digest.update(source.encode('utf-8', 'surrogatepass'))
+    else:
+        digest.update(b'bytes\0')
+        digest.update(source)
+
+    return digest.digest()
+
+
+class ASTEncoder:
+    __slots__ = ('resolve',)
+
+    def __init__(self, scanner: Optional[BaseScanner] = None) -> None:
+        self.resolve: Callable[[Span], Optional[TextSpan]] = (
+            scanner.resolve_span if scanner is not None else lambda span: span
+        )
+
+    def span(self, span: Span) -> tuple[int, int]:
+        if span is None:
+            return -1, -1
+
+        span = self.resolve(span)
+        return span.startpos, span.endpos
+
+    def item(self, item: ast.ItemNode) -> tuple[Any, ...]:
+        startpos, endpos = self.span(item.span)
+
+        if isinstance(item, ast.StringItemNode):
+            return (STRING, startpos, endpos, item.string)
+
+        if isinstance(item, ast.IdentifierItemNode):
+            return (IDENTIFIER, startpos, endpos, item.identifier)
+
+        if isinstance(item, ast.NamedItemNode):
+            return (NAMED, startpos, endpos, item.name, self.item(item.item))
+
+        if isinstance(item, ast.OptionalItemNode):
+            return (OPTIONAL, startpos, endpos, self.item(item.item))
+
+        if isinstance(item, ast.RepeatItemNode):
+            return (REPEAT, startpos, endpos, self.item(item.item))
+
+        if isinstance(item, ast.OptionalRepeatItemNode):
+            return (OPTIONAL_REPEAT, startpos, endpos, self.item(item.item))
+
+        if isinstance(item, ast.GroupItemNode):
+            return (GROUP, startpos, endpos, tuple(self.item(child) for child in item.items))
+
+        raise TypeError(f'Unexpected item node {item.__class__.__name__}')
+
+    def rule(self, rule: ast.RuleNode) -> tuple[Any, ...]:
+        alternatives = tuple(
+            (
+                *self.span(alternative.span),
+                tuple(self.item(item) for item in alternative.items),
+                alternative.action,
+            )
+            for alternative in rule.alternatives
+        )
+        return (*self.span(rule.span), alternatives)
+
+    def import_(self, node: ast.ImportNode) -> tuple[Any, ...]:
+        return (*self.span(node.span), node.path, node.alias)
+
+    def token(self, token: ast.TokenNode) -> tuple[Any, ...]:
+        return (*self.span(token.span), token.ignore, token.name, token.pattern, token.regex)
+
+    def encode(self, grammar: ast.GrammarNode, digest: bytes) -> bytes:
+        blobs = []
+        index = []
+
+        offset = 0
+        for rule in grammar.rules:
+            blob = marshal.dumps(self.rule(rule))
+            index.append((rule.name, rule.toplevel, offset, len(blob)))
+            blobs.append(blob)
+            offset += len(blob)
+
+        header = marshal.dumps((
+            self.span(grammar.span),
+            tuple(self.import_(node) for node in grammar.imports),
+            tuple(self.token(token) for token in grammar.tokens),
+            tuple(index),
+        ))
+
+        return b''.join((
+            HEADER.pack(MAGIC, AST_CACHE_VERSION, marshal.version, digest, len(header)),
+            header,
+            *blobs,
+        ))
+
+
+def _span(startpos: int, endpos: int) -> Optional[TextSpan]:
+    if startpos < 0:
+        return None
+
+    return TextSpan(startpos, endpos)
+
+
+def decode_item(data: tuple[Any, ...]) -> ast.ItemNode:
+    kind, startpos, endpos = data[:3]
+    span = _span(startpos, endpos)
+
+    if kind == STRING:
+        return ast.StringItemNode(span, string=data[3])
+
+    if kind == IDENTIFIER:
+        return ast.IdentifierItemNode(span, identifier=data[3])
+
+    if kind == NAMED:
+        return ast.NamedItemNode(span, name=data[3], item=decode_item(data[4]))
+
+    if kind == OPTIONAL:
+        return ast.OptionalItemNode(span, item=decode_item(data[3]))
+
+    if kind == REPEAT:
+        return ast.RepeatItemNode(span, item=decode_item(data[3]))
+
+    if kind == OPTIONAL_REPEAT:
+        return ast.OptionalRepeatItemNode(span, item=decode_item(data[3]))
+
+    if kind == GROUP:
+        return ast.GroupItemNode(span, items=[decode_item(child) for child in data[3]])
+
+    raise ValueError(f'Unknown item kind {kind} in cached grammar')
+
+
+def decode_rule(name: str, toplevel: bool, data: tuple[Any, ...]) -> ast.RuleNode:
+    startpos, endpos, alternatives = data
+
+    return ast.RuleNode(
+        _span(startpos, endpos),
+        toplevel=toplevel,
+        name=name,
+        alternatives=[
+            ast.AlternativeNode(
+                _span(altstart, altend),
+                items=[decode_item(item) for item in items],
+                action=action,
+            )
+            for altstart, altend, items, action in alternatives
+        ],
+    )
+
+
+class LazyRules(Sequence[ast.RuleNode]):
+    __slots__ = ('buffer', 'entries', 'nodes', 'names', 'reparse')
+
+    def __init__(
+        self,
+        buffer: memoryview,
+        entries: Sequence[tuple[str, bool, int, int]],
+        *,
+        reparse: Optional[Callable[[], Sequence[ast.RuleNode]]] = None,
+    ) -> None:
+        self.buffer = buffer
+        self.entries = entries
+        self.nodes: list[Optional[ast.RuleNode]] = [None] * len(entries)
+        self.names = {entry[0]: index for index, entry in enumerate(entries)}
+        self.reparse = reparse
+
+    def __repr__(self) -> str:
+        loaded = sum(node is not None for node in self.nodes)
+        return f'<{self.__class__.__name__} rules={len(self.entries)} loaded={loaded}>'
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __getitem__(self, index: int) -> ast.RuleNode:
+        if isinstance(index, slice):
+            return [self[index] for index in range(*index.indices(len(self)))]
+
+        node = self.nodes[index]
+        if node is None:
+            node = self.nodes[index] = self._decode(index)
+
+        return node
+
+    def __iter__(self) -> Iterator[ast.RuleNode]:
+        for index in range(len(self.entries)):
+            yield self[index]
+
+    def _decode(self, index: int) -> ast.RuleNode:
+        name, toplevel, offset, length = self.entries[index]
+
+        try:
+            return decode_rule(name, toplevel, marshal.loads(self.buffer[offset:offset + length]))
+        except (EOFError, TypeError, ValueError):
+            if self.reparse is None:
+                raise ValueError(f'Corrupt rule {name!r} in grammar cache') from None
+
+        # The index was valid but a rule blob was not. Every rule that is still undecoded is
+        # taken from the source instead, which is parsed once.
+        rules = self.reparse()
+        self.reparse = None
+        for position, node in enumerate(self.nodes):
+            if node is None:
+                self.nodes[position] = rules[position]
+
+        return rules[index]
+
+    def get(self, name: str) -> Optional[ast.RuleNode]:
+        index = self.names.get(name)
+        if index is None:
+            return None
+
+        return self[index]
+
+
+def encode_grammar(
+    grammar: ast.GrammarNode, digest: bytes, *, scanner: Optional[BaseScanner] = None
+) -> bytes:
+    return ASTEncoder(scanner).encode(grammar, digest)
+
+
+def decode_grammar(
+    data: ByteSource,
+    digest: Optional[bytes] = None,
+    *,
+    reparse: Optional[Callable[[], Sequence[ast.RuleNode]]] = None,
+) -> ast.GrammarNode:
+    view = memoryview(data)
+    if len(view) < HEADER.size:
+        raise ValueError('Truncated grammar cache')
+
+    magic, version, marshalversion, filedigest, length = HEADER.unpack_from(view)
+    if magic != MAGIC or version != AST_CACHE_VERSION or marshalversion != marshal.version:
+        raise ValueError('Unsupported grammar cache format')
+
+    if digest is not None and filedigest != digest:
+        raise ValueError('Grammar cache does not match the source')
+
+    startpos = HEADER.size
+    if startpos + length > len(view):
+        raise ValueError('Truncated grammar cache')
+
+    try:
+        span, imports, tokens, entries = marshal.loads(view[startpos:startpos + length])
+        span = _span(*span)
+        imports = [
+            ast.ImportNode(_span(impstart, impend), path=path, alias=alias)
+            for impstart, impend, path, alias in imports
+        ]
+        tokens = [
+            ast.TokenNode(
+                _span(tokstart, tokend), ignore=ignore, name=name, pattern=pattern, regex=regex
+            )
+            for tokstart, tokend, ignore, name, pattern, regex in tokens
+        ]
+
+        rules = view[startpos + length:]
+        for _, _, offset, size in entries:
+            if offset < 0 or size < 0 or offset + size > len(rules):
+                raise ValueError('Truncated grammar cache')
+    except (EOFError, TypeError):
+        raise ValueError('Corrupt grammar cache') from None
+
+    return ast.GrammarNode(
+        span,
+        imports=imports,
+        tokens=tokens,
+        rules=LazyRules(rules, entries, reparse=reparse),
+    )
+
+
+class ASTCache:
+    __slots__ = ('directory',)
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} {self.directory!r}>'
+
+    def path(self, digest: bytes) -> str:
+        return os.path.join(self.directory, digest.hex() + SUFFIX)
+
+    def get(
+        self, source: Union[str, ByteSource], *, filename: str = '<string>'
+    ) -> Optional[ast.GrammarNode]:
+        digest = source_digest(source)
+
+        # The entry is mapped rather than read, so rules that are never looked at are never
+        # loaded either. The mapping lives as long as the returned node.
+        try:
+            with open(self.path(digest), 'rb') as fp:
+                if os.fstat(fp.fileno()).st_size < HEADER.size:
+                    return None
+
+                data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError:
+            return None
+
+        try:
+            return decode_grammar(data, digest, reparse=lambda: self._reparse(source, filename))
+        except ValueError:
+            return None
+
+    def _reparse(self, source: Union[str, ByteSource], filename: str) -> list[ast.RuleNode]:
+        parser = GrammarParser(source, filename=filename)
+        grammar = parser.parse()
+
+        with contextlib.suppress(OSError):
+            self.put(source, grammar, scanner=parser.scanner)
+
+        # Round-trip through the encoder so the rules get the same `TextSpan` spans as cached ones.
+        encoder = ASTEncoder(parser.scanner)
+        return [decode_rule(rule.name, rule.toplevel, encoder.rule(rule)) for rule in grammar.rules]
+
+    def put(
+        self,
+        source: Union[str, ByteSource],
+        grammar: ast.GrammarNode,
+        *,
+        scanner: Optional[BaseScanner] = None,
+    ) -> None:
+        digest = source_digest(source)
+        path = self.path(digest)
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Every writer gets its own temporary file, so concurrent writers of one entry never
+        # collide, and whichever replaces the entry last wins with a complete file.
+        fd, temporary = tempfile.mkstemp(
+            prefix=os.path.basename(path) + '.', suffix='.tmp', dir=self.directory
+        )
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                fp.write(encode_grammar(grammar, digest, scanner=scanner))
+
+            os.replace(temporary, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(temporary)
+            raise
+
+    def parse(
+        self, source: Union[str, ByteSource], *, filename: str = '<string>'
+    ) -> ast.GrammarNode:
+        grammar = self.get(source, filename=filename)
+        if grammar is not None:
+            return grammar
+
+        parser = GrammarParser(source, filename=filename)
+        grammar = parser.parse()
+
+        self.put(source, grammar, scanner=parser.scanner)
+        return grammar
@@ -0,0 +1,231 @@
+import re
+import sys
+from typing import Optional
+
+from .exceptions import InvalidGrammarError
+from .scanner import CLOSERS, PUNCTUATOR_LENGTHS, PUNCTUATORS, TOKEN_TYPES
+from .tokens import (
+    ForeignBlockToken,
+    IdentifierToken,
+    RegexToken,
+    StringToken,
+    Token,
+    TokenType,
+)
+from ..bases import BaseScanner
+from ..bytereader import (
+    BYTE_CLASSES,
+    CLASS_BRACE,
+    CLASS_COMMENT,
+    CLASS_IDENTIFIER,
+    CLASS_LINEBREAK,
+    CLASS_PUNCTUATOR,
+    CLASS_QUOTE,
+    CLASS_SLASH,
+    CLASS_WHITESPACE,
+    ByteReader,
+    ByteSource,
+)
+from ..textspan import SpanMode, SpanTable, TextSpan
+from ..tokenbuffer import TokenBuffer
+
+BYTE_PUNCTUATORS = {
+    punctuator.encode('ascii'): type for punctuator, type in PUNCTUATORS.items()
+}
+
+WHITESPACE_PATTERN = re.compile(rb'[ \t\f]+')
+COMMENT_PATTERN = re.compile(rb'#[^\n]*\n?')
+IDENTIFIER_PATTERN = re.compile(rb'[A-Za-z0-9_\x80-\xff]+')
+STRING_PATTERNS = {
+    ord("'"): re.compile(rb"'(?:[^'\\]|\\.)*'", re.DOTALL),
+    ord('"'): re.compile(rb'"(?:[^"\\]|\\.)*"', re.DOTALL),
+}
+REGEX_PATTERN = re.compile(rb'/(?:[^/\\\r\n]|\\.)*/', re.DOTALL)
+BRACE_PATTERN = re.compile(rb'[{}]')
+
+RawToken = tuple[TokenType, int, int, Optional[str]]
+
+
+class ByteGrammarScanner(BaseScanner):
+    __slots__ = ('parenstack', 'newline')
+
+    reader_class = ByteReader
+
+    def __init__(
+        self,
+        source: ByteSource,
+        *,
+        filename: str = '<string>',
+        spanmode: SpanMode = SpanMode.OBJECTS,
+    ) -> None:
+        super().__init__(source, filename=filename, spanmode=spanmode)
+
+        self.parenstack = []
+        self.newline = False
+
+    def reset(self, source: ByteSource, *, filename: str = '<string>') -> None:
+        super().reset(source, filename=filename)
+
+        self.parenstack.clear()
+        self.newline = False
+
+    def codepoint_span(self, span: TextSpan) -> TextSpan:
+        return TextSpan(self.reader.codepoint(span.startpos), self.reader.codepoint(span.endpos))
+
+    def _error(self, message: str, startpos: int, endpos: Optional[int] = None) -> None:
+        raise InvalidGrammarError(self.fmterror(message, self.create_span(startpos, endpos)))
+
+    def _find_block_end(self, startpos: int) -> int:
+        level = 0
+        for match in BRACE_PATTERN.finditer(self.reader.source, startpos):
+            if match.group() == b'{':
+                level += 1
+            else:
+                level -= 1
+                if level == 0:
+                    return match.end()
+
+        return -1
+
+    def _scan_punctuator(self, startpos: int) -> TokenType:
+        source = self.reader.source
+
+        for length in PUNCTUATOR_LENGTHS:
+            punctuator = bytes(source[startpos:startpos + length])
+            type = BYTE_PUNCTUATORS.get(punctuator)
+            if type is not None:
+                break
+        else:
+            self._error('Invalid Token', startpos, startpos + 1)
+
+        self.reader.advance(len(punctuator))
+
+        if type in CLOSERS:
+            opener, message = CLOSERS[type]
+            if (
+                not self.parenstack
+                or self.parenstack.pop() is not opener
+            ):
+                self._error(message, startpos)
+
+        elif type is TokenType.OPENPAREN or type is TokenType.OPENBRACKET:
+            self.parenstack.append(type)
+
+        return type
+
+    def _scan_raw(self) -> RawToken:
+        source = self.reader.source
+        length = len(source)
+
+        while True:
+            startpos = self.position()
+            if startpos >= length:
+                return (TokenType.EOF, startpos, startpos, None)
+
+            byteclass = BYTE_CLASSES[source[startpos]]
+
+            if byteclass == CLASS_WHITESPACE:
+                endpos = WHITESPACE_PATTERN.match(source, startpos).end()
+                self.reader.advance(endpos - startpos)
+                continue
+
+            if byteclass == CLASS_COMMENT:
+                endpos = COMMENT_PATTERN.match(source, startpos).end()
+                self.reader.advance(endpos - startpos)
+                if source[endpos - 1] != 0x0A:
+                    return (TokenType.EOF, endpos, endpos, None)
+
+                continue
+
+            if byteclass == CLASS_LINEBREAK:
+                self.reader.advance(1)
+                if self.newline or self.parenstack:
+                    continue
+
+                self.newline = True
+                return (TokenType.NEWLINE, startpos, startpos + 1, None)
+
+            self.newline = False
+
+            if byteclass == CLASS_IDENTIFIER:
+                endpos = IDENTIFIER_PATTERN.match(source, startpos).end()
+                self.reader.advance(endpos - startpos)
+                return (
+                    TokenType.IDENTIFIER,
+                    startpos,
+                    endpos,
+                    sys.intern(self.reader.text(startpos, endpos)),
+                )
+
+            if byteclass == CLASS_QUOTE:
+                match = STRING_PATTERNS[source[startpos]].match(source, startpos)
+                if match is None:
+                    self._error('Unterminated string literal', startpos + 1, length)
+
+                endpos = match.end()
+                self.reader.advance(endpos - startpos)
+                return (
+                    TokenType.STRING, startpos, endpos, self.reader.text(startpos + 1, endpos - 1)
+                )
+
+            if byteclass == CLASS_SLASH:
+                match = REGEX_PATTERN.match(source, startpos)
+                if match is None:
+                    self._error('Unterminated regular expression', startpos + 1)
+
+                endpos = match.end()
+                self.reader.advance(endpos - startpos)
+                return (
+                    TokenType.REGEX, startpos, endpos, self.reader.text(startpos + 1, endpos - 1)
+                )
+
+            if byteclass == CLASS_BRACE:
+                endpos = self._find_block_end(startpos)
+                if endpos == -1:
+                    self._error('Unterminated block', startpos + 1, length)
+
+                self.reader.advance(endpos - startpos)
+                return (
+                    TokenType.FOREIGNBLOCK,
+                    startpos,
+                    endpos,
+                    self.reader.text(startpos + 1, endpos - 1),
+                )
+
+            if byteclass == CLASS_PUNCTUATOR:
+                type = self._scan_punctuator(startpos)
+                return (type, startpos, self.position(), None)
+
+            self._error('Invalid Token', startpos, startpos + 1)
+
+    def scan(self) -> Token:
+        type, startpos, endpos, payload = self._scan_raw()
+        span = self.create_span(startpos, endpos)
+
+        if type is TokenType.IDENTIFIER:
+            return IdentifierToken(span, payload)
+
+        if type is TokenType.STRING:
+            return StringToken(span, payload)
+
+        if type is TokenType.REGEX:
+            return RegexToken(span, payload)
+
+        if type is TokenType.FOREIGNBLOCK:
+            return ForeignBlockToken(span, payload)
+
+        return Token(type, span)
+
+    def scan_all(self) -> TokenBuffer:
+        table = self.spans if self.spans is not None else SpanTable()
+        buffer = TokenBuffer(
+            self.reader.source, typemap=TOKEN_TYPES, spanmode=self.spanmode, spans=table
+        )
+
+        while True:
+            type, startpos, endpos, payload = self._scan_raw()
+            table.add(startpos, endpos)
+            buffer.append(type, payload)
+
+            if type is TokenType.EOF:
+                return buffer
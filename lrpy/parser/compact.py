@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import sys
+from typing import Any, Optional
+
+from . import ast
+from ..bases import BaseScanner, Span
+from ..textspan import SpanTable
+
+
+class ASTCompactor:
+    __slots__ = ('scanner', 'spans', 'items')
+
+    def __init__(self, scanner: BaseScanner) -> None:
+        self.scanner = scanner
+        self.spans = SpanTable()
+        self.items: dict[tuple[Any, ...], ast.ItemNode] = {}
+
+    def span(self, span: Span) -> Optional[int]:
+        if span is None:
+            return None
+
+        span = self.scanner.resolve_span(span)
+        return self.spans.add(span.startpos, span.endpos)
+
+    def _intern(self, key: tuple[Any, ...], node: ast.ItemNode) -> ast.ItemNode:
+        try:
+            return self.items[key]
+        except KeyError:
+            self.items[key] = node
+            return node
+
+    def item(self, item: ast.ItemNode) -> ast.ItemNode:
+        if isinstance(item, ast.StringItemNode):
+            string = sys.intern(item.string)
+            return self._intern(
+                (ast.StringItemNode, string), ast.StringItemNode(None, string=string)
+            )
+
+        if isinstance(item, ast.IdentifierItemNode):
+            identifier = sys.intern(item.identifier)
+            return self._intern(
+                (ast.IdentifierItemNode, identifier),
+                ast.IdentifierItemNode(None, identifier=identifier),
+            )
+
+        if isinstance(item, ast.NamedItemNode):
+            name = sys.intern(item.name)
+            child = self.item(item.item)
+            return self._intern(
+                (ast.NamedItemNode, name, child), ast.NamedItemNode(None, name=name, item=child)
+            )
+
+        if isinstance(item, (ast.OptionalItemNode, ast.RepeatItemNode, ast.OptionalRepeatItemNode)):
+            child = self.item(item.item)
+            return self._intern((item.__class__, child), item.__class__(None, item=child))
+
+        if isinstance(item, ast.GroupItemNode):
+            children = tuple(self.item(child) for child in item.items)
+            return self._intern(
+                (ast.GroupItemNode, children), ast.GroupItemNode(None, items=list(children))
+            )
+
+        raise TypeError(f'Unexpected item node {item.__class__.__name__}')
+
+    def alternative(self, alternative: ast.AlternativeNode) -> ast.AlternativeNode:
+        return ast.AlternativeNode(
+            self.span(alternative.span),
+            items=[self.item(item) for item in alternative.items],
+            action=alternative.action,
+        )
+
+    def rule(self, rule: ast.RuleNode) -> ast.RuleNode:
+        return ast.RuleNode(
+            self.span(rule.span),
+            toplevel=rule.toplevel,
+            name=sys.intern(rule.name),
+            alternatives=[self.alternative(alternative) for alternative in rule.alternatives],
+        )
+
+    def import_(self, node: ast.ImportNode) -> ast.ImportNode:
+        alias = node.alias if node.alias is None else sys.intern(node.alias)
+        return ast.ImportNode(self.span(node.span), path=node.path, alias=alias)
+
+    def token(self, token: ast.TokenNode) -> ast.TokenNode:
+        return ast.TokenNode(
+            self.span(token.span),
+            ignore=token.ignore,
+            name=sys.intern(token.name),
+            pattern=sys.intern(token.pattern),
+            regex=token.regex,
+        )
+
+    def grammar(self, grammar: ast.GrammarNode) -> ast.GrammarNode:
+        return ast.GrammarNode(
+            self.span(grammar.span),
+            imports=[self.import_(node) for node in grammar.imports],
+            tokens=[self.token(token) for token in grammar.tokens],
+            rules=[self.rule(rule) for rule in grammar.rules],
+        )
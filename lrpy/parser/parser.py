@@ -1,18 +1,73 @@
+from typing import Union
+
 from . import ast
+from .bytescanner import ByteGrammarScanner
+from .compact import ASTCompactor
 from .exceptions import InvalidGrammarError
 from .scanner import GrammarScanner
+from .streamscanner import StreamGrammarScanner
 from .tokens import Token, TokenType
+from ..bytereader import ByteSource
+from ..streamreader import StreamReader
+from ..textspan import SpanMode
+from ..tokenbuffer import TokenView
 
 
 class GrammarParser:
-    __slots__ = ('source', 'scanner', 'tokens')
-
-    def __init__(self, source: str, *, filename: str = '<string>') -> None:
+    __slots__ = ('source', 'scanner', 'tokens', 'buffered', 'buffer', 'index', 'compact')
+
+    def __init__(
+        self,
+        source: Union[str, ByteSource, StreamReader],
+        *,
+        filename: str = '<string>',
+        spanmode: SpanMode = SpanMode.OBJECTS,
+        fast: bool = False,
+        buffered: bool = False,
+        compact: bool = False,
+    ) -> None:
         self.source = source
-        self.scanner = GrammarScanner(source, filename=filename)
+        if isinstance(source, str):
+            self.scanner = GrammarScanner(
+                source, filename=filename, spanmode=spanmode, fast=fast
+            )
+        elif isinstance(source, StreamReader):
+            self.scanner = StreamGrammarScanner(source, filename=filename, spanmode=spanmode)
+        else:
+            self.scanner = ByteGrammarScanner(source, filename=filename, spanmode=spanmode)
+
         self.tokens = []
 
-    def peek_token(self) -> Token:
+        self.buffered = buffered
+        self.buffer = None
+        self.index = 0
+
+        self.compact = compact
+
+    def reset(
+        self, source: Union[str, ByteSource, StreamReader], *, filename: str = '<string>'
+    ) -> None:
+        self.source = source
+        self.scanner.reset(source, filename=filename)
+        self.tokens.clear()
+
+        self.buffer = None
+        self.index = 0
+
+    def _buffered_token(self, advance: bool) -> TokenView:
+        if self.buffer is None:
+            self.buffer = self.scanner.scan_all()
+
+        index = self.index
+        if advance and index < len(self.buffer) - 1:
+            self.index += 1
+
+        return TokenView(self.buffer, index)
+
+    def peek_token(self) -> Union[Token, TokenView]:
+        if self.buffered:
+            return self._buffered_token(False)
+
         try:
             token = self.tokens[0]
         except IndexError:
@@ -21,7 +76,10 @@ class GrammarParser:
 
         return token
 
-    def consume_token(self) -> Token:
+    def consume_token(self) -> Union[Token, TokenView]:
+        if self.buffered:
+            return self._buffered_token(True)
+
         try:
             return self.tokens.pop(0)
         except IndexError:
@@ -35,6 +93,83 @@ class GrammarParser:
             else:
                 break
 
+    def _parse_import(self) -> ast.ImportNode:
+        keyword_token = self.consume_token()
+        if (
+            keyword_token.type is not TokenType.IDENTIFIER
+            or keyword_token.content not in ('import', 'include')
+        ):
+            raise InvalidGrammarError(
+                self.scanner.fmterror('Expected "import" or "include"', keyword_token.span)
+            )
+
+        path_token = self.consume_token()
+        if path_token.type is not TokenType.STRING:
+            raise InvalidGrammarError(
+                self.scanner.fmterror('Expected string', path_token.span)
+            )
+
+        if keyword_token.content == 'include':
+            return ast.ImportNode(
+                self.scanner.extend_span(keyword_token.span, path_token.span),
+                path=path_token.content,
+                alias=None,
+            )
+
+        as_token = self.consume_token()
+        if as_token.type is not TokenType.IDENTIFIER or as_token.content != 'as':
+            raise InvalidGrammarError(
+                self.scanner.fmterror('Expected "as"', as_token.span)
+            )
+
+        alias_token = self.consume_token()
+        if alias_token.type is not TokenType.IDENTIFIER:
+            raise InvalidGrammarError(
+                self.scanner.fmterror('Expected identifier', alias_token.span)
+            )
+
+        return ast.ImportNode(
+            self.scanner.extend_span(keyword_token.span, alias_token.span),
+            path=path_token.content,
+            alias=alias_token.content,
+        )
+
+    def _parse_token(self) -> ast.TokenNode:
+        keyword_token = self.consume_token()
+        if (
+            keyword_token.type is not TokenType.IDENTIFIER
+            or keyword_token.content not in ('token', 'ignore')
+        ):
+            raise InvalidGrammarError(
+                self.scanner.fmterror('Expected "token" or "ignore"', keyword_token.span)
+            )
+
+        name_token = self.consume_token()
+        if name_token.type is not TokenType.IDENTIFIER:
+            raise InvalidGrammarError(
+                self.scanner.fmterror('Expected identifier', name_token.span)
+            )
+
+        colon_token = self.consume_token()
+        if colon_token.type is not TokenType.COLON:
+            raise InvalidGrammarError(
+                self.scanner.fmterror('Expected colon', colon_token.span)
+            )
+
+        pattern_token = self.consume_token()
+        if pattern_token.type not in (TokenType.STRING, TokenType.REGEX):
+            raise InvalidGrammarError(
+                self.scanner.fmterror('Expected string or regular expression', pattern_token.span)
+            )
+
+        return ast.TokenNode(
+            self.scanner.extend_span(keyword_token.span, pattern_token.span),
+            ignore=keyword_token.content == 'ignore',
+            name=name_token.content,
+            pattern=pattern_token.content,
+            regex=pattern_token.type is TokenType.REGEX,
+        )
+
     def _parse_rule(self) -> ast.RuleNode:
         rule_token = self.consume_token()
         if (
@@ -66,7 +201,7 @@ class GrammarParser:
 
         alternatives = []
         alternative = self._parse_alternative()
-        span = rule_token.span.extend(alternative.span)
+        span = self.scanner.extend_span(rule_token.span, alternative.span)
 
         alternatives.append(alternative)
 
@@ -76,7 +211,7 @@ class GrammarParser:
             token = self.peek_token()
             if token.type is TokenType.OPENPAREN:
                 alternative = self._parse_alternative()
-                span = span.extend(alternative.span)
+                span = self.scanner.extend_span(span, alternative.span)
                 alternatives.append(alternative)
             else:
                 break
@@ -96,7 +231,7 @@ class GrammarParser:
 
         items = []
         item = self._parse_item()
-        span = openparen_token.span.extend(item.span)
+        span = self.scanner.extend_span(openparen_token.span, item.span)
 
         items.append(item)
 
@@ -104,7 +239,7 @@ class GrammarParser:
             token = self.peek_token()
             if token.type is TokenType.CLOSEPAREN:
                 self.consume_token()
-                span = span.extend(token.span)
+                span = self.scanner.extend_span(span, token.span)
 
                 break
 
@@ -119,7 +254,7 @@ class GrammarParser:
                     self.scanner.fmterror('Expected block', token.span)
                 )
 
-            span = span.extend(token.span)
+            span = self.scanner.extend_span(span, token.span)
             action = token.content
         else:
             action = None
@@ -138,7 +273,7 @@ class GrammarParser:
                 )
 
             item = ast.OptionalItemNode(
-                token.span.extend(closebracket_token.span), item=item
+                self.scanner.extend_span(token.span, closebracket_token.span), item=item
             )
 
         elif token.type is TokenType.STRING:
@@ -146,7 +281,9 @@ class GrammarParser:
 
         elif token.type is TokenType.IDENTIFIER:
             colon_token = self.peek_token()
-            if colon_token.type is TokenType.COLON:
+            if colon_token.type is TokenType.DOT:
+                item = self._parse_qualified_name(token)
+            elif colon_token.type is TokenType.COLON:
                 if not named:
                     raise InvalidGrammarError(
                         self.scanner.fmterror('Named item is not allowed here', token.span)
@@ -156,7 +293,7 @@ class GrammarParser:
                 item = self._parse_item(named=False)
 
                 return ast.NamedItemNode(
-                    token.span.extend(item.span), name=token.content, item=item
+                    self.scanner.extend_span(token.span, item.span), name=token.content, item=item
                 )
             else:
                 item = ast.IdentifierItemNode(token.span, identifier=token.content)
@@ -164,7 +301,7 @@ class GrammarParser:
         elif token.type is TokenType.OPENPAREN:
             items = []
             item = self._parse_item(named=False)
-            span = token.span.extend(item.span)
+            span = self.scanner.extend_span(token.span, item.span)
 
             items.append(item)
 
@@ -172,7 +309,7 @@ class GrammarParser:
                 token = self.peek_token()
                 if token.type is TokenType.CLOSEPAREN:
                     self.consume_token()
-                    span = span.extend(token.span)
+                    span = self.scanner.extend_span(span, token.span)
                     break
 
                 items.append(self._parse_item(named=False))
@@ -187,22 +324,79 @@ class GrammarParser:
         token = self.peek_token()
         if token.type is TokenType.PLUS:
             self.consume_token()
-            item = ast.RepeatItemNode(item.span.extend(token.span), item=item)
+            span = self.scanner.extend_span(item.span, token.span)
+            item = ast.RepeatItemNode(span, item=item)
 
         elif token.type is TokenType.STAR:
             self.consume_token()
-            item = ast.OptionalRepeatItemNode(item.span.extend(token.span), item=item)
+            span = self.scanner.extend_span(item.span, token.span)
+            item = ast.OptionalRepeatItemNode(span, item=item)
 
         return item
 
+    def _parse_qualified_name(
+        self, name_token: Union[Token, TokenView]
+    ) -> ast.IdentifierItemNode:
+        names = [name_token.content]
+        span = name_token.span
+
+        while self.peek_token().type is TokenType.DOT:
+            self.consume_token()
+
+            token = self.consume_token()
+            if token.type is not TokenType.IDENTIFIER:
+                raise InvalidGrammarError(
+                    self.scanner.fmterror('Expected identifier', token.span)
+                )
+
+            names.append(token.content)
+            span = self.scanner.extend_span(span, token.span)
+
+        if self.peek_token().type is TokenType.COLON:
+            raise InvalidGrammarError(
+                self.scanner.fmterror('Qualified names cannot name an item', span)
+            )
+
+        return ast.IdentifierItemNode(span, identifier='.'.join(names))
+
     def parse(self) -> ast.GrammarNode:
+        compactor = ASTCompactor(self.scanner) if self.compact else None
+
+        imports = []
+        tokens = []
         rules = []
         start_token = self.peek_token()
         while True:
+            self.skip_newlines()
+
             token = self.peek_token()
             if token.type is TokenType.EOF:
                 break
 
-            rules.append(self._parse_rule())
+            if (
+                token.type is TokenType.IDENTIFIER
+                and token.content in ('import', 'include')
+            ):
+                node = self._parse_import()
+                imports.append(node if compactor is None else compactor.import_(node))
+            elif (
+                token.type is TokenType.IDENTIFIER
+                and token.content in ('token', 'ignore')
+            ):
+                node = self._parse_token()
+                tokens.append(node if compactor is None else compactor.token(node))
+            else:
+                node = self._parse_rule()
+                rules.append(node if compactor is None else compactor.rule(node))
+
+        span = self.scanner.extend_span(start_token.span, token.span)
+        if compactor is None:
+            return ast.GrammarNode(span, imports=imports, tokens=tokens, rules=rules)
+
+        node = ast.GrammarNode(
+            compactor.span(span), imports=imports, tokens=tokens, rules=rules
+        )
+        if self.scanner.spanmode is not SpanMode.NONE:
+            self.scanner.spans = compactor.spans
 
-        return ast.GrammarNode(start_token.span.extend(token.span), rules=rules)
+        return node
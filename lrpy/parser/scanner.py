@@ -1,12 +1,19 @@
+import re
+import sys
+from typing import Optional, Union
+
 from .exceptions import InvalidGrammarError
 from .tokens import (
     ForeignBlockToken,
     IdentifierToken,
+    RegexToken,
     StringToken,
     Token,
     TokenType,
 )
 from ..bases import BaseScanner
+from ..textspan import SpanMode, SpanTable
+from ..tokenbuffer import TokenBuffer
 from ..stringreader import (
     is_escape,
     is_identifier,
@@ -15,10 +22,53 @@ from ..stringreader import (
 )
 
 
+PUNCTUATORS = {
+    '(': TokenType.OPENPAREN,
+    ')': TokenType.CLOSEPAREN,
+    '[': TokenType.OPENBRACKET,
+    ']': TokenType.CLOSEBRACKET,
+    ':': TokenType.COLON,
+    '+': TokenType.PLUS,
+    '*': TokenType.STAR,
+    '$': TokenType.DOLLAR,
+    '=>': TokenType.ARROW,
+    '.': TokenType.DOT,
+}
+
+PUNCTUATOR_LENGTHS = sorted({len(punctuator) for punctuator in PUNCTUATORS}, reverse=True)
+
+MASTER_PATTERN = re.compile(
+    r'(?P<WHITESPACE>[ \t\f]+)'
+    r'|(?P<COMMENT>\#[^\n]*\n?)'
+    r'|(?P<LINEBREAK>[\r\n])'
+    r'|(?P<IDENTIFIER>[A-Za-z_\x80-\U0010ffff][A-Za-z0-9_\x80-\U0010ffff]*)'
+    r'|(?P<STRING>\'(?:[^\'\\]|\\.)*\'|"(?:[^"\\]|\\.)*")'
+    r'|(?P<REGEX>/(?:[^/\\\r\n]|\\.)*/)'
+    r'|(?P<BLOCK>\{)'
+    r'|(?P<PUNCTUATOR>=>|[()\[\]:+*$.])',
+    re.DOTALL,
+)
+
+TOKEN_TYPES = [None] * (max(TokenType) + 1)
+for type in TokenType:
+    TOKEN_TYPES[type] = type
+
+RawToken = tuple[TokenType, int, int, Optional[str]]
+
+CLOSERS = {
+    TokenType.CLOSEPAREN: (TokenType.OPENPAREN, 'Unmatched closing parenthesis'),
+    TokenType.CLOSEBRACKET: (TokenType.OPENBRACKET, 'Unmatched closing bracket'),
+}
+
+
 def is_terminator(char: str) -> bool:
     return char == '\'' or char == '\"'
 
 
+def is_regex_delimiter(char: str) -> bool:
+    return char == '/'
+
+
 def is_block_start(char: str) -> bool:
     return char == '{'
 
@@ -28,14 +78,29 @@ def is_block_end(char: str) -> bool:
 
 
 class GrammarScanner(BaseScanner):
-    __slots__ = ('parenstack', 'bracelevel', 'newline')
-
-    def __init__(self, source: str, *, filename: str = '<string>') -> None:
-        super().__init__(source, filename=filename)
+    __slots__ = ('parenstack', 'bracelevel', 'newline', 'fast')
+
+    def __init__(
+        self,
+        source: str,
+        *,
+        filename: str = '<string>',
+        spanmode: SpanMode = SpanMode.OBJECTS,
+        fast: bool = False,
+    ) -> None:
+        super().__init__(source, filename=filename, spanmode=spanmode)
 
         self.parenstack = []
         self.bracelevel = 0
         self.newline = False
+        self.fast = fast
+
+    def reset(self, source: str, *, filename: str = '<string>') -> None:
+        super().reset(source, filename=filename)
+
+        self.parenstack.clear()
+        self.bracelevel = 0
+        self.newline = False
 
     def _scan_identifier(self) -> IdentifierToken:
         assert self.reader.lookahead(is_identifier_start, advance=False)
@@ -61,14 +126,39 @@ class GrammarScanner(BaseScanner):
 
                 if self.reader.lookahead(is_escape):
                     self.reader.advance()
+                    continue
 
                 self.reader.advance()
 
         contentend = self.position() - 1
-        content = self.reader.source[contentstart:contentend]
+        content = self.reader.text(contentstart, contentend)
 
         return StringToken(self.create_span(contentstart - 1), content)
 
+    def _scan_regex(self) -> RegexToken:
+        assert self.reader.lookahead(is_regex_delimiter)
+
+        contentstart = self.position()
+        while True:
+            if self.reader.at_eof() or self.reader.lookahead(is_linebreak, advance=False):
+                raise InvalidGrammarError(
+                    self.fmterror('Unterminated regular expression', self.create_span(contentstart))
+                )
+            else:
+                if self.reader.expect('/'):
+                    break
+
+                if self.reader.lookahead(is_escape):
+                    self.reader.advance()
+                    continue
+
+                self.reader.advance()
+
+        contentend = self.position() - 1
+        content = self.reader.text(contentstart, contentend)
+
+        return RegexToken(self.create_span(contentstart - 1), content)
+
     def _scan_block(self) -> ForeignBlockToken:
         assert self.reader.lookahead(is_block_start)
         self.bracelevel = 1
@@ -92,62 +182,189 @@ class GrammarScanner(BaseScanner):
                 self.reader.advance()
 
         contentend = self.position() - 1
-        content = self.reader.source[contentstart:contentend]
+        content = self.reader.text(contentstart, contentend)
 
         return ForeignBlockToken(self.create_span(contentstart - 1), content)
 
-    def _scan_token(self) -> Token:
+    def _scan_punctuator(self) -> TokenType:
         startpos = self.position()
 
-        if self.reader.expect('('):
-            self.parenstack.append(TokenType.OPENPAREN)
-            return Token(TokenType.OPENPAREN, self.create_span(startpos))
+        for length in PUNCTUATOR_LENGTHS:
+            punctuator = self.reader.text(startpos, startpos + length)
+            type = PUNCTUATORS.get(punctuator)
+            if type is not None:
+                break
+        else:
+            raise InvalidGrammarError(
+                self.fmterror('Invalid Token', self.create_span(startpos, startpos + 1))
+            )
+
+        self.reader.advance(len(punctuator))
 
-        if self.reader.expect(')'):
+        if type in CLOSERS:
+            opener, message = CLOSERS[type]
             if (
                 not self.parenstack
-                or self.parenstack.pop() is not TokenType.OPENPAREN
+                or self.parenstack.pop() is not opener
             ):
                 raise InvalidGrammarError(
-                    self.fmterror('Unmatched closing parenthesis', self.create_span(startpos))
+                    self.fmterror(message, self.create_span(startpos))
                 )
 
-            return Token(TokenType.CLOSEPAREN, self.create_span(startpos))
+        elif type is TokenType.OPENPAREN or type is TokenType.OPENBRACKET:
+            self.parenstack.append(type)
 
-        if self.reader.expect('['):
-            self.parenstack.append(TokenType.OPENBRACKET)
-            return Token(TokenType.OPENBRACKET, self.create_span(startpos))
+        return type
 
-        if self.reader.expect(']'):
-            if (
-                not self.parenstack
-                or self.parenstack.pop() is not TokenType.OPENBRACKET
-            ):
-                raise InvalidGrammarError(
-                    self.fmterror('Unmatched closing bracket', self.create_span(startpos))
+    def _scan_token(self) -> Token:
+        startpos = self.position()
+        type = self._scan_punctuator()
+        return Token(type, self.create_span(startpos))
+
+    def _find_block_end(self, startpos: int) -> int:
+        source = self.reader.source
+        position = startpos + 1
+        level = 1
+
+        while level:
+            closepos = source.find('}', position)
+            if closepos == -1:
+                return -1
+
+            openpos = source.find('{', position, closepos)
+            if openpos == -1:
+                level -= 1
+                position = closepos + 1
+            else:
+                level += 1
+                position = openpos + 1
+
+        return position
+
+    def _scan_raw(self) -> Union[RawToken, Token]:
+        source = self.reader.source
+
+        while True:
+            startpos = self.position()
+            match = MASTER_PATTERN.match(source, startpos)
+            if match is None:
+                if self.reader.at_eof():
+                    return (TokenType.EOF, startpos, startpos, None)
+
+                return self._scan_slow()
+
+            kind = match.lastgroup
+            endpos = match.end()
+
+            if kind == 'WHITESPACE':
+                self.reader.advance(endpos - startpos)
+                continue
+
+            if kind == 'COMMENT':
+                self.reader.advance(endpos - startpos)
+                if source[endpos - 1] != '\n':
+                    return (TokenType.EOF, endpos, endpos, None)
+
+                continue
+
+            if kind == 'LINEBREAK':
+                self.reader.advance(1)
+                if self.newline or self.parenstack:
+                    continue
+
+                self.newline = True
+                return (TokenType.NEWLINE, startpos, endpos, None)
+
+            self.newline = False
+
+            if kind == 'IDENTIFIER':
+                self.reader.advance(endpos - startpos)
+                return (TokenType.IDENTIFIER, startpos, endpos, sys.intern(match.group()))
+
+            if kind == 'STRING':
+                self.reader.advance(endpos - startpos)
+                return (TokenType.STRING, startpos, endpos, source[startpos + 1:endpos - 1])
+
+            if kind == 'REGEX':
+                self.reader.advance(endpos - startpos)
+                return (TokenType.REGEX, startpos, endpos, source[startpos + 1:endpos - 1])
+
+            if kind == 'BLOCK':
+                endpos = self._find_block_end(startpos)
+                if endpos == -1:
+                    return self._scan_block()
+
+                self.reader.advance(endpos - startpos)
+                return (
+                    TokenType.FOREIGNBLOCK, startpos, endpos, source[startpos + 1:endpos - 1]
                 )
 
-        if self.reader.expect(':'):
-            return Token(TokenType.COLON, self.create_span(startpos))
+            type = self._scan_punctuator()
+            return (type, startpos, self.position(), None)
 
-        if self.reader.expect('+'):
-            return Token(TokenType.PLUS, self.create_span(startpos))
+    def _scan_fast(self) -> Token:
+        raw = self._scan_raw()
+        if not isinstance(raw, tuple):
+            return raw
 
-        if self.reader.expect('*'):
-            return Token(TokenType.STAR, self.create_span(startpos))
+        type, startpos, endpos, payload = raw
+        span = self.create_span(startpos, endpos)
 
-        if self.reader.expect('$'):
-            return Token(TokenType.DOLLAR, self.create_span(startpos))
+        if type is TokenType.IDENTIFIER:
+            return IdentifierToken(span, payload)
 
-        if self.reader.expect('='):
-            if self.reader.expect('>'):
-                return Token(TokenType.ARROW, self.create_span(startpos))
+        if type is TokenType.STRING:
+            return StringToken(span, payload)
 
-        raise InvalidGrammarError(
-            self.fmterror('Invalid Token', self.create_span(startpos))
-        )
+        if type is TokenType.REGEX:
+            return RegexToken(span, payload)
+
+        if type is TokenType.FOREIGNBLOCK:
+            return ForeignBlockToken(span, payload)
+
+        return Token(type, span)
 
     def scan(self) -> Token:
+        if self.fast:
+            return self._scan_fast()
+
+        return self._scan_slow()
+
+    def scan_all(self) -> TokenBuffer:
+        spanmode = self.spanmode
+        spans = self.spans
+
+        table = spans if spans is not None else SpanTable()
+        buffer = TokenBuffer(
+            self.reader.source, typemap=TOKEN_TYPES, spanmode=spanmode, spans=table
+        )
+
+        self.spanmode = SpanMode.ARRAYS
+        self.spans = table
+
+        try:
+            while True:
+                if self.fast:
+                    raw = self._scan_raw()
+                else:
+                    raw = self.scan()
+
+                if isinstance(raw, tuple):
+                    type, startpos, endpos, payload = raw
+                    table.add(startpos, endpos)
+                else:
+                    type = raw.type
+                    payload = getattr(raw, 'content', None)
+
+                buffer.append(type, payload)
+
+                if type is TokenType.EOF:
+                    return buffer
+        finally:
+            self.spanmode = spanmode
+            self.spans = spans
+
+    def _scan_slow(self) -> Token:
         while True:
             self.reader.skip_whitespace()
             if self.reader.at_eof():
@@ -160,6 +377,9 @@ class GrammarScanner(BaseScanner):
 
                 self.reader.skip_whitespace()
 
+            if self.reader.at_eof():
+                return Token(TokenType.EOF, self.create_span(self.position()))
+
             startpos = self.position()
 
             if self.reader.lookahead(is_linebreak):
@@ -177,6 +397,9 @@ class GrammarScanner(BaseScanner):
             if self.reader.lookahead(is_terminator, advance=False):
                 return self._scan_string()
 
+            if self.reader.lookahead(is_regex_delimiter, advance=False):
+                return self._scan_regex()
+
             if self.reader.lookahead(is_block_start, advance=False):
                 return self._scan_block()
 
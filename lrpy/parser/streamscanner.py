@@ -0,0 +1,46 @@
+from .scanner import GrammarScanner
+from .tokens import Token
+from ..bases import Span
+from ..lineindex import LineIndex
+from ..streamreader import StreamReader
+from ..textspan import SpanMode
+
+
+class StreamGrammarScanner(GrammarScanner):
+    __slots__ = ()
+
+    def __init__(
+        self,
+        reader: StreamReader,
+        *,
+        filename: str = '<string>',
+        spanmode: SpanMode = SpanMode.OBJECTS,
+    ) -> None:
+        super().__init__('', filename=filename, spanmode=spanmode)
+
+        self.reader = reader
+        self.lineindex = LineIndex(reader.linestarts)
+
+    def reset(self, reader: StreamReader, *, filename: str = '<string>') -> None:
+        self.filename = filename
+        self.reader = reader
+        self.lineindex = LineIndex(self.reader.linestarts)
+
+        if self.spans is not None:
+            self.spans.clear()
+
+        self.parenstack.clear()
+        self.bracelevel = 0
+        self.newline = False
+
+    def fmterror(self, message: str, span: Span) -> str:
+        # The end of the erroneous line may not have been read yet.
+        lineno = self.lineindex.lineno(self.resolve_span(span).startpos)
+        while lineno >= len(self.reader.linestarts) and self.reader.fill():
+            pass
+
+        return super().fmterror(message, span)
+
+    def scan(self) -> Token:
+        self.reader.discard()
+        return self._scan_slow()
@@ -25,6 +25,8 @@ class TokenType(enum.IntEnum):
     STAR = enum.auto()
     DOLLAR = enum.auto()
     ARROW = enum.auto()
+    REGEX = enum.auto()
+    DOT = enum.auto()
 
 
 class Token(BaseToken):
@@ -53,6 +55,17 @@ class StringToken(BaseToken):
         return f'<{self.__class__.__name__} content={self.content!r} {self.span!r}>'
 
 
+class RegexToken(BaseToken):
+    __slots__ = ('content',)
+
+    def __init__(self, span: TextSpan, content: str) -> None:
+        super().__init__(TokenType.REGEX, span)
+        self.content = content
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} content={self.content!r} {self.span!r}>'
+
+
 class IdentifierToken(BaseToken):
     __slots__ = ('content',)
 
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+from . import parallel
+from .parser import Parser
+from .tables import CompiledGrammar
+from ..bases import BaseToken
+from ..lexer.lexer import Lexer
+from ..lexer.tables import LexerTables
+
+Scanner = Callable[[Any], Iterable[BaseToken]]
+
+
+def _parse_batch(
+    grammar: CompiledGrammar,
+    inputs: Sequence[Any],
+    scan: Optional[Scanner],
+    lexer: Optional[LexerTables] = None,
+) -> list[Any]:
+    parser = Parser(grammar)
+    results = []
+
+    if lexer is not None:
+        # One lexer per batch, reset for each document. Its line index is only built if an
+        # error needs it.
+        scanner = Lexer(lexer, '')
+        for source in inputs:
+            scanner.reset(source)
+            parser.feed_lexer(scanner)
+            results.append(parser.finish())
+
+        return results
+
+    for source in inputs:
+        parser.feed_many(scan(source) if scan is not None else source)
+        results.append(parser.finish())
+
+    return results
+
+
+def _parse_worker_batch(inputs: Sequence[Any], scan: Optional[Scanner]) -> list[Any]:
+    grammar, lexer = parallel.worker_tables()
+    return _parse_batch(grammar, inputs, scan, lexer)
+
+
+def parse_many(
+    grammar: CompiledGrammar,
+    inputs: Iterable[Any],
+    *,
+    scan: Optional[Scanner] = None,
+    lexer: Optional[LexerTables] = None,
+    workers: int = 1,
+    executor: str = 'thread',
+    batchsize: int = 256,
+) -> list[Any]:
+    if executor not in ('thread', 'process'):
+        raise ValueError(f'Unknown executor {executor!r}, expected \'thread\' or \'process\'')
+
+    if scan is not None and lexer is not None:
+        raise ValueError('scan and lexer cannot be combined')
+
+    if workers <= 1:
+        return _parse_batch(grammar, list(inputs), scan, lexer)
+
+    inputs = list(inputs)
+    batches = [inputs[index:index + batchsize] for index in range(0, len(inputs), batchsize)]
+
+    pool: Executor
+    if executor == 'thread':
+        pool = ThreadPoolExecutor(max_workers=workers)
+        futures = [pool.submit(_parse_batch, grammar, batch, scan, lexer) for batch in batches]
+    else:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=parallel.initialize_worker,
+            initargs=(grammar, lexer),
+        )
+        futures = [pool.submit(_parse_worker_batch, batch, scan) for batch in batches]
+
+    with pool:
+        results = []
+        for future in futures:
+            results.extend(future.result())
+
+    return results
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from .parser import HookedParser
+from .tables import CompiledGrammar
+
+# A stack entry is (state, value, parent, depth, generation). Entries are never modified, so a
+# checkpoint is just a reference to the top entry and every later stack shares it.
+Node = tuple[int, Any, Optional[tuple], int, int]
+
+ROOT: Node = (0, None, None, 0, 0)
+
+# Values of these types are copied before an action receives them if a checkpoint may still
+# refer to them, since actions such as the repeat accumulator append to their arguments.
+MUTABLE = (list, dict, set)
+
+
+class Checkpoint:
+    __slots__ = ('parser', 'node', 'results')
+
+    def __init__(self, parser: CheckpointParser, node: Node, results: int) -> None:
+        self.parser = parser
+        self.node = node
+        self.results = results
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} depth={self.node[3]} state={self.node[0]}>'
+
+
+class CheckpointParser(HookedParser):
+    __slots__ = ('top', 'generation')
+
+    def __init__(self, grammar: CompiledGrammar, *, stream: bool = False) -> None:
+        self.grammar = grammar
+        self.stream = stream
+        self.results = []
+
+        self.top = ROOT
+        self.generation = 0
+
+    @property
+    def state(self) -> int:
+        return self.top[0]
+
+    @property
+    def depth(self) -> int:
+        return self.top[3]
+
+    def checkpoint(self) -> Checkpoint:
+        self.generation += 1
+        return Checkpoint(self, self.top, len(self.results))
+
+    def restore(self, checkpoint: Checkpoint) -> None:
+        if checkpoint.parser is not self:
+            raise ValueError('checkpoint was created by a different parser')
+
+        self.top = checkpoint.node
+        del self.results[checkpoint.results:]
+
+    def reset(self) -> None:
+        self.top = ROOT
+
+    def _shift(self, state: int, token: Any) -> None:
+        top = self.top
+        self.top = (state, token, top, top[3] + 1, self.generation)
+
+    def _reduce(self, productionid: int) -> int:
+        grammar = self.grammar
+        length = grammar.lengths[productionid]
+        generation = self.generation
+
+        top = self.top
+        if length:
+            values = [None] * length
+            for index in range(length - 1, -1, -1):
+                value = top[1]
+                if top[4] != generation and type(value) in MUTABLE:
+                    value = type(value)(value)
+
+                values[index] = value
+                top = top[2]
+        else:
+            values = ()
+
+        value = grammar.callbacks[productionid](*values)
+
+        state = grammar.gotos[top[0]][grammar.lhs[productionid]]
+        self.top = (state, value, top, top[3] + 1, generation)
+        return state
+
+    def _accept(self) -> Any:
+        value = self.top[1]
+        self.reset()
+        return value
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+from array import array
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional
+
+from .exceptions import ParseError
+from .parser import HookedParser
+from .tables import CompiledGrammar
+from ..bases import BaseToken
+from ..grammar.grammar import Production
+from ..lexer.tokens import LexerToken
+from ..textspan import TextSpan
+
+if TYPE_CHECKING:
+    from ..lexer.lexer import Lexer, RawToken
+
+
+# Nodes are stored in postorder, one entry per node in each array. Tokens are stored with the
+# complement of their terminal value as production id and no children. A node's subtree is the
+# `sizes[index]` entries ending at `index`, so its last child is at `index - 1` and each earlier
+# sibling sits just before the subtree of the next one.
+class SyntaxTree:
+    __slots__ = ('grammar', 'source', 'productions', 'counts', 'starts', 'ends', 'sizes')
+
+    def __init__(self, grammar: CompiledGrammar, source: Optional[str] = None) -> None:
+        self.grammar = grammar
+        self.source = source
+
+        self.productions = array('i')
+        self.counts = array('I')
+        self.starts = array('q')
+        self.ends = array('q')
+        self.sizes = array('I')
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} nodes={len(self)}>'
+
+    def __len__(self) -> int:
+        return len(self.productions)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            len(values) * values.itemsize
+            for values in (self.productions, self.counts, self.starts, self.ends, self.sizes)
+        )
+
+    def cursor(self, index: int) -> Cursor:
+        if not 0 <= index < len(self.productions):
+            raise IndexError('node index out of range')
+
+        return Cursor(self, index)
+
+
+class Cursor:
+    __slots__ = ('tree', 'index')
+
+    def __init__(self, tree: SyntaxTree, index: int) -> None:
+        self.tree = tree
+        self.index = index
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} {self.name} {self.start}-{self.end}>'
+
+    def __eq__(self, other: Cursor) -> bool:
+        if not isinstance(other, Cursor):
+            return NotImplemented
+
+        return self.tree is other.tree and self.index == other.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.tree), self.index))
+
+    @property
+    def productionid(self) -> Optional[int]:
+        productionid = self.tree.productions[self.index]
+        return productionid if productionid >= 0 else None
+
+    @property
+    def production(self) -> Optional[Production]:
+        productionid = self.tree.productions[self.index]
+        return self.tree.grammar.productions[productionid] if productionid >= 0 else None
+
+    @property
+    def is_token(self) -> bool:
+        return self.tree.productions[self.index] < 0
+
+    @property
+    def type(self) -> Optional[int]:
+        productionid = self.tree.productions[self.index]
+        return ~productionid if productionid < 0 else None
+
+    @property
+    def name(self) -> str:
+        productionid = self.tree.productions[self.index]
+        if productionid >= 0:
+            return self.tree.grammar.lhs[productionid]
+
+        return self.tree.grammar.terminalnames.get(~productionid, str(~productionid))
+
+    @property
+    def start(self) -> int:
+        return self.tree.starts[self.index]
+
+    @property
+    def end(self) -> int:
+        return self.tree.ends[self.index]
+
+    @property
+    def text(self) -> Optional[str]:
+        if self.tree.source is None:
+            return None
+
+        return self.tree.source[self.tree.starts[self.index]:self.tree.ends[self.index]]
+
+    def __len__(self) -> int:
+        return self.tree.counts[self.index]
+
+    def children(self) -> list[Cursor]:
+        sizes = self.tree.sizes
+
+        children = []
+        index = self.index - 1
+        for _ in range(self.tree.counts[self.index]):
+            children.append(Cursor(self.tree, index))
+            index -= sizes[index]
+
+        children.reverse()
+        return children
+
+    def walk(self) -> Iterator[tuple[bool, Cursor]]:
+        tree = self.tree
+        counts = tree.counts
+        sizes = tree.sizes
+
+        # Yields (True, node) before a node's children and (False, node) after them, without
+        # recursing, so deep left-recursive lists do not hit the recursion limit.
+        stack = [(self.index, True)]
+        while stack:
+            index, entering = stack.pop()
+            cursor = Cursor(tree, index)
+
+            if not entering:
+                yield False, cursor
+                continue
+
+            if (yield True, cursor) is False:
+                continue
+
+            stack.append((index, False))
+
+            child = index - 1
+            for _ in range(counts[index]):
+                stack.append((child, True))
+                child -= sizes[child]
+
+    def evaluate(self) -> Any:
+        tree = self.tree
+        grammar = tree.grammar
+        productions = tree.productions
+        callbacks = grammar.callbacks
+        lengths = grammar.lengths
+
+        if tree.source is None:
+            raise ValueError('evaluating a syntax tree requires its source text')
+
+        values = []
+        for index in range(self.index - tree.sizes[self.index] + 1, self.index + 1):
+            productionid = productions[index]
+            if productionid < 0:
+                startpos = tree.starts[index]
+                endpos = tree.ends[index]
+                values.append(LexerToken(
+                    ~productionid, TextSpan(startpos, endpos), tree.source[startpos:endpos]
+                ))
+                continue
+
+            length = lengths[productionid]
+            if length:
+                arguments = values[-length:]
+                del values[-length:]
+            else:
+                arguments = ()
+
+            values.append(callbacks[productionid](*arguments))
+
+        return values[-1]
+
+
+class Visitor:
+    def visit(self, cursor: Cursor) -> None:
+        walker = cursor.walk()
+
+        try:
+            entering, node = next(walker)
+            while True:
+                name = node.name.replace('.', '_')
+                if entering:
+                    method = getattr(self, f'enter_{name}', self.enter)
+                    entering, node = walker.send(method(node))
+                else:
+                    getattr(self, f'leave_{name}', self.leave)(node)
+                    entering, node = next(walker)
+        except StopIteration:
+            return
+
+    def enter(self, cursor: Cursor) -> Optional[bool]:
+        return None
+
+    def leave(self, cursor: Cursor) -> None:
+        pass
+
+
+class CSTParser(HookedParser):
+    __slots__ = ('tree', 'position')
+
+    def __init__(self, grammar: CompiledGrammar, *, stream: bool = False) -> None:
+        super().__init__(grammar, stream=stream)
+        self.tree = SyntaxTree(grammar)
+        self.position = 0
+
+    def reset(self) -> None:
+        super().reset()
+        self.tree = SyntaxTree(self.grammar, self.tree.source)
+
+    # Tokens are fed as raw (type, startpos, endpos, content) tuples, so no token object is
+    # created per leaf. `feed()` passes the token itself in place of the content.
+    def _shift(self, state: int, token: RawToken) -> None:
+        tree = self.tree
+        self.states.append(state)
+        self.values.append(len(tree.productions))
+
+        tree.productions.append(~token[0])
+        tree.counts.append(0)
+        tree.starts.append(token[1])
+        tree.ends.append(token[2])
+        tree.sizes.append(1)
+        self.position = token[2]
+
+    def _reduce(self, productionid: int) -> int:
+        tree = self.tree
+        index = len(tree.productions)
+
+        length = self.grammar.lengths[productionid]
+        if length:
+            first = self.values[-length]
+            startpos = tree.starts[first]
+            endpos = tree.ends[self.values[-1]]
+            size = index - first + tree.sizes[first]
+
+            del self.values[-length:]
+            del self.states[-length:]
+        else:
+            startpos = endpos = self.position
+            size = 1
+
+        tree.productions.append(productionid)
+        tree.counts.append(length)
+        tree.starts.append(startpos)
+        tree.ends.append(endpos)
+        tree.sizes.append(size)
+
+        state = self.grammar.gotos[self.states[-1]][self.grammar.lhs[productionid]]
+        self.states.append(state)
+        self.values.append(index)
+        return state
+
+    def _accept(self) -> Cursor:
+        # Accepting resets the parser, which starts a new tree.
+        tree = self.tree
+        return tree.cursor(super()._accept())
+
+    def _error(self, token: Optional[RawToken]) -> ParseError:
+        if token is not None:
+            type, startpos, endpos, content = token
+            if isinstance(content, BaseToken):
+                token = content
+            else:
+                token = LexerToken(type, TextSpan(startpos, endpos), content)
+
+        return super()._error(token)
+
+    def feed(self, token: BaseToken) -> None:
+        span = token.span
+        self._feed(token.type, (token.type, span.startpos, span.endpos, token))
+
+    def feed_many(self, tokens: Iterable[BaseToken]) -> None:
+        for token in tokens:
+            self.feed(token)
+
+    def feed_lexer(self, lexer: Lexer) -> None:
+        acceptable = self.grammar.acceptable
+        states = self.states
+        self.tree.source = lexer.reader.source
+
+        while True:
+            raw = lexer._scan_raw(acceptable[states[-1]], fallback=True)
+            if raw is None:
+                return
+
+            self._feed(raw[0], raw)
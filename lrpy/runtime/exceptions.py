@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+
+
+class ParseError(Exception):
+    __slots__ = ('message', 'token', 'expected')
+
+    def __init__(
+        self, message: str, *, token: Optional[Any], expected: list[Optional[int]]
+    ) -> None:
+        super().__init__(message)
+        self.message = message
+        self.token = token
+        self.expected = expected
+
+    def __repr__(self) -> str:
+        return f'ParseError({self.message!r}, token={self.token!r}, expected={self.expected!r})'
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Collection, Iterator, Optional, Sequence
+
+from .parser import Parser
+from .tables import CompiledGrammar
+from ..bases import BaseToken
+from ..lexer.tables import LexerTables
+
+# Set once per worker process by the pool initializer, so the tables are not pickled per task.
+_grammar: Optional[CompiledGrammar] = None
+_lexer: Optional[LexerTables] = None
+
+
+def initialize_worker(grammar: CompiledGrammar, lexer: Optional[LexerTables] = None) -> None:
+    global _grammar, _lexer
+    _grammar = grammar
+    _lexer = lexer
+
+
+def worker_tables() -> tuple[CompiledGrammar, Optional[LexerTables]]:
+    if _grammar is None:
+        raise RuntimeError('worker tables are not set, call initialize_worker() first')
+
+    return _grammar, _lexer
+
+
+def _parse_tokens(grammar: CompiledGrammar, tokens: Sequence[BaseToken]) -> list[Any]:
+    parser = Parser(grammar, stream=True)
+    parser.feed_many(tokens)
+    parser.finish()
+    return parser.results
+
+
+def _parse_chunk(tokens: Sequence[BaseToken]) -> list[Any]:
+    grammar, _ = worker_tables()
+    return _parse_tokens(grammar, tokens)
+
+
+def split_tokens(
+    tokens: Sequence[BaseToken], sync: Collection[int], chunksize: int
+) -> Iterator[Sequence[BaseToken]]:
+    startpos = 0
+    for index, token in enumerate(tokens):
+        if index + 1 - startpos >= chunksize and token.type in sync:
+            yield tokens[startpos:index + 1]
+            startpos = index + 1
+
+    if startpos < len(tokens):
+        yield tokens[startpos:]
+
+
+def parse_parallel(
+    grammar: CompiledGrammar,
+    tokens: Sequence[BaseToken],
+    *,
+    sync: Collection[int],
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+) -> list[Any]:
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if chunksize is None:
+        chunksize = max(len(tokens) // (workers * 4), 1)
+
+    chunks = list(split_tokens(tokens, frozenset(sync), chunksize))
+    if workers <= 1 or len(chunks) <= 1:
+        # The worker globals are only set inside pool processes, so concurrent serial calls with
+        # different grammars do not interfere.
+        return _parse_tokens(grammar, tokens)
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=initialize_worker, initargs=(grammar,)
+    ) as executor:
+        results = []
+        for chunkresults in executor.map(_parse_chunk, chunks):
+            results.extend(chunkresults)
+
+    return results
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Iterable, Optional
+
+from .exceptions import ParseError
+from .tables import CompiledGrammar
+from ..bases import BaseToken
+
+if TYPE_CHECKING:
+    from ..lexer.lexer import Lexer
+
+
+class Parser:
+    __slots__ = ('grammar', 'stream', 'states', 'values', 'results')
+
+    def __init__(self, grammar: CompiledGrammar, *, stream: bool = False) -> None:
+        self.grammar = grammar
+        self.stream = stream
+
+        self.states = [0]
+        self.values = []
+        self.results = []
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} depth={self.depth} state={self.state}>'
+
+    @property
+    def state(self) -> int:
+        return self.states[-1]
+
+    @property
+    def depth(self) -> int:
+        return len(self.states) - 1
+
+    def reset(self) -> None:
+        del self.states[1:]
+        self.values.clear()
+
+    def _error(self, token: Optional[BaseToken]) -> ParseError:
+        error = self.grammar.error
+        expected = [
+            key for key in self.grammar.actions[self.state] if key is None or key != error
+        ]
+        if token is None:
+            message = 'Unexpected end of input'
+        else:
+            message = f'Unexpected token {token!r}'
+
+        return ParseError(message, token=token, expected=expected)
+
+    # The loops below inline the stack operations, so a plain parse never pays for a method call
+    # per action. `HookedParser` runs the same loops through hooks for the other variants.
+    def _complete(self, token: Optional[BaseToken]) -> Any:
+        grammar = self.grammar
+        actions = grammar.actions
+        accept = grammar.accept
+        lengths = grammar.lengths
+        callbacks = grammar.callbacks
+        gotos = grammar.gotos
+        lhs = grammar.lhs
+        states = self.states
+        values = self.values
+
+        while True:
+            state = states[-1]
+            if state == accept and len(states) == 2:
+                value = values[-1]
+                self.reset()
+                return value
+
+            action = actions[state].get(None)
+            if action is None or action >= 0:
+                raise self._error(token)
+
+            productionid = ~action
+            length = lengths[productionid]
+            if length:
+                arguments = values[-length:]
+                del values[-length:]
+                del states[-length:]
+            else:
+                arguments = ()
+
+            values.append(callbacks[productionid](*arguments))
+            states.append(gotos[states[-1]][lhs[productionid]])
+
+    def _feed(self, key: int, token: Any) -> None:
+        grammar = self.grammar
+        actions = grammar.actions
+        lengths = grammar.lengths
+        callbacks = grammar.callbacks
+        gotos = grammar.gotos
+        lhs = grammar.lhs
+        states = self.states
+        values = self.values
+
+        while True:
+            try:
+                action = actions[states[-1]][key]
+            except KeyError:
+                if not self.stream or len(states) == 1:
+                    raise self._error(token) from None
+
+                self.results.append(self._complete(token))
+                continue
+
+            if action >= 0:
+                states.append(action)
+                values.append(token)
+                return
+
+            productionid = ~action
+            length = lengths[productionid]
+            if length:
+                arguments = values[-length:]
+                del values[-length:]
+                del states[-length:]
+            else:
+                arguments = ()
+
+            values.append(callbacks[productionid](*arguments))
+            states.append(gotos[states[-1]][lhs[productionid]])
+
+    def feed(self, token: BaseToken) -> None:
+        self._feed(token.type, token)
+
+    def feed_many(self, tokens: Iterable[BaseToken]) -> None:
+        for token in tokens:
+            self._feed(token.type, token)
+
+    def acceptable(self) -> int:
+        return self.grammar.acceptable[self.state]
+
+    def feed_lexer(self, lexer: Lexer) -> None:
+        acceptable = self.grammar.acceptable
+
+        while True:
+            token = lexer.scan(acceptable[self.state], fallback=True)
+            if token is None:
+                return
+
+            self._feed(token.type, token)
+
+    def finish(self) -> Any:
+        if self.stream and not self.depth:
+            return None
+
+        value = self._complete(None)
+        if self.stream:
+            self.results.append(value)
+
+        return value
+
+
+class HookedParser(Parser):
+    __slots__ = ()
+
+    # These loops only reach the stack through `state`, `depth` and the hooks below, so a variant
+    # with a different stack or different values only overrides the hooks.
+    def _shift(self, state: int, token: Any) -> None:
+        self.states.append(state)
+        self.values.append(token)
+
+    def _reduce(self, productionid: int) -> int:
+        length = self.grammar.lengths[productionid]
+        if length:
+            values = self.values[-length:]
+            del self.values[-length:]
+            del self.states[-length:]
+        else:
+            values = ()
+
+        value = self._action(productionid, values)
+
+        state = self.grammar.gotos[self.states[-1]][self.grammar.lhs[productionid]]
+        self.states.append(state)
+        self.values.append(value)
+        return state
+
+    def _action(self, productionid: int, values: Any) -> Any:
+        return self.grammar.callbacks[productionid](*values)
+
+    def _accept(self) -> Any:
+        value = self.values[-1]
+        self.reset()
+        return value
+
+    def _recover(self, token: Optional[BaseToken], key: Optional[int]) -> bool:
+        raise self._error(token) from None
+
+    def _completes(self) -> bool:
+        return True
+
+    def _complete(self, token: Optional[BaseToken]) -> Any:
+        actions = self.grammar.actions
+        accept = self.grammar.accept
+
+        state = self.state
+        while True:
+            if state == accept and self.depth == 1:
+                return self._accept()
+
+            action = actions[state].get(None)
+            if action is None or action >= 0:
+                if not self._recover(token, None):
+                    self.reset()
+                    return None
+
+                state = self.state
+                continue
+
+            state = self._reduce(~action)
+
+    def _feed(self, key: int, token: Any) -> None:
+        actions = self.grammar.actions
+
+        state = self.state
+        while True:
+            try:
+                action = actions[state][key]
+            except KeyError:
+                if self.stream and self.depth and self._completes():
+                    self.results.append(self._complete(token))
+                elif not self._recover(token, key):
+                    return
+
+                state = self.state
+                continue
+
+            if action >= 0:
+                self._shift(action, token)
+                return
+
+            state = self._reduce(~action)
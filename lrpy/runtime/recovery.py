@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from .exceptions import ParseError
+from .parser import HookedParser
+from .tables import CompiledGrammar
+from ..bases import BaseToken
+
+
+class RecoveringParser(HookedParser):
+    __slots__ = ('errors', 'syncing', 'synced')
+
+    def __init__(self, grammar: CompiledGrammar, *, stream: bool = False) -> None:
+        super().__init__(grammar, stream=stream)
+        self.errors: list[ParseError] = []
+        self.syncing = False
+        self.synced: Optional[tuple[Optional[BaseToken], Optional[int], int]] = None
+
+    def _recover(self, token: Optional[BaseToken], key: Optional[int]) -> bool:
+        states = self.states
+        defaults = self.grammar.defaults
+
+        # Finish reductions that do not depend on the lookahead before discarding any state.
+        while defaults[states[-1]] is not None:
+            self._reduce(defaults[states[-1]])
+        limit = len(states)
+
+        synced = self.synced
+        if synced is not None and synced[0] is token and synced[1] == key:
+            # The token failed again after resynchronizing on it. It belongs to the error that
+            # was already reported, and only states below the last resync point are tried so
+            # that recovery always makes progress.
+            limit = synced[2]
+        elif not self.syncing:
+            self.errors.append(self._error(token))
+
+        recovery = self.grammar.recovery
+        for depth in range(min(limit, len(states)) - 1, -1, -1):
+            target = recovery[states[depth]].get(key)
+            if target is None:
+                continue
+
+            del states[depth + 1:]
+            del self.values[depth:]
+            states.append(target)
+            self.values.append(self.errors[-1])
+
+            self.syncing = False
+            self.synced = (token, key, depth)
+            return True
+
+        self.syncing = True
+        self.synced = None
+        return False
+
+    def _completes(self) -> bool:
+        grammar = self.grammar
+        states = list(self.states)
+
+        # Replays the end of input reductions on a copy of the stack, so a token that does not
+        # fit only ends the current result when that result is valid without recovery.
+        while True:
+            if len(states) == 2 and states[-1] == grammar.accept:
+                return True
+
+            action = grammar.actions[states[-1]].get(None)
+            if action is None or action >= 0:
+                return False
+
+            length = grammar.lengths[~action]
+            if length:
+                del states[-length:]
+
+            states.append(grammar.gotos[states[-1]][grammar.lhs[~action]])
+
+    def _reduce(self, productionid: int) -> int:
+        grammar = self.grammar
+        length = grammar.lengths[productionid]
+        if not self.errors or grammar.error is not None or not length:
+            return super()._reduce(productionid)
+
+        values = self.values[-length:]
+        if not any(type(value) is ParseError for value in values):
+            return super()._reduce(productionid)
+
+        # Panic mode stands in a ParseError for the input it skipped. Actions never receive it:
+        # the nonterminal takes the error as its value instead, and `*` and `+` lists leave it out.
+        action = grammar.productions[productionid].action
+        if action is None or not action.repeat:
+            value = next(value for value in values if type(value) is ParseError)
+        elif length == 2 and type(values[0]) is not ParseError:
+            value = values[0]
+        elif type(values[-1]) is not ParseError:
+            value = [values[-1]]
+        else:
+            value = []
+
+        del self.values[-length:]
+        del self.states[-length:]
+
+        state = grammar.gotos[self.states[-1]][grammar.lhs[productionid]]
+        self.states.append(state)
+        self.values.append(value)
+        return state
+
+    def _feed(self, key: int, token: Any) -> None:
+        if self.syncing and key not in self.grammar.actions[self.states[-1]]:
+            # Panic mode: skip tokens until one fits the stack again.
+            if not self._recover(token, key):
+                return
+
+        super()._feed(key, token)
+
+    def _shift(self, state: int, token: Any) -> None:
+        self.syncing = False
+        super()._shift(state, token)
+
+    def finish(self) -> Any:
+        try:
+            return super().finish()
+        finally:
+            self.syncing = False
+            self.synced = None
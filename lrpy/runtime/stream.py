@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Iterable, Optional
+
+from .parser import Parser
+from .tables import CompiledGrammar
+from ..bases import BaseToken
+
+
+async def parse_stream(
+    grammar: CompiledGrammar,
+    chunks: AsyncIterable[Any],
+    *,
+    scan: Optional[Callable[[Any], Iterable[BaseToken]]] = None,
+) -> AsyncIterator[Any]:
+    parser = Parser(grammar, stream=True)
+
+    async for chunk in chunks:
+        tokens = scan(chunk) if scan is not None else chunk
+        parser.feed_many(tokens)
+
+        if parser.results:
+            results = parser.results
+            parser.results = []
+
+            for result in results:
+                yield result
+
+    parser.finish()
+
+    for result in parser.results:
+        yield result
+
+    parser.results = []
@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import textwrap
+from types import CodeType, MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Mapping, Optional, Sequence
+
+from ..bases import BaseToken
+from ..generator.generator import LRGenerator
+from ..grammar.grammar import ERROR, NonterminalSymbol, Production
+
+if TYPE_CHECKING:
+    from .parser import Parser
+    from .tracing import Tracer
+
+
+def default_action(*values: Any) -> Any:
+    if len(values) == 1:
+        return values[0]
+
+    return list(values)
+
+
+def compile_action(
+    production: Production,
+    namespace: dict[str, Any],
+    codes: Optional[dict[tuple[str, str], CodeType]] = None,
+) -> Callable[..., Any]:
+    if production.action is None:
+        return default_action
+
+    parameters = [f'__{index}__' for index in range(len(production.symbols))]
+    for index, name in production.action.names:
+        parameters[index] = name
+
+    lines = production.action.body.strip('\n').splitlines()
+    if len(lines) <= 1:
+        body = production.action.body.strip() or 'return None'
+    else:
+        body = textwrap.dedent('\n'.join(lines))
+
+    source = '\n'.join((
+        f'def __action__({", ".join(parameters)}):',
+        textwrap.indent(body, '    '),
+    ))
+
+    filename = f'<action {production.nonterminal}>'
+    if codes is None:
+        code = compile(source, filename, 'exec')
+    else:
+        try:
+            code = codes[source, filename]
+        except KeyError:
+            code = codes[source, filename] = compile(source, filename, 'exec')
+
+    scope = {}
+    exec(code, namespace, scope)
+    return scope['__action__']
+
+
+def default_reduction(row: Mapping[Optional[int], int]) -> Optional[int]:
+    actions = set(row.values())
+    if len(actions) != 1:
+        return None
+
+    action = actions.pop()
+    return ~action if action < 0 else None
+
+
+def build_recovery(
+    actions: Sequence[Mapping[Optional[int], int]],
+    gotos: Sequence[Mapping[str, int]],
+    error: Optional[int],
+) -> list[dict[Optional[int], int]]:
+    recovery = []
+
+    for state, row in enumerate(actions):
+        entries = {}
+
+        if error is not None:
+            # Grammars with error rules only resynchronize by shifting the error terminal.
+            target = row.get(error)
+            if target is not None and target >= 0:
+                entries = {key: target for key in actions[target] if key != error}
+        else:
+            # Otherwise pretend a nonterminal that can follow this state was just reduced, as
+            # long as the resulting state accepts the next token.
+            for target in reversed(tuple(gotos[state].values())):
+                entries.update(dict.fromkeys(actions[target], target))
+
+        recovery.append(entries)
+
+    return recovery
+
+
+class Conflict:
+    __slots__ = ('state', 'key', 'action', 'rejected')
+
+    def __init__(self, state: int, key: Optional[int], action: int, rejected: int) -> None:
+        self.state = state
+        self.key = key
+        self.action = action
+        self.rejected = rejected
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} {self.kind} state={self.state} key={self.key!r}>'
+
+    @property
+    def kind(self) -> str:
+        return 'shift/reduce' if self.action >= 0 else 'reduce/reduce'
+
+
+class CompiledGrammar:
+    __slots__ = (
+        'productions',
+        'lengths',
+        'lhs',
+        'actions',
+        'gotos',
+        'accept',
+        'terminals',
+        'terminalnames',
+        'acceptable',
+        'error',
+        'recovery',
+        'defaults',
+        'conflicts',
+        'namespace',
+        'callbacks',
+    )
+
+    def __init__(
+        self,
+        *,
+        productions: Sequence[Production],
+        actions: Sequence[Mapping[Optional[int], int]],
+        gotos: Sequence[Mapping[str, int]],
+        accept: int,
+        terminals: Mapping[str, int],
+        recovery: Optional[Sequence[Mapping[Optional[int], int]]] = None,
+        conflicts: Sequence[Conflict] = (),
+        namespace: Optional[dict[str, Any]] = None,
+        codes: Optional[dict[tuple[str, str], CodeType]] = None,
+    ) -> None:
+        namespace = dict(namespace) if namespace is not None else {}
+        productions = tuple(productions)
+        error = terminals.get(ERROR)
+
+        if recovery is None:
+            recovery = build_recovery(actions, gotos, error)
+
+        initialize = object.__setattr__
+        initialize(self, 'productions', productions)
+        initialize(self, 'lengths', tuple(len(production.symbols) for production in productions))
+        initialize(self, 'lhs', tuple(production.nonterminal for production in productions))
+        initialize(self, 'actions', tuple(MappingProxyType(dict(row)) for row in actions))
+        initialize(self, 'gotos', tuple(MappingProxyType(dict(row)) for row in gotos))
+        initialize(self, 'accept', accept)
+        initialize(self, 'terminals', MappingProxyType(dict(terminals)))
+        initialize(self, 'terminalnames', MappingProxyType(
+            {value: string for string, value in terminals.items()}
+        ))
+        initialize(self, 'acceptable', tuple(
+            sum(1 << key for key in row if key is not None) for row in self.actions
+        ))
+        initialize(self, 'error', error)
+        initialize(self, 'recovery', tuple(MappingProxyType(dict(row)) for row in recovery))
+        initialize(self, 'defaults', tuple(
+            default_reduction(row) for row in self.actions
+        ))
+        initialize(self, 'conflicts', tuple(conflicts))
+        initialize(self, 'namespace', MappingProxyType(namespace))
+        initialize(self, 'callbacks', tuple(
+            compile_action(production, namespace, codes) for production in productions
+        ))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f'{self.__class__.__name__} is immutable')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f'{self.__class__.__name__} is immutable')
+
+    def __repr__(self) -> str:
+        return (
+            f'<{self.__class__.__name__} states={len(self.actions)} '
+            f'productions={len(self.productions)}>'
+        )
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        state = {
+            'productions': self.productions,
+            'actions': [dict(row) for row in self.actions],
+            'gotos': [dict(row) for row in self.gotos],
+            'accept': self.accept,
+            'terminals': dict(self.terminals),
+            'recovery': [dict(row) for row in self.recovery],
+            'conflicts': self.conflicts,
+            'namespace': {
+                name: value for name, value in self.namespace.items() if name != '__builtins__'
+            },
+        }
+        return (_restore, (self.__class__, state))
+
+    def parser(
+        self,
+        *,
+        stream: bool = False,
+        tracer: Optional[Tracer] = None,
+        recover: bool = False,
+        checkpoints: bool = False,
+        cst: bool = False,
+    ) -> Parser:
+        from .parser import Parser
+
+        if sum((tracer is not None, recover, checkpoints, cst)) > 1:
+            raise ValueError('tracer, recover, checkpoints and cst cannot be combined')
+
+        if cst:
+            from .cst import CSTParser
+
+            return CSTParser(self, stream=stream)
+
+        if recover:
+            from .recovery import RecoveringParser
+
+            return RecoveringParser(self, stream=stream)
+
+        if checkpoints:
+            from .checkpoint import CheckpointParser
+
+            return CheckpointParser(self, stream=stream)
+
+        if tracer is not None:
+            if tracer.grammar is not self:
+                raise ValueError('tracer was created for a different grammar')
+
+            return tracer.parser(stream=stream)
+
+        return Parser(self, stream=stream)
+
+    def parse(self, tokens: Iterable[BaseToken]) -> Any:
+        parser = self.parser()
+        parser.feed_many(tokens)
+        return parser.finish()
+
+    @classmethod
+    def from_generator(
+        cls,
+        generator: LRGenerator,
+        *,
+        namespace: Optional[dict[str, Any]] = None,
+        codes: Optional[dict[tuple[str, str], CodeType]] = None,
+    ) -> CompiledGrammar:
+        if not generator.states:
+            generator.build_states()
+
+        productions = []
+        productionids = {}
+        for nonterminal in generator.grammar.nonterminals.values():
+            for production in nonterminal.productions:
+                productionids[id(production)] = len(productions)
+                productions.append(production)
+
+        terminals = {
+            terminal.string: terminal.value for terminal in generator.grammar.terminals.values()
+        }
+
+        actions = []
+        gotos = []
+        conflicts = []
+        for shifts, stategotos, reductions in zip(
+            generator.shifts, generator.gotos, generator.reductions
+        ):
+            row = {terminals[symbol.string]: stateno for symbol, stateno in shifts.items()}
+
+            for productionid in sorted(productionids[id(item.production)] for item in reductions):
+                production = productions[productionid]
+                follow = generator.follow[NonterminalSymbol(name=production.nonterminal)]
+
+                for symbol in follow:
+                    key = terminals[symbol.string] if symbol is not None else None
+
+                    # Shifts win over reductions and earlier productions over later ones, as in
+                    # yacc. Every action that loses is recorded.
+                    action = row.setdefault(key, ~productionid)
+                    if action != ~productionid:
+                        conflicts.append(Conflict(len(actions), key, action, ~productionid))
+
+            actions.append(row)
+            gotos.append({symbol.name: stateno for symbol, stateno in stategotos.items()})
+
+        try:
+            accept = gotos[0][generator.entrypoint.name]
+        except KeyError:
+            accept = gotos[0][generator.entrypoint.name] = len(actions)
+            actions.append({})
+            gotos.append({})
+
+        return cls(
+            productions=productions,
+            actions=actions,
+            gotos=gotos,
+            accept=accept,
+            terminals=terminals,
+            conflicts=conflicts,
+            namespace=namespace,
+            codes=codes,
+        )
+
+
+def _restore(cls: type[CompiledGrammar], state: dict[str, Any]) -> CompiledGrammar:
+    return cls(**state)
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import time
+from array import array
+from typing import Any, Optional
+
+from .exceptions import ParseError
+from .parser import HookedParser, Parser
+from .tables import CompiledGrammar
+from ..bases import BaseToken
+from ..grammar.grammar import NonterminalSymbol, Production
+
+
+def format_production(production: Production) -> str:
+    symbols = [
+        symbol.name if isinstance(symbol, NonterminalSymbol) else repr(symbol.string)
+        for symbol in production.symbols
+    ]
+    return f'{production.nonterminal} -> {" ".join(symbols) or "<empty>"}'
+
+
+class Tracer:
+    __slots__ = (
+        'grammar',
+        'sample',
+        'parses',
+        'sampled',
+        'shifts',
+        'reductions',
+        'errors',
+        'actiontime',
+    )
+
+    def __init__(self, grammar: CompiledGrammar, *, sample: int = 1) -> None:
+        if sample < 1:
+            raise ValueError('sample must be at least 1')
+
+        self.grammar = grammar
+        self.sample = sample
+        self.parses = 0
+        self.sampled = 0
+
+        states = len(grammar.actions)
+        productions = len(grammar.productions)
+
+        self.shifts = array('q', bytes(8 * states))
+        self.reductions = array('q', bytes(8 * productions))
+        self.errors = array('q', bytes(8 * states))
+        self.actiontime = array('q', bytes(8 * productions))
+
+    def __repr__(self) -> str:
+        return (
+            f'<{self.__class__.__name__} sample={self.sample} '
+            f'parses={self.parses} sampled={self.sampled}>'
+        )
+
+    def next_parse(self) -> bool:
+        self.parses += 1
+        if (self.parses - 1) % self.sample:
+            return False
+
+        self.sampled += 1
+        return True
+
+    def parser(self, *, stream: bool = False) -> Parser:
+        if not self.next_parse():
+            return Parser(self.grammar, stream=stream)
+
+        return TracingParser(self.grammar, self, stream=stream)
+
+    def on_shift(self, state: int, token: BaseToken) -> None:
+        self.shifts[state] += 1
+
+    def on_reduce(self, state: int, productionid: int) -> None:
+        self.reductions[productionid] += 1
+
+    def on_action(self, productionid: int, elapsed: int) -> None:
+        self.actiontime[productionid] += elapsed
+
+    def on_error(self, state: int, token: Optional[BaseToken]) -> None:
+        self.errors[state] += 1
+
+    def clear(self) -> None:
+        for counters in (self.shifts, self.reductions, self.errors, self.actiontime):
+            counters[:] = array('q', bytes(8 * len(counters)))
+
+        self.parses = 0
+        self.sampled = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        productions = self.grammar.productions
+        nonterminals: dict[str, dict[str, int]] = {}
+
+        for productionid, production in enumerate(productions):
+            totals = nonterminals.setdefault(production.nonterminal, {'reductions': 0, 'time': 0})
+            totals['reductions'] += self.reductions[productionid]
+            totals['time'] += self.actiontime[productionid]
+
+        return {
+            'parses': self.parses,
+            'sampled': self.sampled,
+            'states': [
+                {'state': state, 'shifts': self.shifts[state], 'errors': self.errors[state]}
+                for state in range(len(self.shifts))
+                if self.shifts[state] or self.errors[state]
+            ],
+            'productions': [
+                {
+                    'production': productionid,
+                    'name': format_production(production),
+                    'reductions': self.reductions[productionid],
+                    'time': self.actiontime[productionid],
+                }
+                for productionid, production in enumerate(productions)
+                if self.reductions[productionid]
+            ],
+            'nonterminals': nonterminals,
+        }
+
+    def report(self, *, limit: int = 10) -> str:
+        document = self.as_dict()
+        terminalnames = self.grammar.terminalnames
+
+        lines = [f'{self.sampled} of {self.parses} parses sampled', '', 'Hot productions:']
+        productions = sorted(
+            document['productions'], key=lambda row: row['reductions'], reverse=True
+        )
+        for row in productions[:limit]:
+            lines.append(
+                f'  {row["reductions"]:>10} {row["time"] / 1e6:>10.3f} ms  '
+                f'#{row["production"]} {row["name"]}'
+            )
+
+        lines.extend(('', 'Hot nonterminals:'))
+        nonterminals = sorted(
+            (item for item in document['nonterminals'].items() if item[1]['reductions']),
+            key=lambda item: item[1]['time'],
+            reverse=True,
+        )
+        for name, totals in nonterminals[:limit]:
+            lines.append(f'  {totals["reductions"]:>10} {totals["time"] / 1e6:>10.3f} ms  {name}')
+
+        lines.extend(('', 'Hot states:'))
+        states = sorted(document['states'], key=lambda row: row['shifts'], reverse=True)
+        for row in states[:limit]:
+            lines.append(f'  {row["shifts"]:>10} shifts  state {row["state"]}')
+
+        errors = sorted(
+            (row for row in document['states'] if row['errors']),
+            key=lambda row: row['errors'],
+            reverse=True,
+        )
+        if errors:
+            lines.extend(('', 'Errors:'))
+            for row in errors[:limit]:
+                expected = ', '.join(
+                    'end of input' if key is None else terminalnames.get(key, str(key))
+                    for key in self.grammar.actions[row['state']]
+                )
+                lines.append(
+                    f'  {row["errors"]:>10} errors  state {row["state"]} expected {expected}'
+                )
+
+        return '\n'.join(lines)
+
+
+class TracingParser(HookedParser):
+    __slots__ = ('tracer', 'active')
+
+    def __init__(self, grammar: CompiledGrammar, tracer: Tracer, *, stream: bool = False) -> None:
+        super().__init__(grammar, stream=stream)
+        self.tracer = tracer
+        self.active: Optional[bool] = True
+
+    def reset(self) -> None:
+        super().reset()
+        # Whether the next parse is sampled is decided by its first token, so a parser that is
+        # reset and never used again does not count as a parse.
+        self.active = None
+
+    def _error(self, token: Optional[BaseToken]) -> ParseError:
+        if self.active:
+            self.tracer.on_error(self.state, token)
+
+        return super()._error(token)
+
+    def _shift(self, state: int, token: Any) -> None:
+        if self.active:
+            self.tracer.on_shift(self.state, token)
+
+        super()._shift(state, token)
+
+    def _reduce(self, productionid: int) -> int:
+        if self.active:
+            self.tracer.on_reduce(self.state, productionid)
+
+        return super()._reduce(productionid)
+
+    def _action(self, productionid: int, values: Any) -> Any:
+        if not self.active:
+            return super()._action(productionid, values)
+
+        # Only the semantic action is timed, not the stack operations and the goto around it.
+        start = time.perf_counter_ns()
+        value = super()._action(productionid, values)
+        self.tracer.on_action(productionid, time.perf_counter_ns() - start)
+        return value
+
+    def _accept(self) -> Any:
+        # Every top-level item of a stream completes separately, but they all belong to the same
+        # parse until `finish()`.
+        active = self.active
+        value = super()._accept()
+        if self.stream:
+            self.active = active
+
+        return value
+
+    def _feed(self, key: int, token: Any) -> None:
+        if self.active is None:
+            self.active = self.tracer.next_parse()
+
+        super()._feed(key, token)
+
+    def finish(self) -> Any:
+        try:
+            return super().finish()
+        finally:
+            self.active = None
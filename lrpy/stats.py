@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import contextlib
+import time
+from typing import Any, Callable, ContextManager, Iterator, Optional
+
+StatsCallback = Callable[[str, float, 'CompilationStats'], None]
+
+COUNTERS = (
+    'nonterminals',
+    'productions',
+    'optionals',
+    'repeats',
+    'groups',
+    'empty_iterations',
+    'first_iterations',
+    'follow_iterations',
+    'closure_calls',
+    'closure_items',
+    'states',
+    'shifts',
+    'gotos',
+    'reductions',
+)
+
+_nullphase = contextlib.nullcontext()
+
+
+class CompilationStats:
+    __slots__ = ('callback', 'timings', *COUNTERS, 'action_density', 'goto_density')
+
+    def __init__(self, callback: Optional[StatsCallback] = None) -> None:
+        self.callback = callback
+        self.timings: dict[str, float] = {}
+
+        for name in COUNTERS:
+            setattr(self, name, 0)
+
+        self.action_density = 0.0
+        self.goto_density = 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f'<{self.__class__.__name__} states={self.states} '
+            f'closure_calls={self.closure_calls} timings={self.timings!r}>'
+        )
+
+    @property
+    def synthesized(self) -> int:
+        return self.optionals + self.repeats + self.groups
+
+    @property
+    def transitions(self) -> int:
+        return self.shifts + self.gotos
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] = elapsed
+
+            if self.callback is not None:
+                self.callback(name, elapsed, self)
+
+    def as_dict(self) -> dict[str, Any]:
+        counters = {name: getattr(self, name) for name in COUNTERS}
+        counters['synthesized'] = self.synthesized
+        counters['transitions'] = self.transitions
+
+        return {
+            'timings': dict(self.timings),
+            'counters': counters,
+            'action_density': self.action_density,
+            'goto_density': self.goto_density,
+        }
+
+    def format(self) -> str:
+        lines = [f'{name:<18} {elapsed * 1000:10.3f} ms' for name, elapsed in self.timings.items()]
+        counters = self.as_dict()['counters']
+        lines.extend(f'{name:<18} {value:>10}' for name, value in counters.items())
+        lines.append(f'{"action_density":<18} {self.action_density:>10.4f}')
+        lines.append(f'{"goto_density":<18} {self.goto_density:>10.4f}')
+        return '\n'.join(lines)
+
+
+def phase(stats: Optional[CompilationStats], name: str) -> ContextManager[None]:
+    if stats is None:
+        return _nullphase
+
+    return stats.phase(name)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import codecs
+from array import array
+from bisect import bisect_right
+from typing import Any, BinaryIO, Optional
+
+from .stringreader import EOF, StringReader
+
+DEFAULT_CHUNKSIZE = 64 * 1024
+
+
+class StreamReader(StringReader):
+    def __init__(
+        self, stream: BinaryIO, encoding: str = 'utf-8', *, chunksize: int = DEFAULT_CHUNKSIZE
+    ) -> None:
+        super().__init__('')
+        self.stream = stream
+        self.encoding = encoding
+        self.chunksize = chunksize
+        self.decoder = codecs.getincrementaldecoder(encoding)()
+
+        self.offset = 0
+        self.eof = False
+        self.linestarts = array('q', [0])
+
+    def __enter__(self) -> StreamReader:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.stream.close()
+
+    def reset(self, stream: BinaryIO) -> None:
+        super().reset('')
+        self.stream = stream
+        self.decoder.reset()
+
+        self.offset = 0
+        self.eof = False
+        del self.linestarts[1:]
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+
+        data = self.stream.read(self.chunksize)
+        if data:
+            chunk = self.decoder.decode(data)
+        else:
+            chunk = self.decoder.decode(b'', True)
+            self.eof = True
+
+        if not chunk:
+            return not self.eof
+
+        base = self.offset + len(self.source)
+        index = chunk.find('\n')
+        while index != -1:
+            self.linestarts.append(base + index + 1)
+            index = chunk.find('\n', index + 1)
+
+        self.source += chunk
+        return True
+
+    def discard(self) -> None:
+        if self._position < self.chunksize:
+            return
+
+        # The window always starts at the beginning of the current line, so an error on that line
+        # can still be quoted in full.
+        linestarts = self.linestarts
+        linestart = linestarts[bisect_right(linestarts, self.offset + self._position) - 1]
+        cut = linestart - self.offset
+
+        if cut >= self.chunksize:
+            self.source = self.source[cut:]
+            self.offset = linestart
+            self._position -= cut
+
+    def at_eof(self) -> bool:
+        while self._position >= len(self.source):
+            if not self.fill():
+                return True
+
+        return False
+
+    def tell(self) -> int:
+        return self.offset + self._position
+
+    def peek(self, offset: int = 0) -> str:
+        while self._position + offset >= len(self.source):
+            if not self.fill():
+                return EOF
+
+        return self.source[self._position + offset]
+
+    def text(self, startpos: int, endpos: Optional[int]) -> str:
+        if startpos < self.offset:
+            raise ValueError(f'Offset {startpos} has already been discarded')
+
+        if endpos is None:
+            return self.source[startpos - self.offset:]
+
+        while endpos - self.offset > len(self.source):
+            if not self.fill():
+                break
+
+        return self.source[startpos - self.offset:endpos - self.offset]
+
+    def goto(self, string: str) -> bool:
+        startpos = self._position
+        while True:
+            index = self.source.find(string, startpos)
+            if index != -1:
+                self._position = index + len(string)
+                return True
+
+            startpos = max(len(self.source) - len(string) + 1, startpos)
+            if not self.fill():
+                return False
+
+    def goto_eof(self) -> None:
+        while self.fill():
+            self._position = len(self.source)
+            self.discard()
+
+        self._position = len(self.source)
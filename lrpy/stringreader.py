@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Callable
+from typing import Callable, Optional
 
 
 class EOFType(str):
@@ -19,6 +19,10 @@ class StringReader:
         self.source = source
         self._position = 0
 
+    def reset(self, source: str) -> None:
+        self.source = source
+        self._position = 0
+
     def at_eof(self) -> bool:
         return self._position >= len(self.source)
 
@@ -34,6 +38,9 @@ class StringReader:
         except IndexError:
             return EOF
 
+    def text(self, startpos: int, endpos: Optional[int]) -> str:
+        return self.source[startpos:endpos]
+
     def goto(self, string: str) -> bool:
         try:
             index = self.source.index(string, self._position)
@@ -56,7 +63,13 @@ class StringReader:
         return True
 
     def expect(self, char: str, *, advance: bool = True) -> bool:
-        return self.lookahead(lambda c: c == char, advance=advance)
+        if self.peek() != char:
+            return False
+
+        if advance:
+            self.advance()
+
+        return True
 
     def skip(self, func: Callable[[str], bool]) -> None:
         while func(self.peek()):
@@ -74,7 +87,7 @@ class StringReader:
             self.advance()
 
         endpos = self.tell()
-        return self.source[startpos:endpos]
+        return self.text(startpos, endpos)
 
 
 def is_whitespace(char: str) -> bool:
@@ -1,12 +1,22 @@
 from __future__ import annotations
 
+import enum
+from array import array
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from typing_extensions import Self
 
 
+class SpanMode(enum.Enum):
+    OBJECTS = enum.auto()
+    ARRAYS = enum.auto()
+    NONE = enum.auto()
+
+
 class TextSpan:
+    __slots__ = ('startpos', 'endpos')
+
     def __init__(self, startpos: int, endpos: int) -> None:
         self.startpos = startpos
         self.endpos = endpos
@@ -43,3 +53,35 @@ class TextSpan:
             other.startpos > self.startpos
             and other.endpos < self.endpos
         )
+
+
+class SpanTable:
+    __slots__ = ('startpositions', 'endpositions')
+
+    def __init__(self) -> None:
+        self.startpositions = array('q')
+        self.endpositions = array('q')
+
+    def __len__(self) -> int:
+        return len(self.startpositions)
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} spans={len(self)}>'
+
+    def clear(self) -> None:
+        del self.startpositions[:]
+        del self.endpositions[:]
+
+    def add(self, startpos: int, endpos: int) -> int:
+        self.startpositions.append(startpos)
+        self.endpositions.append(endpos)
+        return len(self.startpositions) - 1
+
+    def extend(self, first: int, second: int) -> int:
+        return self.add(
+            min(self.startpositions[first], self.startpositions[second]),
+            max(self.endpositions[first], self.endpositions[second]),
+        )
+
+    def get(self, index: int) -> TextSpan:
+        return TextSpan(self.startpositions[index], self.endpositions[index])
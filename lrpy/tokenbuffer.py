@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from array import array
+from typing import Any, Iterator, Optional, Sequence, Union
+
+from .textspan import SpanMode, SpanTable, TextSpan
+
+
+class TokenView:
+    __slots__ = ('buffer', 'index')
+
+    def __init__(self, buffer: TokenBuffer, index: int) -> None:
+        self.buffer = buffer
+        self.index = index
+
+    def __repr__(self) -> str:
+        return (
+            f'<{self.__class__.__name__} type={self.type!r} '
+            f'content={self.content!r} {self.buffer.textspan(self.index)!r}>'
+        )
+
+    @property
+    def type(self) -> Any:
+        return self.buffer.type(self.index)
+
+    @property
+    def span(self) -> Union[TextSpan, int, None]:
+        return self.buffer.span(self.index)
+
+    @property
+    def content(self) -> Optional[str]:
+        return self.buffer.payloads[self.index]
+
+    @property
+    def pos(self) -> int:
+        return self.buffer.spans.startpositions[self.buffer.offset + self.index]
+
+    @property
+    def length(self) -> int:
+        index = self.buffer.offset + self.index
+        return self.buffer.spans.endpositions[index] - self.buffer.spans.startpositions[index]
+
+
+class TokenBuffer:
+    __slots__ = ('source', 'typemap', 'spanmode', 'spans', 'offset', 'types', 'payloads')
+
+    def __init__(
+        self,
+        source: str,
+        *,
+        typemap: Optional[Sequence[Any]] = None,
+        spanmode: SpanMode = SpanMode.OBJECTS,
+        spans: Optional[SpanTable] = None,
+    ) -> None:
+        self.source = source
+        self.typemap = typemap
+        self.spanmode = spanmode
+        self.spans = spans if spans is not None else SpanTable()
+        self.offset = len(self.spans)
+
+        self.types = array('i')
+        self.payloads: list[Optional[str]] = []
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} tokens={len(self)}>'
+
+    def __getitem__(self, index: int) -> TokenView:
+        if index < 0:
+            index += len(self.types)
+
+        if not 0 <= index < len(self.types):
+            raise IndexError('token index out of range')
+
+        return TokenView(self, index)
+
+    def __iter__(self) -> Iterator[TokenView]:
+        for index in range(len(self.types)):
+            yield TokenView(self, index)
+
+    def append(self, type: int, payload: Optional[str] = None) -> None:
+        self.types.append(type)
+        self.payloads.append(payload)
+
+    def type(self, index: int) -> Any:
+        if self.typemap is not None:
+            return self.typemap[self.types[index]]
+
+        return self.types[index]
+
+    def textspan(self, index: int) -> TextSpan:
+        return self.spans.get(self.offset + index)
+
+    def span(self, index: int) -> Union[TextSpan, int, None]:
+        if self.spanmode is SpanMode.OBJECTS:
+            return self.spans.get(self.offset + index)
+
+        if self.spanmode is SpanMode.ARRAYS:
+            return self.offset + index
+
+        return None
@@ -0,0 +1,75 @@
+import sys
+
+from lrpy.grammar.builder import GrammarBuilder
+from lrpy.parser import ast
+from lrpy.parser.parser import GrammarParser
+from lrpy.textspan import TextSpan
+
+
+def test_grammar_node_defaults():
+    rule = ast.RuleNode(TextSpan(0, 8), toplevel=True, name='a', alternatives=[])
+    node = ast.GrammarNode(TextSpan(0, 8), rules=[rule])
+
+    assert (node.imports, node.tokens, node.rules) == ([], [], [rule])
+
+
+GRAMMAR = """
+import 'other.lr' as other
+token NUMBER: /[0-9]+/
+token PLUS: '+'
+
+rule $sum:
+    (left:sum '+' right:NUMBER) => { return left + right }
+    (value:NUMBER) => { return value }
+
+rule terms:
+    (first:NUMBER ('+' NUMBER)* ['+']) => { return first }
+    (value:NUMBER) => { return value }
+"""
+
+
+def spans(scanner, node):
+    return [
+        scanner.resolve_span(alternative.span)
+        for rule in node.rules
+        for alternative in rule.alternatives
+    ] + [scanner.resolve_span(rule.span) for rule in node.rules]
+
+
+def test_compact_ast_equals_full_ast():
+    full = GrammarParser(GRAMMAR)
+    compact = GrammarParser(GRAMMAR, compact=True)
+    fullnode = full.parse()
+    compactnode = compact.parse()
+
+    assert str(compactnode) == str(fullnode)
+    assert spans(compact.scanner, compactnode) == spans(full.scanner, fullnode)
+    assert compact.scanner.resolve_span(compactnode.tokens[1].span) == fullnode.tokens[1].span
+    assert [node.alias for node in compactnode.imports] == ['other']
+
+
+def test_compact_ast_shares_items():
+    node = GrammarParser(GRAMMAR, compact=True).parse()
+    sums, terms = node.rules
+
+    # `(value:NUMBER)` appears in both rules and is one node.
+    assert sums.alternatives[1].items[0] is terms.alternatives[1].items[0]
+    # So is the `NUMBER` identifier item inside the named items.
+    assert sums.alternatives[0].items[2].item is terms.alternatives[0].items[0].item
+
+    # Items carry no spans, and alternative spans are integer indexes.
+    assert sums.alternatives[1].items[0].span is None
+    assert isinstance(sums.alternatives[0].span, int)
+
+    identifier = sums.alternatives[0].items[2].item.identifier
+    assert identifier is sys.intern(''.join(('NUM', 'BER')))
+
+
+def test_compact_ast_builds_same_grammar():
+    source = GRAMMAR.replace("import 'other.lr' as other\n", '')
+    full = GrammarBuilder(GrammarParser(source).parse()).build()
+    compact = GrammarBuilder(GrammarParser(source, compact=True).parse()).build()
+
+    assert {
+        name: nonterminal.productions for name, nonterminal in compact.nonterminals.items()
+    } == {name: nonterminal.productions for name, nonterminal in full.nonterminals.items()}
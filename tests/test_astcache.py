@@ -0,0 +1,126 @@
+import marshal
+import os
+import threading
+
+import pytest
+
+from lrpy.parser.astcache import HEADER, ASTCache, LazyRules
+from lrpy.parser.exceptions import InvalidGrammarError
+
+SOURCE = r"""
+token NUMBER: /[0-9]+/
+token PLUS: '+'
+
+rule $sum:
+    (left:sum '+' right:NUMBER) => { return left + int(right.content) }
+    (value:NUMBER) => { return int(value.content) }
+
+rule number:
+    (value:NUMBER) => { return int(value.content) }
+"""
+
+
+def describe(node):
+    return [
+        (rule.name, rule.toplevel, [alternative.action for alternative in rule.alternatives])
+        for rule in node.rules
+    ]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ASTCache(str(tmp_path))
+    expected = describe(cache.parse(SOURCE))
+    return cache, expected
+
+
+def entry(cache):
+    [name] = os.listdir(cache.directory)
+    return os.path.join(cache.directory, name)
+
+
+def test_hit(cache):
+    cache, expected = cache
+    node = cache.get(SOURCE)
+
+    assert isinstance(node.rules, LazyRules)
+    assert node.rules.get('number').alternatives[0].span.startpos == SOURCE.rindex('(value:NUMBER)')
+    assert describe(node) == expected
+
+
+@pytest.mark.parametrize('size', [0, HEADER.size - 1, HEADER.size + 4, -1])
+def test_truncated_entry_is_a_miss(cache, size):
+    cache, expected = cache
+    path = entry(cache)
+
+    with open(path, 'rb') as fp:
+        data = fp.read()
+    with open(path, 'wb') as fp:
+        fp.write(data[:size])
+
+    assert cache.get(SOURCE) is None
+    assert describe(cache.parse(SOURCE)) == expected
+    assert cache.get(SOURCE) is not None
+
+
+def corrupt_rule(path):
+    with open(path, 'rb') as fp:
+        data = bytearray(fp.read())
+
+    length = HEADER.unpack_from(data)[-1]
+    *_, entries = marshal.loads(data[HEADER.size:HEADER.size + length])
+    _, _, offset, _ = entries[-1]
+    data[HEADER.size + length + offset] = 0
+    with open(path, 'wb') as fp:
+        fp.write(data)
+
+
+def test_corrupt_rule_is_reparsed(cache):
+    cache, expected = cache
+    corrupt_rule(entry(cache))
+
+    node = cache.get(SOURCE)
+    assert node is not None
+    assert describe(node) == expected
+    assert describe(cache.get(SOURCE)) == expected
+
+
+def test_reparse_keeps_filename(tmp_path):
+    cache = ASTCache(str(tmp_path / 'cache'))
+    source = SOURCE + 'rule broken:\n    (value:NUMBER\n'
+
+    # A damaged entry for a source that does not parse, so falling back to the source fails.
+    cache.put(source, ASTCache(str(tmp_path / 'valid')).parse(SOURCE))
+    corrupt_rule(entry(cache))
+
+    node = cache.get(source, filename='broken.lr')
+    with pytest.raises(InvalidGrammarError, match='broken.lr'):
+        list(node.rules)
+
+
+def test_concurrent_puts(tmp_path):
+    cache = ASTCache(str(tmp_path / 'cache'))
+    grammar = ASTCache(str(tmp_path / 'source')).parse(SOURCE)
+    expected = describe(grammar)
+
+    threads = 8
+    barrier = threading.Barrier(threads)
+    errors = []
+
+    def put():
+        barrier.wait()
+        try:
+            for _ in range(50):
+                cache.put(SOURCE, grammar)
+        except Exception as exception:
+            errors.append(exception)
+
+    workers = [threading.Thread(target=put) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert errors == []
+    assert [name for name in os.listdir(cache.directory) if name.endswith('.tmp')] == []
+    assert describe(cache.get(SOURCE)) == expected
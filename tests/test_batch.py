@@ -0,0 +1,61 @@
+import pytest
+
+from lrpy.generator.generator import LRGenerator
+from lrpy.grammar.builder import GrammarBuilder
+from lrpy.lexer.generator import build_lexer_tables
+from lrpy.lexer.lexer import Lexer
+from lrpy.parser.parser import GrammarParser
+from lrpy.runtime import parallel
+from lrpy.runtime.batch import parse_many
+from lrpy.runtime.tables import CompiledGrammar
+
+SOURCE = r"""
+token NUMBER: /[0-9]+/
+token PLUS: '+'
+ignore WHITESPACE: /[ \t\n]+/
+
+rule $sum:
+    (left:sum '+' right:NUMBER) => { return left + int(right.content) }
+    (value:NUMBER) => { return int(value.content) }
+"""
+
+INPUTS = [' + '.join(str(number) for number in range(count)) for count in range(1, 50)]
+EXPECTED = [sum(range(count)) for count in range(1, 50)]
+
+
+@pytest.fixture(scope='module')
+def grammar():
+    grammar = GrammarBuilder(GrammarParser(SOURCE).parse()).build()
+    compiled = CompiledGrammar.from_generator(LRGenerator(grammar, 'sum'))
+    return compiled, build_lexer_tables(grammar)
+
+
+@pytest.mark.parametrize('workers, executor', [(1, 'thread'), (4, 'thread'), (2, 'process')])
+def test_parse_many_with_lexer(grammar, workers, executor):
+    compiled, tables = grammar
+    results = parse_many(
+        compiled, INPUTS, lexer=tables, workers=workers, executor=executor, batchsize=8
+    )
+
+    assert results == EXPECTED
+
+
+def test_parse_many_with_tokens(grammar):
+    compiled, tables = grammar
+    tokens = [Lexer(tables, text).scan_all() for text in INPUTS]
+
+    assert parse_many(compiled, tokens, workers=4, batchsize=8) == EXPECTED
+
+
+def test_parse_many_rejects_scan_and_lexer(grammar):
+    compiled, tables = grammar
+
+    with pytest.raises(ValueError):
+        parse_many(compiled, INPUTS, scan=str.split, lexer=tables)
+
+
+def test_worker_tables(grammar):
+    compiled, tables = grammar
+
+    parallel.initialize_worker(compiled, tables)
+    assert parallel.worker_tables() == (compiled, tables)
@@ -0,0 +1,110 @@
+import json
+import os
+
+import pytest
+
+from lrpy.__main__ import main
+from lrpy.build import MANIFEST_NAME, load_artifact
+
+COMMON = r"""
+rule sum:
+    (left:sum '+' right:NUMBER) => { return left + int(right.content) }
+    (value:NUMBER) => { return int(value.content) }
+"""
+
+ROOT = r"""
+import 'common.lr' as common
+
+rule $statement:
+    (value:common.sum ';') => { return value }
+"""
+
+OTHER = r"""
+rule $statement:
+    (value:NUMBER ';') => { return int(value.content) }
+"""
+
+
+@pytest.fixture
+def directory(tmp_path):
+    (tmp_path / 'common.lr').write_text(COMMON)
+    (tmp_path / 'root.lr').write_text(ROOT)
+    (tmp_path / 'other.lr').write_text(OTHER)
+    (tmp_path / 'tokens.json').write_text(json.dumps({'NUMBER': 1, '+': 2, ';': 3}))
+    (tmp_path / 'out').mkdir()
+    return tmp_path
+
+
+def build(directory, capsys, *options):
+    status = main([
+        'build',
+        '-o', str(directory / 'out'),
+        '-t', str(directory / 'tokens.json'),
+        *options,
+        str(directory / 'root.lr'),
+        str(directory / 'other.lr'),
+    ])
+
+    lines = capsys.readouterr().out.splitlines()
+    return status, [line.split()[0] for line in lines[:-1]]
+
+
+def test_build_writes_artifacts(directory, capsys):
+    assert build(directory, capsys, '-j', '1') == (0, ['miss', 'miss'])
+
+    for name in ('root', 'other'):
+        grammar, lexer = load_artifact(str(directory / 'out' / f'{name}.lrt'))
+        assert grammar is not None
+        assert lexer is None
+
+    manifest = json.loads((directory / 'out' / MANIFEST_NAME).read_text())
+    dependencies = manifest['entries'][str(directory / 'out' / 'root.lrt')]['dependencies']
+    assert list(dependencies) == [os.path.realpath(directory / 'common.lr')]
+
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_build_cache_hits(directory, capsys, jobs):
+    assert build(directory, capsys, '-j', jobs) == (0, ['miss', 'miss'])
+    assert build(directory, capsys, '-j', jobs) == (0, ['hit', 'hit'])
+    assert build(directory, capsys, '-j', jobs, '-q') == (0, [])
+    assert build(directory, capsys, '-j', jobs, '-f') == (0, ['miss', 'miss'])
+
+
+def test_build_invalidates_changed_grammar(directory, capsys):
+    build(directory, capsys, '-j', '1')
+
+    (directory / 'other.lr').write_text(OTHER + '\n')
+    assert build(directory, capsys, '-j', '1') == (0, ['hit', 'miss'])
+    assert build(directory, capsys, '-j', '1') == (0, ['hit', 'hit'])
+
+
+def test_build_invalidates_changed_import(directory, capsys):
+    build(directory, capsys, '-j', '1')
+
+    (directory / 'common.lr').write_text(COMMON.replace("'+'", "';'"))
+    assert build(directory, capsys, '-j', '1') == (0, ['miss', 'hit'])
+    assert build(directory, capsys, '-j', '1') == (0, ['hit', 'hit'])
+
+
+def test_build_invalidates_missing_artifact(directory, capsys):
+    build(directory, capsys, '-j', '1')
+
+    (directory / 'out' / 'root.lrt').unlink()
+    assert build(directory, capsys, '-j', '1') == (0, ['miss', 'hit'])
+
+
+@pytest.mark.parametrize('document', ['{', '{"version": 0, "entries": {}}'])
+def test_build_ignores_stale_manifest(directory, capsys, document):
+    build(directory, capsys, '-j', '1')
+
+    (directory / 'out' / MANIFEST_NAME).write_text(document)
+    assert build(directory, capsys, '-j', '1') == (0, ['miss', 'miss'])
+    assert build(directory, capsys, '-j', '1') == (0, ['hit', 'hit'])
+
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_build_reports_errors(directory, capsys, jobs):
+    (directory / 'common.lr').write_text('rule sum:\n    (value:MISSING)\n')
+
+    assert build(directory, capsys, '-j', jobs) == (1, ['error', 'miss'])
+    assert build(directory, capsys, '-j', jobs) == (1, ['error', 'hit'])
@@ -0,0 +1,82 @@
+import mmap
+import random
+
+import pytest
+
+from lrpy.bytereader import BYTE_CLASSES
+from lrpy.parser.bytescanner import ByteGrammarScanner
+from lrpy.parser.exceptions import InvalidGrammarError
+from lrpy.parser.parser import GrammarParser
+from lrpy.parser.scanner import GrammarScanner
+from lrpy.parser.tokens import TokenType
+from lrpy.textspan import TextSpan
+
+PIECES = [
+    'rule', '$start', 'name_1', 'éa', 'ß', '名前', 'x', ' ', '\t', '\n', '\r\n', '# kommentär\n',
+    "'a'", '"ü c"', "'\\''", '/[0-9]+/', '/é\\/b/', '{ return "€" }', '{ {nested} }', '(', ')',
+    '[', ']', ':', '+', '*', '$', '.', '=>', "'open", '{ open', '/open',
+]
+
+
+def str_tokens(source):
+    scanner = GrammarScanner(source)
+    tokens = []
+    try:
+        while True:
+            token = scanner.scan()
+            tokens.append((token.type, token.span, getattr(token, 'content', None)))
+            if token.type is TokenType.EOF:
+                return tokens
+    except InvalidGrammarError:
+        return tokens + [InvalidGrammarError]
+
+
+def byte_tokens(source):
+    scanner = ByteGrammarScanner(source)
+    tokens = []
+    try:
+        while True:
+            token = scanner.scan()
+            span = scanner.codepoint_span(token.span)
+            tokens.append((token.type, span, getattr(token, 'content', None)))
+            if token.type is TokenType.EOF:
+                return tokens
+    except InvalidGrammarError:
+        return tokens + [InvalidGrammarError]
+
+
+def test_byte_scanner_matches_str_scanner():
+    generator = random.Random(0)
+    for _ in range(2000):
+        source = ''.join(generator.choices(PIECES, k=generator.randint(1, 12)))
+        assert byte_tokens(source.encode()) == str_tokens(source), source
+
+
+def test_byte_classes():
+    assert len(BYTE_CLASSES) == 256
+
+
+@pytest.mark.parametrize('wrap', [bytes, bytearray, memoryview])
+def test_byte_sources(wrap):
+    source = "token É: 'é'\nrule $a:\n    ('é') => { return '€' }\n"
+
+    node = GrammarParser(wrap(source.encode())).parse()
+    assert [rule.name for rule in node.rules] == ['a']
+    assert node.rules[0].alternatives[0].action == " return '€' "
+    assert [token.name for token in node.tokens] == ['É']
+
+
+def test_byte_spans(tmp_path):
+    path = tmp_path / 'grammar.lr'
+    path.write_bytes('rule $é:\n'.encode())
+
+    with open(path, 'rb') as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        scanner = ByteGrammarScanner(buffer)
+        scanner.scan()
+        scanner.scan()
+        token = scanner.scan()
+
+        assert token.content == 'é'
+        assert (token.span.startpos, token.span.endpos) == (6, 8)
+        assert scanner.codepoint_span(token.span) == TextSpan(6, 7)
+        del scanner, token
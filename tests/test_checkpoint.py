@@ -0,0 +1,155 @@
+import pytest
+
+from lrpy.generator.generator import LRGenerator
+from lrpy.grammar.builder import GrammarBuilder
+from lrpy.lexer.generator import build_lexer_tables
+from lrpy.lexer.lexer import Lexer
+from lrpy.parser.parser import GrammarParser
+from lrpy.runtime.checkpoint import CheckpointParser
+from lrpy.runtime.exceptions import ParseError
+from lrpy.runtime.tables import CompiledGrammar
+
+SOURCE = r"""
+token NUMBER: /[0-9]+/
+token PLUS: '+'
+token SEMICOLON: ';'
+token OPEN: '('
+token CLOSE: ')'
+ignore WHITESPACE: /[ \t\n]+/
+
+rule $program:
+    (statements:statement+) => { return statements }
+
+rule statement:
+    (value:sum ';') => { return value }
+
+rule sum:
+    (left:sum '+' right:term) => { return left + right }
+    (value:term) => { return value }
+
+rule term:
+    (number:NUMBER) => { return int(number.content) }
+    ('(' value:sum ')') => { return value }
+"""
+
+
+@pytest.fixture(scope='module')
+def grammar():
+    grammar = GrammarBuilder(GrammarParser(SOURCE).parse()).build()
+    return CompiledGrammar.from_generator(LRGenerator(grammar, 'program')), build_lexer_tables(
+        grammar
+    )
+
+
+def tokenize(grammar, text):
+    return list(Lexer(grammar[1], text))
+
+
+def test_checkpoint_parser_matches_plain_parser(grammar):
+    compiled, _ = grammar
+    parser = compiled.parser(checkpoints=True)
+    plain = compiled.parser()
+
+    assert isinstance(parser, CheckpointParser)
+
+    for token in tokenize(grammar, '1 + 2; 3; 4 + (5 + 6);'):
+        parser.feed(token)
+        plain.feed(token)
+        assert (parser.state, parser.depth) == (plain.state, plain.depth)
+
+    assert parser.finish() == plain.finish() == [3, 3, 15]
+    assert parser.depth == 0
+
+
+def test_restore_returns_to_checkpoint(grammar):
+    compiled, _ = grammar
+    parser = compiled.parser(checkpoints=True)
+    parser.feed_many(tokenize(grammar, '1; 2 +'))
+
+    checkpoint = parser.checkpoint()
+    state, depth = parser.state, parser.depth
+    assert repr(checkpoint) == f'<Checkpoint depth={depth} state={state}>'
+
+    parser.feed_many(tokenize(grammar, '3; 4; (5 + (6 +'))
+    assert parser.depth != depth
+
+    parser.restore(checkpoint)
+    assert (parser.state, parser.depth) == (state, depth)
+
+    parser.feed_many(tokenize(grammar, '10;'))
+    assert parser.finish() == [1, 12]
+
+
+def test_restore_same_checkpoint_repeatedly(grammar):
+    compiled, _ = grammar
+    parser = compiled.parser(checkpoints=True)
+    parser.feed_many(tokenize(grammar, '1; 2;'))
+    checkpoint = parser.checkpoint()
+
+    results = []
+    for text in ('3;', '4 + 5;', '6; 7;', ''):
+        parser.restore(checkpoint)
+        parser.feed_many(tokenize(grammar, text))
+        results.append(parser.finish())
+
+    # `statement+` appends to its list in place, so every branch would share one list if the
+    # checkpointed value were not copied.
+    assert results == [[1, 2, 3], [1, 2, 9], [1, 2, 6, 7], [1, 2]]
+
+
+def test_restore_after_parse_error(grammar):
+    compiled, _ = grammar
+    parser = compiled.parser(checkpoints=True)
+    parser.feed_many(tokenize(grammar, '1;'))
+    checkpoint = parser.checkpoint()
+
+    with pytest.raises(ParseError):
+        parser.feed_many(tokenize(grammar, '2 + + 3;'))
+
+    parser.restore(checkpoint)
+    parser.feed_many(tokenize(grammar, '2 + 3;'))
+    assert parser.finish() == [1, 5]
+
+
+def test_restore_truncates_stream_results(grammar):
+    compiled, _ = grammar
+    parser = CheckpointParser(compiled, stream=True)
+    parser.feed_many(tokenize(grammar, '1;'))
+    parser.finish()
+    checkpoint = parser.checkpoint()
+
+    parser.feed_many(tokenize(grammar, '2;'))
+    parser.finish()
+    assert parser.results == [[1], [2]]
+
+    parser.restore(checkpoint)
+    parser.feed_many(tokenize(grammar, '3;'))
+    parser.finish()
+    assert parser.results == [[1], [3]]
+
+
+def test_restore_deep_stack(grammar):
+    compiled, _ = grammar
+    parser = compiled.parser(checkpoints=True)
+    parser.feed_many(tokenize(grammar, '(' * 5000 + '1'))
+    depth = parser.depth
+    assert depth > 5000
+
+    checkpoint = parser.checkpoint()
+    parser.feed_many(tokenize(grammar, ')' * 5000 + ';'))
+    assert parser.depth == 2
+
+    parser.restore(checkpoint)
+    assert parser.depth == depth
+
+    parser.feed_many(tokenize(grammar, '+ 2' + ')' * 5000 + ';'))
+    assert parser.finish() == [3]
+
+
+def test_restore_rejects_other_parser(grammar):
+    compiled, _ = grammar
+    parser = compiled.parser(checkpoints=True)
+    checkpoint = compiled.parser(checkpoints=True).checkpoint()
+
+    with pytest.raises(ValueError):
+        parser.restore(checkpoint)
@@ -0,0 +1,249 @@
+import pytest
+
+from lrpy.generator.generator import LRGenerator
+from lrpy.grammar.builder import GrammarBuilder
+from lrpy.lexer.generator import build_lexer_tables
+from lrpy.lexer.lexer import Lexer
+from lrpy.parser.parser import GrammarParser
+from lrpy.runtime.cst import Visitor
+from lrpy.runtime.tables import CompiledGrammar
+
+SOURCE = r"""
+token NUMBER: /[0-9]+/
+token PLUS: '+'
+token SEMICOLON: ';'
+token OPEN: '('
+token CLOSE: ')'
+ignore WHITESPACE: /[ \t\n]+/
+
+rule $program:
+    (statements:statement*) => { return statements }
+
+rule statement:
+    (value:sum ';') => { return value }
+
+rule sum:
+    (left:sum '+' right:term) => { return left + right }
+    (value:term) => { return value }
+
+rule term:
+    (number:NUMBER) => { return int(number.content) }
+    ('(' value:sum ')') => { return value }
+"""
+
+TEXT = '1 + (2 + 3); 4;'
+
+
+@pytest.fixture(scope='module')
+def grammar():
+    grammar = GrammarBuilder(GrammarParser(SOURCE).parse()).build()
+    return CompiledGrammar.from_generator(LRGenerator(grammar, 'program')), build_lexer_tables(
+        grammar
+    )
+
+
+def parse(grammar, text):
+    compiled, tables = grammar
+    parser = compiled.parser(cst=True)
+    parser.feed_lexer(Lexer(tables, text))
+    return parser.finish()
+
+
+def events(cursor):
+    # The recursive reference for `walk()`.
+    yield True, cursor
+    for child in cursor.children():
+        yield from events(child)
+    yield False, cursor
+
+
+def test_tree_is_postorder(grammar):
+    root = parse(grammar, TEXT)
+    tree = root.tree
+
+    assert root.index == len(tree) - 1
+    assert tree.nbytes == 28 * len(tree)
+
+    order = [node for entering, node in events(root) if not entering]
+    assert [node.index for node in order] == list(range(len(tree)))
+
+    for node in order:
+        children = node.children()
+        assert len(children) == len(node)
+        assert tree.sizes[node.index] == 1 + sum(tree.sizes[child.index] for child in children)
+        assert node.text == TEXT[node.start:node.end]
+
+        if node.is_token:
+            assert (node.production, node.productionid, children) == (None, None, [])
+        else:
+            assert node.type is None
+            assert node.name == node.production.nonterminal
+            assert [child.name for child in children] == [
+                getattr(symbol, 'name', None) or symbol.string for symbol in node.production.symbols
+            ]
+
+        if children:
+            assert (node.start, node.end) == (children[0].start, children[-1].end)
+
+
+def test_tree_tokens(grammar):
+    compiled, tables = grammar
+    root = parse(grammar, TEXT)
+
+    tokens = [node for entering, node in root.walk() if entering and node.is_token]
+    assert [(node.name, node.text) for node in tokens] == [
+        (tables.names[tables.values.index(token.type)], token.content)
+        for token in Lexer(tables, TEXT)
+    ]
+
+
+def test_walk_matches_recursive_walk(grammar):
+    root = parse(grammar, TEXT)
+
+    assert list(root.walk()) == list(events(root))
+
+    [statement, _] = [node for _, node in root.walk() if node.name == 'statement'][::2]
+    assert list(statement.walk()) == list(events(statement))
+
+
+def test_walk_skips_children(grammar):
+    root = parse(grammar, TEXT)
+    walker = root.walk()
+
+    visited = []
+    entering, node = next(walker)
+    while True:
+        visited.append((entering, node.name, node.text))
+        try:
+            entering, node = walker.send(False if entering and node.name == 'statement' else None)
+        except StopIteration:
+            break
+
+    # A skipped node gets no leave event either.
+    assert visited == [
+        (True, 'program', TEXT),
+        (True, '__Repeat0__', TEXT),
+        (True, '__Repeat0__', '1 + (2 + 3);'),
+        (True, 'statement', '1 + (2 + 3);'),
+        (False, '__Repeat0__', '1 + (2 + 3);'),
+        (True, 'statement', '4;'),
+        (False, '__Repeat0__', TEXT),
+        (False, 'program', TEXT),
+    ]
+
+
+def test_walk_deep_tree(grammar):
+    count = 20000
+    root = parse(grammar, '1 + ' * count + '1;' + ' (' * count + '2' + ')' * count + ';')
+
+    numbers = [node.text for entering, node in root.walk() if entering and node.name == 'NUMBER']
+    assert numbers == ['1'] * (count + 1) + ['2']
+
+
+def test_visitor(grammar):
+    root = parse(grammar, TEXT)
+
+    class Collector(Visitor):
+        def __init__(self):
+            self.events = []
+
+        def enter_statement(self, cursor):
+            self.events.append(('statement', cursor.text))
+
+        def enter_term(self, cursor):
+            self.events.append(('term', cursor.text))
+            return False
+
+        def leave_sum(self, cursor):
+            self.events.append(('sum', cursor.text))
+
+        def enter(self, cursor):
+            self.events.append(('enter', cursor.name))
+
+    collector = Collector()
+    collector.visit(root)
+
+    assert collector.events == [
+        ('enter', 'program'),
+        ('enter', '__Repeat0__'),
+        ('enter', '__Repeat0__'),
+        ('statement', '1 + (2 + 3);'),
+        ('enter', 'sum'),
+        ('enter', 'sum'),
+        ('term', '1'),
+        ('sum', '1'),
+        ('enter', 'PLUS'),
+        ('term', '(2 + 3)'),
+        ('sum', '1 + (2 + 3)'),
+        ('enter', 'SEMICOLON'),
+        ('statement', '4;'),
+        ('enter', 'sum'),
+        ('term', '4'),
+        ('sum', '4'),
+        ('enter', 'SEMICOLON'),
+    ]
+
+
+def test_visitor_defaults_visit_everything(grammar):
+    root = parse(grammar, TEXT)
+
+    class Counter(Visitor):
+        def __init__(self):
+            self.entered = self.left = 0
+
+        def enter(self, cursor):
+            self.entered += 1
+
+        def leave(self, cursor):
+            self.left += 1
+
+    counter = Counter()
+    counter.visit(root)
+    assert counter.entered == counter.left == len(root.tree)
+
+    Visitor().visit(root)
+
+
+def test_evaluate(grammar):
+    compiled, tables = grammar
+    root = parse(grammar, TEXT)
+
+    parser = compiled.parser()
+    parser.feed_lexer(Lexer(tables, TEXT))
+    assert root.evaluate() == parser.finish() == [6, 4]
+
+    assert [
+        node.evaluate() for entering, node in root.walk() if entering and node.name == 'sum'
+    ] == [6, 1, 5, 2, 4]
+
+
+def test_empty_production(grammar):
+    compiled, tables = grammar
+    root = parse(grammar, '')
+
+    assert root.name == 'program'
+    assert (root.start, root.end, root.text) == (0, 0, '')
+    assert [(len(child), child.start, child.end) for child in root.children()] == [(0, 0, 0)]
+
+    parser = compiled.parser()
+    parser.feed_lexer(Lexer(tables, ''))
+    assert root.evaluate() == parser.finish()
+
+
+def test_cursor_errors(grammar):
+    compiled, tables = grammar
+    root = parse(grammar, TEXT)
+
+    with pytest.raises(IndexError):
+        root.tree.cursor(len(root.tree))
+
+    assert root.tree.cursor(root.index) == root
+    assert len({root.tree.cursor(root.index), root}) == 1
+
+    parser = compiled.parser(cst=True)
+    parser.feed_many(Lexer(tables, TEXT))
+    root = parser.finish()
+
+    assert root.text is None
+    with pytest.raises(ValueError):
+        root.evaluate()
@@ -0,0 +1,44 @@
+import gc
+import weakref
+
+from lrpy.encoding import LINE_LIMIT, BufferLineReader, EncodingDetector
+
+
+def test_readline_is_bounded():
+    reader = BufferLineReader(memoryview(b'x' * (4 * LINE_LIMIT) + b'\n# second\n'))
+
+    assert reader.readline() == b'x' * LINE_LIMIT
+    assert reader.readline() == b'# second\n'
+    assert reader.readline() == b''
+
+
+def test_from_buffer():
+    assert bytes(EncodingDetector.from_buffer(b'\xef\xbb\xbfrule')) == b'rule'
+    assert EncodingDetector.from_buffer('# coding: latin-1\n\xe9'.encode('latin-1')) == (
+        '# coding: latin-1\n\xe9'
+    )
+
+
+def test_open_mmap_owns_mapping(tmp_path):
+    path = tmp_path / 'grammar.lr'
+    path.write_bytes(b'rule $a:\n' * 100)
+
+    view = EncodingDetector.open_mmap(path)
+    assert bytes(view[:8]) == b'rule $a:'
+
+    mapping = weakref.ref(view.obj)
+    with view:
+        pass
+
+    del view
+    gc.collect()
+    assert mapping() is None
+
+
+def test_open_mmap_decoded(tmp_path):
+    path = tmp_path / 'grammar.lr'
+    path.write_bytes('# coding: latin-1\n\xe9'.encode('latin-1'))
+    assert EncodingDetector.open_mmap(path) == '# coding: latin-1\n\xe9'
+
+    path.write_bytes(b'')
+    assert EncodingDetector.open_mmap(path) == ''
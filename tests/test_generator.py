@@ -0,0 +1,79 @@
+import pytest
+
+from lrpy.generator.generator import LRGenerator, LRItem
+from lrpy.grammar.builder import GrammarBuilder
+from lrpy.grammar.grammar import NonterminalSymbol
+from lrpy.parser.parser import GrammarParser
+from lrpy.stats import CompilationStats
+
+SOURCE = r"""
+token NUMBER: /[0-9]+/
+token PLUS: '+'
+token TIMES: '*'
+
+rule $expr:
+    (left:expr '+' right:term) => { return left + right }
+    (value:term) => { return value }
+
+rule term:
+    (left:term '*' right:NUMBER) => { return left * int(right.content) }
+    (value:NUMBER) => { return int(value.content) }
+"""
+
+
+def test_closure_stats():
+    grammar = GrammarBuilder(GrammarParser(SOURCE).parse()).build()
+    stats = CompilationStats()
+    generator = LRGenerator(grammar, 'expr', stats=stats)
+    generator.build_states()
+
+    assert stats.states == len(generator.states)
+    assert stats.closure_calls == stats.states
+    assert stats.closure_items >= stats.states
+    assert set(stats.timings) >= {'first', 'follow', 'states'}
+
+
+def reference_closure(generator, items):
+    closure = set(items)
+    stack = [item for item in items if item.is_nonterminal()]
+
+    while stack:
+        for item in generator.items(stack.pop().symbol):
+            if item not in closure:
+                closure.add(item)
+                if item.is_nonterminal():
+                    stack.append(item)
+
+    return frozenset(closure)
+
+
+def test_item_helpers():
+    grammar = GrammarBuilder(GrammarParser(SOURCE).parse()).build()
+    stats = CompilationStats()
+    generator = LRGenerator(grammar, 'expr', stats=stats)
+    generator.build_states()
+    calls = stats.closure_calls
+
+    start = generator.items(NonterminalSymbol(name='expr'))
+    assert start == frozenset(
+        LRItem(production, 0) for production in grammar.nonterminals['expr'].productions
+    )
+
+    for kernel, stateno in generator.states.items():
+        closure = generator.closure(kernel)
+        assert closure == reference_closure(generator, kernel)
+
+        transitions = generator.transitions(closure)
+        targets = {**generator.shifts[stateno], **generator.gotos[stateno]}
+        assert {
+            symbol: generator.states[items] for symbol, items in transitions.items()
+            if symbol is not None
+        } == targets
+        assert transitions.get(None, frozenset()) == frozenset(
+            item.advance() for item in generator.reductions[stateno]
+        )
+
+    assert stats.closure_calls == calls
+
+    with pytest.raises(ValueError):
+        generator.closure([LRItem(next(iter(start)).production, 5)])
@@ -0,0 +1,176 @@
+import random
+import re
+
+import pytest
+
+from lrpy.generator.generator import LRGenerator
+from lrpy.grammar.builder import GrammarBuilder
+from lrpy.lexer.exceptions import InvalidPatternError, LexerError
+from lrpy.lexer.generator import LexerGenerator, build_lexer_tables
+from lrpy.lexer.lexer import Lexer
+from lrpy.lexer.regex import RegexParser
+from lrpy.parser.parser import GrammarParser
+from lrpy.runtime.tables import CompiledGrammar
+
+DECLARATIONS = [
+    ('IF', 'if', False),
+    ('ELSE', 'else', False),
+    ('OPEN', '(', False),
+    ('CLOSE', ')', False),
+    ('NAME', r'[A-Za-z_][A-Za-z0-9_]*', True),
+    ('HEX', r'0x[0-9a-fA-F]{1,4}', True),
+    ('NUMBER', r'-?(0|[1-9][0-9]*)(\.[0-9]+)?([eE][+\-]?[0-9]+)?', True),
+    ('STRING', r'"([^"\\\n]|\\.)*"', True),
+    ('OPERATOR', r'[-+*\/=<>!]=?|\*\*', True),
+    ('RUN', r'(ab|a)(bc)?c{2,}', True),
+    ('GREEK', r'[α-ω]+', True),
+    ('ELLIPSIS', r'\.\.\.?', True),
+]
+
+WORDS = [
+    'if', 'else', 'iffy', 'elsewhere', '(', ')', 'x', '_a1', '0', '42', '-7', '3.25', '1e9',
+    '2.5E-3', '0x1F', '0xBEEF9', '"a b"', '"\\"q\\""', '+', '+=', '**', '*', '!=', 'abcc', 'acccc',
+    'abccc', 'αβγ', '..', '...', '....',
+]
+
+
+def lexer_tables(declarations, ignore=r'[ \t]+'):
+    lines = []
+    for name, pattern, regex in declarations:
+        lines.append(f'token {name}: /{pattern}/' if regex else f"token {name}: '{pattern}'")
+
+    lines.append(f'ignore WHITESPACE: /{ignore}/')
+    lines.append(f'rule $start:\n    ({declarations[0][0]}) => {{ return None }}')
+    grammar = GrammarBuilder(GrammarParser('\n'.join(lines) + '\n').parse()).build()
+    return build_lexer_tables(grammar)
+
+
+def reference(declarations, text):
+    # Longest match, ties to literals, then to the earlier declaration.
+    order = sorted(declarations, key=lambda declaration: declaration[2])
+    patterns = [
+        (name, re.compile(pattern if regex else re.escape(pattern)))
+        for name, pattern, regex in order
+    ]
+    whitespace = re.compile(r'[ \t]+')
+
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = whitespace.match(text, position)
+        if match is not None:
+            position = match.end()
+            continue
+
+        for end in range(len(text), position, -1):
+            name = next(
+                (name for name, pattern in patterns if pattern.fullmatch(text, position, end)),
+                None,
+            )
+            if name is not None:
+                break
+        else:
+            return None
+
+        tokens.append((name, text[position:end]))
+        position = end
+
+    return tokens
+
+
+def scan(tables, text):
+    names = {value: name for name, value in zip(tables.names, tables.values)}
+    try:
+        return [(names[token.type], token.content) for token in Lexer(tables, text)]
+    except LexerError:
+        return None
+
+
+def test_tokens_match_re():
+    tables = lexer_tables(DECLARATIONS)
+    generator = random.Random(1)
+
+    for _ in range(500):
+        words = generator.choices(WORDS, k=generator.randint(1, 8))
+        text = ''.join(word + generator.choice(('', ' ', ' ')) for word in words)
+        assert scan(tables, text) == reference(DECLARATIONS, text), text
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('if', [('IF', 'if')]),
+    ('iffy', [('SECOND', 'iffy')]),
+    ('abc', [('FIRST', 'abc')]),
+    ('abd', [('SECOND', 'abd')]),
+    ('abc if', [('FIRST', 'abc'), ('IF', 'if')]),
+])
+def test_priority_ties(text, expected):
+    declarations = [
+        ('FIRST', r'[a-c]+', True),
+        ('SECOND', r'[a-z]+', True),
+        ('NAME', r'[a-z]+', True),
+        ('IF', 'if', False),
+    ]
+    tables = lexer_tables(declarations)
+
+    assert scan(tables, text) == expected == reference(declarations, text)
+
+
+@pytest.mark.parametrize('pattern', ['a+?', 'a*?', 'a??', 'a{2}?', 'a*+', 'a++', 'a**', '^a', 'a$'])
+def test_unsupported_patterns(pattern):
+    with pytest.raises(InvalidPatternError):
+        RegexParser(pattern).parse()
+
+
+@pytest.mark.parametrize('pattern', [r'\^a\$', '[$^]', '(a+)?', 'a{2,}b?'])
+def test_supported_patterns(pattern):
+    RegexParser(pattern).parse()
+
+
+KEYWORDS = r"""
+token IF: 'if'
+token ELSE: 'else'
+token NAME: /[a-z]+/
+token EQUALS: '='
+token SEMICOLON: ';'
+ignore WHITESPACE: /[ ]+/
+
+rule $statement:
+    ('if' name:NAME ';') => { return ('if', name.content) }
+    (name:NAME '=' value:NAME ';') => { return (name.content, value.content) }
+"""
+
+
+def test_keywords_are_absorbed():
+    grammar = GrammarBuilder(GrammarParser(KEYWORDS).parse()).build()
+    tables = build_lexer_tables(grammar)
+
+    [keywords] = [table for table in tables.keywords if table is not None]
+    assert set(keywords) == {'if', 'else'}
+
+    # The keywords are looked up after NAME matches, so they add no states of their own.
+    without = GrammarBuilder(GrammarParser(KEYWORDS.replace("'if'", "'if!'")).parse()).build()
+    assert LexerGenerator(without).generate().statecount > tables.statecount
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('if', [('IF', 'if')]),
+    ('else elsewhere', [('ELSE', 'else'), ('NAME', 'elsewhere')]),
+    ('iff = if;', [('NAME', 'iff'), ('EQUALS', '='), ('IF', 'if'), ('SEMICOLON', ';')]),
+])
+def test_keyword_tokens(text, expected):
+    grammar = GrammarBuilder(GrammarParser(KEYWORDS).parse()).build()
+    assert scan(build_lexer_tables(grammar), text) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('if if;', ('if', 'if')),
+    ('x = if;', ('x', 'if')),
+    ('else = x;', ('else', 'x')),
+])
+def test_keywords_as_identifiers(text, expected):
+    grammar = GrammarBuilder(GrammarParser(KEYWORDS).parse()).build()
+    compiled = CompiledGrammar.from_generator(LRGenerator(grammar, 'statement'))
+
+    parser = compiled.parser()
+    parser.feed_lexer(Lexer(build_lexer_tables(grammar), text))
+    assert parser.finish() == expected
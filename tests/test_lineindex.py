@@ -0,0 +1,61 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from lrpy import lineindex
+from lrpy.lineindex import LineIndex
+
+TEXT = 'first\nsecond\n\nfourth'
+
+
+@pytest.mark.parametrize('source', [
+    TEXT,
+    TEXT.encode(),
+    bytearray(TEXT.encode()),
+    memoryview(TEXT.encode()),
+])
+def test_build(source):
+    index = LineIndex.build(source)
+
+    assert list(index.linestarts) == [0, 6, 13, 14]
+    assert [index.location(pos) for pos in (0, 5, 6, 13, 16)] == [
+        (1, 0), (1, 5), (2, 0), (3, 0), (4, 2)
+    ]
+
+
+def test_for_source_is_shared():
+    source = ''.join(('shared', '\n', 'source'))
+
+    assert LineIndex.for_source(source) is LineIndex.for_source(source)
+
+
+@pytest.mark.parametrize('source', [bytearray(b'a\nb'), memoryview(bytearray(b'a\nb'))])
+def test_mutable_sources_are_not_cached(source):
+    assert LineIndex.for_source(source).lineno(2) == 2
+
+    source[1:2] = b'-'
+    assert LineIndex.for_source(source).lineno(2) == 1
+
+
+def test_large_sources_are_not_cached():
+    source = 'x\n' * (lineindex.CACHE_LIMIT // 2 + 1)
+
+    index = LineIndex.for_source(source)
+    assert index.lineno(len(source) - 1) == lineindex.CACHE_LIMIT // 2 + 1
+    assert all(entry[0] is not source for entry in lineindex._cache.values())
+
+
+def test_for_source_from_threads():
+    sources = [f'{number}\n' * number for number in range(1, 65)]
+    barrier = threading.Barrier(8)
+
+    def lookup(offset):
+        barrier.wait()
+        for _ in range(20):
+            for source in sources[offset:] + sources[:offset]:
+                assert LineIndex.for_source(source).lineno(len(source) - 1) == source.count('\n')
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for future in [executor.submit(lookup, offset) for offset in range(0, 64, 8)]:
+            future.result()
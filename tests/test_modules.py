@@ -0,0 +1,59 @@
+import pytest
+
+from lrpy.build import compile_grammar
+from lrpy.grammar.exceptions import UnknownSymbolError
+from lrpy.grammar.modules import ModuleLoader
+from lrpy.lexer.tokens import LexerToken
+from lrpy.textspan import TextSpan
+
+TOKENS = {'NUMBER': 1, '+': 2, ';': 3}
+
+COMMON = r"""
+rule sum:
+    (left:sum '+' right:NUMBER) => { return left + int(right.content) }
+    (value:NUMBER) => { return int(value.content) }
+"""
+
+ROOT = r"""
+import 'common.lr' as common
+
+rule $statement:
+    (value:common.sum ';') => { return value }
+"""
+
+
+def tokenize(text):
+    tokens = []
+    for position, content in enumerate(text.split()):
+        type = TOKENS['NUMBER'] if content.isdigit() else TOKENS[content]
+        tokens.append(LexerToken(type, TextSpan(position, position + 1), content))
+
+    return tokens
+
+
+@pytest.fixture
+def directory(tmp_path):
+    (tmp_path / 'common.lr').write_text(COMMON)
+    (tmp_path / 'root.lr').write_text(ROOT)
+    (tmp_path / 'other.lr').write_text(ROOT)
+    return tmp_path
+
+
+def test_modules_use_the_token_map(directory):
+    loader = ModuleLoader()
+    compiled, _, dependencies = compile_grammar(
+        str(directory / 'root.lr'), tokens=TOKENS, loader=loader
+    )
+
+    assert list(dependencies) == [str((directory / 'common.lr').resolve())]
+    assert compiled.parse(tokenize('1 + 2 + 3 ;')) == 6
+
+    # The module is built once for grammars that share the token map.
+    modules = list(loader.modules.values())
+    compile_grammar(str(directory / 'other.lr'), tokens=TOKENS, loader=loader)
+    assert list(loader.modules.values()) == modules
+
+
+def test_modules_without_the_token_map(directory):
+    with pytest.raises(UnknownSymbolError):
+        compile_grammar(str(directory / 'root.lr'))
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from lrpy.generator.generator import LRGenerator
+from lrpy.grammar.builder import GrammarBuilder
+from lrpy.lexer.generator import build_lexer_tables
+from lrpy.lexer.lexer import Lexer
+from lrpy.parser.parser import GrammarParser
+from lrpy.runtime import parallel
+from lrpy.runtime.parallel import parse_parallel
+from lrpy.runtime.tables import CompiledGrammar
+
+SOURCE = r"""
+token NUMBER: /[0-9]+/
+token PLUS: '+'
+token SEMICOLON: ';'
+ignore WHITESPACE: /[ \t\n]+/
+
+rule $statement:
+    (value:sum ';') => { return value * SCALE }
+
+rule sum:
+    (left:sum '+' right:NUMBER) => { return left + int(right.content) }
+    (value:NUMBER) => { return int(value.content) }
+"""
+
+TEXT = ' '.join(f'{index} + {index};' for index in range(200))
+
+
+def compile_grammar(scale):
+    grammar = GrammarBuilder(GrammarParser(SOURCE).parse()).build()
+    compiled = CompiledGrammar.from_generator(
+        LRGenerator(grammar, 'statement'), namespace={'SCALE': scale}
+    )
+    tables = build_lexer_tables(grammar)
+    return compiled, list(Lexer(tables, TEXT)), tables.values[tables.names.index('SEMICOLON')]
+
+
+def sequential(compiled, tokens):
+    parser = compiled.parser(stream=True)
+    parser.feed_many(tokens)
+    parser.finish()
+    return parser.results
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_parse_parallel_matches_sequential(workers):
+    compiled, tokens, semicolon = compile_grammar(1)
+    results = parse_parallel(compiled, tokens, sync={semicolon}, workers=workers, chunksize=16)
+
+    assert results == sequential(compiled, tokens)
+    assert results[:3] == [0, 2, 4]
+
+
+def test_serial_calls_do_not_share_tables():
+    grammars = [compile_grammar(scale) for scale in (1, 10)]
+    barrier = threading.Barrier(len(grammars))
+    results = {}
+    tables = parallel._grammar
+
+    def run(index, compiled, tokens, semicolon):
+        barrier.wait()
+        for _ in range(20):
+            value = parse_parallel(compiled, tokens, sync={semicolon}, workers=1)
+            results.setdefault(index, []).append(value)
+
+    threads = [
+        threading.Thread(target=run, args=(index, *grammar))
+        for index, grammar in enumerate(grammars)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for index, (compiled, tokens, _) in enumerate(grammars):
+        expected = sequential(compiled, tokens)
+        assert all(value == expected for value in results[index])
+
+    assert parallel._grammar is tables
@@ -0,0 +1,168 @@
+import pytest
+
+from lrpy.generator.generator import LRGenerator
+from lrpy.grammar.builder import GrammarBuilder
+from lrpy.lexer.generator import build_lexer_tables
+from lrpy.lexer.exceptions import LexerError
+from lrpy.lexer.lexer import Lexer
+from lrpy.parser.parser import GrammarParser
+from lrpy.runtime.exceptions import ParseError
+from lrpy.runtime.parser import HookedParser, Parser
+from lrpy.runtime.tables import CompiledGrammar
+from lrpy.runtime.tracing import Tracer, TracingParser
+
+SOURCE = r"""
+token NUMBER: /[0-9]+/
+token PLUS: '+'
+token SEMICOLON: ';'
+ignore WHITESPACE: /[ \t\n]+/
+
+rule $statement:
+    (value:sum ';') => { return value }
+
+rule sum:
+    (left:sum '+' right:NUMBER) => { return left + int(right.content) }
+    (value:NUMBER) => { return int(value.content) }
+"""
+
+
+@pytest.fixture(scope='module')
+def grammar():
+    grammar = GrammarBuilder(GrammarParser(SOURCE).parse()).build()
+    compiled = CompiledGrammar.from_generator(LRGenerator(grammar, 'statement'))
+    return compiled, build_lexer_tables(grammar)
+
+
+def parse(parser, tables, text):
+    parser.feed_many(Lexer(tables, text).scan_all())
+    return parser.finish()
+
+
+@pytest.mark.parametrize('options', [{}, {'checkpoints': True}, {'recover': True}])
+def test_parse(grammar, options):
+    compiled, tables = grammar
+    assert parse(compiled.parser(**options), tables, '1 + 2 + 3;') == 6
+
+
+@pytest.mark.parametrize('options', [{}, {'checkpoints': True}])
+def test_stream(grammar, options):
+    compiled, tables = grammar
+    parser = compiled.parser(stream=True, **options)
+
+    parse(parser, tables, '1 + 2; 3; 4 + 5;')
+    assert parser.results == [3, 3, 9]
+
+
+@pytest.mark.parametrize('options', [{}, {'checkpoints': True}, {'cst': True}])
+def test_error(grammar, options):
+    compiled, tables = grammar
+
+    with pytest.raises(ParseError) as info:
+        parse(compiled.parser(**options), tables, '1 + + 2;')
+
+    assert info.value.token.span.startpos == 4
+
+    with pytest.raises(ParseError, match='end of input'):
+        parse(compiled.parser(**options), tables, '1 +')
+
+
+@pytest.mark.parametrize('options', [{}, {'checkpoints': True}, {'recover': True}, {'cst': True}])
+def test_lexer_unexpected_token(grammar, options):
+    compiled, tables = grammar
+    parser = compiled.parser(**options)
+
+    if options.get('recover'):
+        parser.feed_lexer(Lexer(tables, '1 + + 2;'))
+        parser.finish()
+        [error] = parser.errors
+    else:
+        with pytest.raises(ParseError) as info:
+            parser.feed_lexer(Lexer(tables, '1 + + 2;'))
+        error = info.value
+
+    assert error.token.span.startpos == 4
+    assert error.expected == [tables.values[tables.names.index('NUMBER')]]
+
+
+@pytest.mark.parametrize('options', [{}, {'checkpoints': True}, {'recover': True}])
+def test_lexer_stream(grammar, options):
+    compiled, tables = grammar
+    parser = compiled.parser(stream=True, **options)
+
+    parser.feed_lexer(Lexer(tables, '1 + 2; 3; 4 + 5;'))
+    parser.finish()
+    assert parser.results == [3, 3, 9]
+
+
+def test_lexer_invalid_character(grammar):
+    compiled, tables = grammar
+
+    with pytest.raises(LexerError):
+        compiled.parser().feed_lexer(Lexer(tables, '1 + ?'))
+
+
+def test_checkpoint_restore(grammar):
+    compiled, tables = grammar
+    parser = compiled.parser(checkpoints=True)
+
+    parser.feed_many(Lexer(tables, '1 +').scan_all())
+    checkpoint = parser.checkpoint()
+    parser.feed_many(Lexer(tables, '2 +').scan_all())
+    parser.restore(checkpoint)
+
+    assert parse(parser, tables, '5;') == 6
+
+
+def test_cst(grammar):
+    compiled, tables = grammar
+    parser = compiled.parser(cst=True)
+    parser.feed_lexer(Lexer(tables, '1 + 2;'))
+    root = parser.finish()
+
+    assert root.name == 'statement'
+    assert [child.text for child in root.children()] == ['1 + 2', ';']
+    assert root.evaluate() == 3
+
+
+def test_tracing_stream_counts_one_parse(grammar):
+    compiled, tables = grammar
+    tracer = Tracer(compiled, sample=2)
+
+    parser = compiled.parser(stream=True, tracer=tracer)
+    assert isinstance(parser, TracingParser)
+    parse(parser, tables, '1; 2; 3;')
+    assert parser.results == [1, 2, 3]
+    assert (tracer.parses, tracer.sampled) == (1, 1)
+    assert sum(tracer.shifts) == 6
+
+    parse(parser, tables, '4; 5;')
+    assert (tracer.parses, tracer.sampled) == (2, 1)
+    assert sum(tracer.shifts) == 6
+
+
+def test_plain_parser_has_no_hooks(grammar):
+    compiled, _ = grammar
+
+    assert type(compiled.parser()) is Parser
+    assert not hasattr(Parser, '_shift') and not hasattr(Parser, '_reduce')
+    for options in ({'checkpoints': True}, {'recover': True}, {'cst': True}):
+        assert isinstance(compiled.parser(**options), HookedParser)
+
+
+def test_tracing_times_actions(grammar):
+    compiled, tables = grammar
+    events = []
+
+    class RecordingTracer(Tracer):
+        def on_reduce(self, state, productionid):
+            events.append(('reduce', productionid))
+            super().on_reduce(state, productionid)
+
+        def on_action(self, productionid, elapsed):
+            events.append(('action', productionid))
+            super().on_action(productionid, elapsed)
+
+    tracer = RecordingTracer(compiled)
+    assert parse(compiled.parser(tracer=tracer), tables, '1 + 2;') == 3
+    assert [kind for kind, _ in events] == ['reduce', 'action'] * 3
+    assert events[::2] == [('reduce', productionid) for _, productionid in events[1::2]]
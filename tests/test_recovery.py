@@ -0,0 +1,77 @@
+import pytest
+
+from lrpy.generator.generator import LRGenerator
+from lrpy.grammar.builder import GrammarBuilder
+from lrpy.lexer.generator import build_lexer_tables
+from lrpy.lexer.lexer import Lexer
+from lrpy.parser.parser import GrammarParser
+from lrpy.runtime.exceptions import ParseError
+from lrpy.runtime.tables import CompiledGrammar
+
+PANIC = r"""
+token NUMBER: /[0-9]+/
+token PLUS: '+'
+token SEMICOLON: ';'
+ignore WHITESPACE: /[ \t\n]+/
+
+rule $program:
+    (statements:statement+) => { return statements }
+
+rule statement:
+    (value:expr ';') => { return value }
+
+rule expr:
+    (left:expr '+' right:term) => { return left + right }
+    (value:term) => { return value }
+
+rule term:
+    (number:NUMBER) => { return int(number.content) }
+"""
+
+ERROR_RULES = r"""
+token NAME: /[a-z]+/
+token NUMBER: /[0-9]+/
+token EQUALS: '='
+token SEMICOLON: ';'
+ignore WHITESPACE: /[ \t\n]+/
+
+rule $program:
+    (statements:statement*) => { return statements }
+
+rule statement:
+    (name:NAME '=' value:NUMBER ';') => { return (name.content, int(value.content)) }
+    (e:error ';') => { return None }
+"""
+
+
+def compile_grammar(source, entrypoint):
+    grammar = GrammarBuilder(GrammarParser(source).parse()).build()
+    compiled = CompiledGrammar.from_generator(LRGenerator(grammar, entrypoint))
+    return compiled, build_lexer_tables(grammar)
+
+
+def parse(source, text):
+    compiled, tables = compile_grammar(source, 'program')
+    parser = compiled.parser(recover=True)
+    parser.feed_lexer(Lexer(tables, text))
+    return parser.finish(), parser.errors
+
+
+@pytest.mark.parametrize('text, result, positions', [
+    ('1 + 2; 3;', [3, 3], []),
+    ('1 + + 2; 3;', [3], [4]),
+    ('1 2; 3 + ; 4;', [2, 4], [2, 9]),
+])
+def test_panic_mode(text, result, positions):
+    value, errors = parse(PANIC, text)
+
+    assert value == result
+    assert all(isinstance(error, ParseError) for error in errors)
+    assert [error.token.span.startpos for error in errors] == positions
+
+
+def test_error_rules():
+    value, errors = parse(ERROR_RULES, 'a = 1; b 2; c = 3;')
+
+    assert value == [('a', 1), None, ('c', 3)]
+    assert [error.token.content for error in errors] == ['2']
@@ -0,0 +1,161 @@
+import io
+import random
+
+import pytest
+
+from lrpy.encoding import EncodingDetector
+from lrpy.parser.exceptions import InvalidGrammarError
+from lrpy.parser.parser import GrammarParser
+from lrpy.parser.scanner import GrammarScanner
+from lrpy.parser.tokens import TokenType
+from lrpy.streamreader import StreamReader
+from lrpy.textspan import TextSpan
+
+SOURCE = 'rule a:\n    (b)\n  end'
+
+
+@pytest.mark.parametrize('startpos, line', [(0, 'rule a:'), (12, '    (b)'), (18, '  end')])
+def test_fmterror_quotes_one_line(startpos, line):
+    scanner = GrammarScanner(SOURCE)
+    message = scanner.fmterror('Problem', TextSpan(startpos, startpos + 1))
+
+    assert message.splitlines()[1] == line
+
+
+def test_fmterror_with_crlf():
+    scanner = GrammarScanner('first\r\nsecond\r\n')
+    message = scanner.fmterror('Problem', TextSpan(7, 8))
+
+    assert message.splitlines()[:2] == ['File \'<string>\', line 2: Problem', 'second']
+
+
+def test_reset_stream_parser():
+    parser = GrammarParser(StreamReader(io.BytesIO(b'rule $a:\n    (b)\n')))
+    assert [rule.name for rule in parser.parse().rules] == ['a']
+
+    parser.reset(StreamReader(io.BytesIO(b'rule $c:\n    (d)\n')), filename='c.lr')
+    assert [rule.name for rule in parser.parse().rules] == ['c']
+
+    parser.reset(StreamReader(io.BytesIO(b'rule $e:\n    (f\n')), filename='e.lr')
+    with pytest.raises(InvalidGrammarError, match='e.lr'):
+        parser.parse()
+
+
+@pytest.mark.parametrize('chunksize', [1, 4, 16, 1024])
+@pytest.mark.parametrize('source', [
+    b'rule $a:\n    (b c ) )\nrule d:\n    (e)\n',
+    b'rule $a:\n    (b c\n\n\n    )\n   d e ]\n',
+])
+def test_stream_fmterror_quotes_whole_line(chunksize, source):
+    with pytest.raises(InvalidGrammarError) as expected:
+        GrammarParser(source.decode()).parse()
+
+    with pytest.raises(InvalidGrammarError) as info:
+        GrammarParser(StreamReader(io.BytesIO(source), chunksize=chunksize)).parse()
+
+    assert str(info.value) == str(expected.value)
+
+
+def test_stream_text_rejects_discarded_range():
+    reader = StreamReader(io.BytesIO(b'first line\nsecond line\n'), chunksize=4)
+    reader.peek(16)
+    reader.advance(14)
+    reader.discard()
+
+    assert reader.text(11, 17) == 'second'
+    with pytest.raises(ValueError):
+        reader.text(0, 5)
+
+
+def test_open_stream_closes_file(tmp_path):
+    path = tmp_path / 'grammar.lr'
+    path.write_bytes(b'rule $a:\n    (b)\n')
+
+    with EncodingDetector.open_stream(path) as reader:
+        assert [rule.name for rule in GrammarParser(reader).parse().rules] == ['a']
+
+    assert reader.stream.closed
+
+
+def scan_types(scanner):
+    types = []
+    while True:
+        token = scanner.scan()
+        types.append(token.type)
+        if token.type is TokenType.EOF:
+            return types
+
+
+@pytest.mark.parametrize('fast', [False, True])
+def test_punctuators(fast):
+    scanner = GrammarScanner('( ) [ ] : + * $ . => $=>', fast=fast)
+
+    assert scan_types(scanner) == [
+        TokenType.OPENPAREN, TokenType.CLOSEPAREN, TokenType.OPENBRACKET,
+        TokenType.CLOSEBRACKET, TokenType.COLON, TokenType.PLUS, TokenType.STAR,
+        TokenType.DOLLAR, TokenType.DOT, TokenType.ARROW, TokenType.DOLLAR, TokenType.ARROW,
+        TokenType.EOF,
+    ]
+
+
+@pytest.mark.parametrize('fast', [False, True])
+@pytest.mark.parametrize('source', ['=', 'a = b', '=>='])
+def test_invalid_punctuator(fast, source):
+    with pytest.raises(InvalidGrammarError, match='Invalid Token'):
+        scan_types(GrammarScanner(source, fast=fast))
+
+
+PIECES = [
+    'rule', '$start', 'name_1', 'éa', 'x', ' ', '  ', '\t', '\n', '\r\n', '# comment\n',
+    '#', "'a'", '"b c"', "'\\''", '"\\\\"', '/[0-9]+/', '/a\\/b/', '{ return 1 }',
+    '{ {nested} }', '(', ')', '[', ']', ':', '+', '*', '$', '.', '=>', "'open", '{ open', '/open',
+]
+
+
+def random_sources(count, seed=0):
+    generator = random.Random(seed)
+    for _ in range(count):
+        yield ''.join(generator.choices(PIECES, k=generator.randint(1, 12)))
+
+
+def scan_tokens(scanner):
+    tokens = []
+    try:
+        while True:
+            token = scanner.scan()
+            tokens.append((
+                token.type, token.span.startpos, token.span.endpos, getattr(token, 'content', None)
+            ))
+            if token.type is TokenType.EOF:
+                return tokens
+    except InvalidGrammarError as error:
+        tokens.append(str(error))
+        return tokens
+
+
+def test_fast_scanner_matches_slow_scanner():
+    for source in random_sources(2000):
+        expected = scan_tokens(GrammarScanner(source))
+        assert scan_tokens(GrammarScanner(source, fast=True)) == expected, source
+
+
+GRAMMAR = """
+token NUMBER: /[0-9]+/  # digits
+token PLUS: '+'
+
+rule $sum:
+    (left:sum '+' right:NUMBER) => { return {'value': left + right} }
+    (value:NUMBER) => { return value }
+"""
+
+
+def describe(node):
+    return [
+        (rule.name, [(alternative.span, alternative.action) for alternative in rule.alternatives])
+        for rule in node.rules
+    ] + [(token.name, token.pattern, token.regex) for token in node.tokens]
+
+
+def test_fast_parse_matches_slow_parse():
+    expected = describe(GrammarParser(GRAMMAR).parse())
+    assert describe(GrammarParser(GRAMMAR, fast=True).parse()) == expected
@@ -0,0 +1,12 @@
+from lrpy.stats import CompilationStats
+
+
+def test_phase_timing():
+    events = []
+    stats = CompilationStats(callback=lambda name, elapsed, stats: events.append((name, elapsed)))
+
+    with stats.phase('build'):
+        pass
+
+    assert events == [('build', stats.timings['build'])]
+    assert stats.timings['build'] >= 0
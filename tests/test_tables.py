@@ -0,0 +1,94 @@
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from lrpy.generator.generator import LRGenerator
+from lrpy.grammar.builder import GrammarBuilder
+from lrpy.lexer.generator import build_lexer_tables
+from lrpy.lexer.lexer import Lexer
+from lrpy.parser.parser import GrammarParser
+from lrpy.runtime.tables import CompiledGrammar
+
+STATEMENT = r"""
+token NUMBER: /[0-9]+/
+token SEMICOLON: ';'
+ignore WHITESPACE: /[ \t\n]+/
+
+rule $statement:
+    (value:NUMBER ';') => { return int(value.content) }
+"""
+
+AMBIGUOUS = r"""
+token NUMBER: /[0-9]+/
+token PLUS: '+'
+ignore WHITESPACE: /[ \t\n]+/
+
+rule $sum:
+    (left:sum '+' right:sum) => { return left + right }
+    (value:NUMBER) => { return int(value.content) }
+"""
+
+
+def compile_grammar(source, entrypoint):
+    grammar = GrammarBuilder(GrammarParser(source).parse()).build()
+    compiled = CompiledGrammar.from_generator(LRGenerator(grammar, entrypoint))
+    return compiled, build_lexer_tables(grammar)
+
+
+def parse(compiled, tables, text):
+    parser = compiled.parser()
+    parser.feed_lexer(Lexer(tables, text))
+    return parser.finish()
+
+
+def test_entrypoint_without_left_recursion():
+    compiled, tables = compile_grammar(STATEMENT, 'statement')
+
+    assert compiled.conflicts == ()
+    assert parse(compiled, tables, '42;') == 42
+
+
+def test_conflicts_are_recorded():
+    compiled, tables = compile_grammar(AMBIGUOUS, 'sum')
+
+    assert [conflict.kind for conflict in compiled.conflicts] == ['shift/reduce']
+    conflict = compiled.conflicts[0]
+    assert conflict.key == compiled.terminals['PLUS']
+    assert conflict.action >= 0
+    assert compiled.actions[conflict.state][conflict.key] == conflict.action
+    assert compiled.productions[~conflict.rejected].nonterminal == 'sum'
+
+    assert parse(compiled, tables, '1 + 2 + 3') == 6
+
+
+def test_pickle_round_trip():
+    compiled, tables = compile_grammar(AMBIGUOUS, 'sum')
+    restored = pickle.loads(pickle.dumps(compiled))
+
+    assert restored.productions == compiled.productions
+    assert restored.actions == compiled.actions
+    assert restored.gotos == compiled.gotos
+    assert restored.accept == compiled.accept
+    assert restored.terminals == compiled.terminals
+    assert restored.recovery == compiled.recovery
+    assert restored.defaults == compiled.defaults
+    assert len(restored.conflicts) == len(compiled.conflicts)
+    assert parse(restored, tables, '1 + 2 + 3') == 6
+
+
+def test_concurrent_parses():
+    compiled, tables = compile_grammar(AMBIGUOUS, 'sum')
+    texts = [' + '.join(str(number) for number in range(count)) for count in range(1, 97)]
+    expected = [parse(compiled, tables, text) for text in texts]
+
+    barrier = threading.Barrier(8)
+
+    def parse_all(offset):
+        barrier.wait()
+        return [parse(compiled, tables, text) for text in texts[offset:] + texts[:offset]]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(parse_all, range(0, 96, 12)))
+
+    for offset, result in zip(range(0, 96, 12), results):
+        assert result == expected[offset:] + expected[:offset]
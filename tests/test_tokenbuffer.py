@@ -0,0 +1,87 @@
+import pytest
+
+from lrpy.grammar.builder import GrammarBuilder
+from lrpy.lexer.generator import build_lexer_tables
+from lrpy.lexer.lexer import Lexer
+from lrpy.parser.parser import GrammarParser
+from lrpy.parser.scanner import GrammarScanner
+from lrpy.parser.tokens import TokenType
+from lrpy.textspan import SpanMode, TextSpan
+from lrpy.tokenbuffer import TokenBuffer
+
+GRAMMAR = """
+token NUMBER: /[0-9]+/  # digits
+token PLUS: '+'
+token ACCENT: 'é'
+ignore WHITESPACE: /[ ]+/
+
+rule $sum:
+    (left:sum '+' right:NUMBER) => { return {'value': left + right} }
+    (value:NUMBER) => { return value }
+
+rule names:
+    (first:'é' [sum] sum*) => { return first }
+"""
+
+
+def scanned(scanner):
+    tokens = []
+    while True:
+        token = scanner.scan()
+        tokens.append((token.type, token.span, getattr(token, 'content', None)))
+        if token.type is TokenType.EOF:
+            return tokens
+
+
+@pytest.mark.parametrize('fast', [False, True])
+def test_scan_all_matches_scan(fast):
+    buffer = GrammarScanner(GRAMMAR, fast=fast).scan_all()
+
+    assert isinstance(buffer, TokenBuffer)
+    assert [(view.type, view.span, view.content) for view in buffer] == scanned(
+        GrammarScanner(GRAMMAR, fast=fast)
+    )
+
+
+def test_token_views():
+    buffer = GrammarScanner('rule $a', fast=True).scan_all()
+
+    assert len(buffer) == 4
+    assert buffer[0].type is TokenType.IDENTIFIER
+    assert (buffer[0].content, buffer[0].pos, buffer[0].length) == ('rule', 0, 4)
+    assert buffer[2].span == TextSpan(6, 7)
+    assert buffer[-1].type is TokenType.EOF
+
+    with pytest.raises(IndexError):
+        buffer[4]
+
+
+def test_scan_all_with_span_arrays():
+    scanner = GrammarScanner('rule $a', spanmode=SpanMode.ARRAYS, fast=True)
+    buffer = scanner.scan_all()
+
+    assert [view.span for view in buffer] == [0, 1, 2, 3]
+    assert scanner.resolve_span(buffer[2].span) == TextSpan(6, 7)
+
+
+def test_lexer_scan_all():
+    grammar = GrammarBuilder(GrammarParser(GRAMMAR).parse()).build()
+    tables = build_lexer_tables(grammar)
+    text = '1 + 22 + 333'
+
+    buffer = Lexer(tables, text).scan_all()
+    assert [(view.type, view.span, view.content) for view in buffer] == [
+        (token.type, token.span, token.content) for token in Lexer(tables, text)
+    ]
+
+
+@pytest.mark.parametrize('fast', [False, True])
+def test_buffered_parse(fast):
+    def describe(node):
+        return [
+            (rule.name, [(alt.span, alt.action) for alt in rule.alternatives])
+            for rule in node.rules
+        ]
+
+    expected = describe(GrammarParser(GRAMMAR).parse())
+    assert describe(GrammarParser(GRAMMAR, fast=fast, buffered=True).parse()) == expected
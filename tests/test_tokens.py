@@ -0,0 +1,24 @@
+from lrpy.parser.tokens import TokenType
+
+
+def test_token_type_values_are_stable():
+    assert [(token.name, token.value) for token in TokenType] == [
+        ('FOREIGNBLOCK', 1),
+        ('STRING', 2),
+        ('IDENTIFIER', 3),
+        ('NEWLINE', 4),
+        ('EOF', 5),
+        ('OPENPAREN', 6),
+        ('CLOSEPAREN', 7),
+        ('OPENBRACKET', 8),
+        ('CLOSEBRACKET', 9),
+        ('OPENBRACE', 10),
+        ('CLOSEBRACE', 11),
+        ('COLON', 12),
+        ('PLUS', 13),
+        ('STAR', 14),
+        ('DOLLAR', 15),
+        ('ARROW', 16),
+        ('REGEX', 17),
+        ('DOT', 18),
+    ]